@@ -1,6 +1,6 @@
 """Flask application factory."""
 import logging
-from flask import Flask
+from flask import Flask, request
 
 from app.config import config
 from app.logger import setup_logger
@@ -8,6 +8,10 @@ from app.logger import setup_logger
 # Set up application logger
 logger = setup_logger('app')
 
+# Endpoints answering with ETags when ETAG_ENABLED; their responses may be kept
+# by the browser but must be revalidated, everything else is no-store
+REVALIDATED_ENDPOINTS = {'api.api_calculate'}
+
 def create_app(config_name='default'):
     """Create and configure the Flask application."""
     app = Flask(__name__)
@@ -22,13 +26,26 @@ def create_app(config_name='default'):
     
     logger.info(f"Flask app initialized with config: {config_name}")
     
+    from app.assets import IMMUTABLE, init_assets
+    
     # Add security headers to prevent caching and data storage
     @app.after_request
     def add_security_headers(resp):
         """Add headers to prevent caching and data storage."""
-        resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0, private"
-        resp.headers["Pragma"] = "no-cache"
-        resp.headers["Expires"] = "0"
+        if request.endpoint == 'asset' and resp.status_code in (200, 206, 304):
+            # Fingerprinted build output (app/assets.py): the content never changes under its URL
+            resp.headers["Cache-Control"] = IMMUTABLE
+        else:
+            if request.endpoint == 'static':
+                # Unhashed static files hold no user data; revalidated through their ETag
+                resp.headers["Cache-Control"] = "no-cache"
+            elif app.config.get('ETAG_ENABLED') and request.endpoint in REVALIDATED_ENDPOINTS:
+                # Never stored by shared caches, and every reuse is revalidated against the ETag
+                resp.headers["Cache-Control"] = "private, no-cache"
+            else:
+                resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0, private"
+            resp.headers["Pragma"] = "no-cache"
+            resp.headers["Expires"] = "0"
         resp.headers["X-Content-Type-Options"] = "nosniff"
         resp.headers["Referrer-Policy"] = "no-referrer"
         return resp
@@ -48,18 +65,43 @@ def create_app(config_name='default'):
     except ImportError:
         pass  # Will be added in section 6
     
+    limiter = None
     try:
-        from flask_limiter import Limiter
-        from flask_limiter.util import get_remote_address
-        Limiter(
-            app=app,
-            key_func=get_remote_address,
-            default_limits=["200 per day", "50 per hour"],
-            storage_uri="memory://"
-        )
+        from app.ratelimit import init_limiter
+        limiter = init_limiter(app)
     except ImportError:
         pass  # Will be added in section 6
     
+    # Precision of the decimal engine; the engine is shared by every app in the process
+    from app.services.calculator import set_decimal_precision
+    set_decimal_precision(app.config['DECIMAL_PRECISION'])
+    
+    # In-memory result cache for repeated live-update payloads
+    if app.config.get('RESULT_CACHE_ENABLED'):
+        from app.services.cache import ResultCache
+        app.extensions['result_cache'] = ResultCache(
+            maxsize=app.config['RESULT_CACHE_SIZE'],
+            ttl=app.config['RESULT_CACHE_TTL']
+        )
+    
+    # Direct-to-bytes serializer for calculation responses
+    from app.services.serialize import ResponseWriter
+    app.extensions['response_writer'] = ResponseWriter(
+        percent_places=app.config.get('JSON_PERCENT_PLACES'),
+        money_places=app.config.get('JSON_MONEY_PLACES')
+    )
+    
+    # Fingerprinted static assets and the asset_url template helper
+    init_assets(app, limiter)
+    
+    # Request latency metrics and Server-Timing headers
+    from app.metrics import init_metrics
+    init_metrics(app, limiter)
+    
+    # gzip/brotli; registered after the metrics hooks so compression time is measured
+    from app.compression import init_compression
+    init_compression(app)
+    
     # Register blueprints
     from app.routes import bp
     app.register_blueprint(bp)
@@ -67,5 +109,18 @@ def create_app(config_name='default'):
     from app.routes_api import api as api_bp
     app.register_blueprint(api_bp)
     
+    # Background jobs for heavy calculations (/api/jobs), when JOBS_ENABLED
+    from app.jobs import init_jobs
+    init_jobs(app, limiter)
+    
+    if limiter is not None:
+        from app.ratelimit import apply_live_tier
+        apply_live_tier(app, limiter)
+    
+    # Pay first-request costs now, before gunicorn forks workers from a preloaded app
+    if app.config.get('WARM_UP'):
+        from app.warmup import warm_up
+        warm_up(app)
+    
     return app
 
@@ -0,0 +1,203 @@
+"""
+ASGI adapter for the Flask app.
+
+The event loop owns the connections, including keepalive, so an idle client
+no longer ties up a worker. /api/calculate runs the Flask view on a bounded
+thread pool: the body is read and the response written on the loop, and only
+the calculation itself occupies a thread. /health is answered on the loop.
+Both go through Flask's full dispatch, so rate limits and security headers
+are unchanged. The live-calculation WebSocket (app.live) shares the same
+executor. Everything else is served by asgiref's WsgiToAsgi.
+"""
+import asyncio
+import functools
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urlsplit
+
+from app.live import LIVE_PATH, LiveSession
+
+if TYPE_CHECKING:
+    from asgiref.wsgi import WsgiToAsgi
+
+# Routes served by the adapter itself: calculations run on the executor,
+# health checks directly on the event loop
+EXECUTOR_ROUTES = {("POST", "/api/calculate")}
+LOOP_ROUTES = {("GET", "/health")}
+
+
+class RequestTooLarge(Exception):
+    """Request body exceeds ASGI_MAX_BODY."""
+
+
+def build_environ(scope, body):
+    """
+    Build a WSGI environ for an ASGI HTTP scope and a fully read body.
+    
+    Args:
+        scope: ASGI HTTP connection scope
+        body: Request body bytes
+    
+    Returns:
+        WSGI environ dict
+    """
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class AsgiApp:
+    """ASGI application wrapping a Flask app created by create_app."""
+    
+    def __init__(self, flask_app, max_workers=None, max_body=None):
+        self.flask_app = flask_app
+        self.max_body = max_body or flask_app.config.get("ASGI_MAX_BODY", 16 * 1024 * 1024)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or flask_app.config.get("ASGI_EXECUTOR_WORKERS", 4),
+            thread_name_prefix="calc"
+        )
+        # Serves everything but the executor routes; None without asgiref
+        self.fallback: Optional["WsgiToAsgi"] = None
+        try:
+            from asgiref.wsgi import WsgiToAsgi
+            self.fallback = WsgiToAsgi(flask_app)
+        except ImportError:
+            pass
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] == "websocket" and scope["path"] == LIVE_PATH:
+            await self.live(scope, receive, send)
+            return
+        if scope["type"] == "http":
+            route = (scope["method"], scope["path"])
+            if route in LOOP_ROUTES:
+                await self.handle(scope, receive, send, offload=False)
+                return
+            if route in EXECUTOR_ROUTES or self.fallback is None:
+                await self.handle(scope, receive, send)
+                return
+        if self.fallback is None:
+            raise RuntimeError(f"Unsupported ASGI scope '{scope['type']}' without asgiref.")
+        await self.fallback(scope, receive, send)
+    
+    async def lifespan(self, receive, send):
+        """Answer lifespan events; the executor is shut down on shutdown."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    
+    async def read_body(self, receive):
+        """Read the request body on the event loop, enforcing max_body."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                raise RequestTooLarge()
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+    
+    def calculate(self, payload):
+        """Compute an /api/calculate payload in an app context (runs on the executor)."""
+        from app.routes_api import calculate_payload
+        with self.flask_app.app_context():
+            return calculate_payload(payload)
+    
+    async def live(self, scope, receive, send):
+        """Accept a live-calculation WebSocket and serve it until it closes."""
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        origin = headers.get("origin")
+        if origin and urlsplit(origin).netloc != headers.get("host"):
+            # Browsers always send Origin; refuse pages from other sites
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        await send({"type": "websocket.accept"})
+        allow = None
+        if "live_limits" in self.flask_app.extensions:
+            from app.ratelimit import allow_live
+            client = scope.get("client") or ("", 0)
+            allow = functools.partial(allow_live, self.flask_app, client[0])
+        session = LiveSession(self.calculate, self.executor, send, self.max_body, allow)
+        await session.run(receive)
+    
+    def dispatch(self, scope, body):
+        """Run Flask's full request dispatch; returns (status, headers, body)."""
+        with self.flask_app.request_context(build_environ(scope, body)):
+            try:
+                response = self.flask_app.full_dispatch_request()
+            except Exception as e:
+                response = self.flask_app.handle_exception(e)
+            data = response.get_data()
+            headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()]
+            return response.status_code, headers, data
+    
+    async def handle(self, scope, receive, send, offload=True):
+        """Serve one request, running the Flask view on the executor when offload is set."""
+        try:
+            body = await self.read_body(receive)
+        except RequestTooLarge:
+            await send_response(send, 413, [(b"content-type", b"text/plain")], b"Request body too large")
+            return
+        if body is None:
+            return
+        if offload:
+            loop = asyncio.get_running_loop()
+            status, headers, data = await loop.run_in_executor(self.executor, self.dispatch, scope, body)
+        else:
+            status, headers, data = self.dispatch(scope, body)
+        await send_response(send, status, headers, data)
+
+
+async def send_response(send, status, headers, body):
+    """Send a complete HTTP response."""
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app(config_name='default', **kwargs):
+    """Create the Flask app and wrap it for ASGI servers such as uvicorn."""
+    from app import create_app
+    return AsgiApp(create_app(config_name), **kwargs)
@@ -0,0 +1,332 @@
+"""
+Static asset build: minified, content-hashed files with precompressed variants.
+
+`python -m app.assets` (or `make assets`) writes each file of ASSET_FILES to
+app/static/dist/ under a name carrying a hash of its minified content, with
+a .gz (and a .br when the brotli package is installed) next to it, plus a
+manifest.json mapping source paths to the hashed names. Templates link
+assets with asset_url(), which uses the manifest when a build exists and
+the plain /static URL otherwise, so the app also runs unbuilt.
+
+Hashed files never change, so /assets serves them with a one-year immutable
+Cache-Control and picks the precompressed variant the client accepts; a new
+build yields new names. Unhashed /static files are revalidated (no-cache),
+and dynamic pages keep no-store.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import string
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from flask import abort, current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+    HAVE_BROTLI = True
+except ImportError:
+    HAVE_BROTLI = False
+
+# Source files under the static folder that are built
+ASSET_FILES = ("css/style.css", "js/lang.js", "js/app.js")
+
+DIST_DIR = "dist"
+MANIFEST = "manifest.json"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Content-Encoding and file suffix of the precompressed variants, best first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IDENT = frozenset(string.ascii_letters + string.digits + "_$")
+# A "/" after one of these (or at the start) begins a regular expression, not a division
+REGEX_AFTER = frozenset("(,=:[!&|?{};+-*%<>~^}")
+REGEX_KEYWORDS = frozenset(("return", "typeof", "case", "in", "of", "delete", "void", "throw", "new", "else"))
+
+
+def skip_quoted(source: str, start: int) -> int:
+    """Index just past the string literal opening at `start`."""
+    quote = source[start]
+    i = start + 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == "\\" else 1
+    return i + 1
+
+
+def skip_template(source: str, start: int) -> int:
+    """Index of the closing backtick or of the "${" that ends the template chunk at `start`."""
+    i = start
+    while i < len(source) and source[i] != "`" and not source.startswith("${", i):
+        i += 2 if source[i] == "\\" else 1
+    return i
+
+
+def skip_regex(source: str, start: int) -> Optional[int]:
+    """Index just past the regular expression (and flags) at `start`, or None if it is not one."""
+    i = start + 1
+    in_class = False
+    while i < len(source):
+        c = source[i]
+        if c == "\n":
+            return None
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            i += 1
+            while i < len(source) and source[i] in IDENT:
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def needs_space(prev: str, nxt: str) -> bool:
+    """Whether two tokens would merge without the whitespace between them."""
+    return (
+        (prev in IDENT and nxt in IDENT)
+        or (prev in "+-" and nxt in "+-")
+        or (prev == "/" and nxt in "/*")
+        or (prev.isdigit() and nxt == ".")
+    )
+
+
+def minify_js(source: str) -> str:
+    """
+    Strip comments and indentation from JavaScript.
+    
+    Strings, template literals and regular expressions are copied verbatim.
+    Line breaks are kept (one per run of blank lines), so automatic semicolon
+    insertion sees the same statements; other whitespace is dropped unless
+    two tokens would merge.
+    """
+    out: List[str] = []
+    templates: List[int] = []  # open braces inside each enclosing template ${...}
+    last = ""  # last emitted non-whitespace character
+    word = ""  # identifier or keyword emitted last, for the regex check
+    pending = ""  # whitespace seen since the last token: "", " " or "\n"
+    i, n = 0, len(source)
+    
+    while i < n:
+        c = source[i]
+        if c in " \t\r\n":
+            if c == "\n":
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i += 1
+            continue
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            pending = pending or " "
+            continue
+        
+        if pending and last:
+            if pending == "\n":
+                out.append("\n")
+            elif needs_space(last, c):
+                out.append(" ")
+        joined = not pending  # this token directly follows the last one
+        pending = ""
+        
+        if c in "'\"":
+            end = skip_quoted(source, i)
+        elif c == "`" or (c == "}" and templates and templates[-1] == 0):
+            if c == "}":
+                templates.pop()
+            end = skip_template(source, i + 1)
+            if source.startswith("${", end):
+                templates.append(0)
+                end += 2
+            else:
+                end += 1
+        elif c == "/" and (not last or last in REGEX_AFTER or (last in IDENT and word in REGEX_KEYWORDS)):
+            end = skip_regex(source, i) or i + 1
+        else:
+            if templates and c == "{":
+                templates[-1] += 1
+            elif templates and c == "}":
+                templates[-1] -= 1
+            if c not in IDENT:
+                word = ""
+            elif joined and last in IDENT:
+                word += c
+            else:
+                word = c
+            out.append(c)
+            last = c
+            i += 1
+            continue
+        out.append(source[i:end])
+        last = source[end - 1]
+        word = ""
+        i = end
+    return "".join(out) + "\n"
+
+
+def minify_css(source: str) -> str:
+    """
+    Strip comments and collapse whitespace in CSS; strings are copied verbatim.
+    
+    Whitespace is dropped around braces, semicolons and commas and after
+    colons, never before a colon, where it separates a descendant selector.
+    """
+    out: List[str] = []
+    pending = False
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            pending = True
+            i += 1
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            pending = True
+            continue
+        if c == "}" and out and out[-1] == ";":
+            out.pop()  # last declaration needs no semicolon
+        if pending and out and out[-1] not in "{};,:" and c not in "{};,":
+            out.append(" ")
+        pending = False
+        if c in "'\"":
+            end = skip_quoted(source, i)
+            out.append(source[i:end])
+            i = end
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out) + "\n"
+
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {".js": minify_js, ".css": minify_css}
+
+
+def build_assets(static_dir: str, files=ASSET_FILES) -> Dict[str, str]:
+    """
+    Build the hashed, minified and precompressed assets.
+    
+    Replaces static_dir/dist/ entirely.
+    
+    Args:
+        static_dir: The app's static folder
+        files: Source paths relative to static_dir
+    
+    Returns:
+        The manifest: source path -> hashed path under dist/
+    """
+    dist = Path(static_dir) / DIST_DIR
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {}
+    for name in files:
+        source = Path(static_dir) / name
+        text = source.read_text(encoding="utf-8")
+        minify = MINIFIERS.get(source.suffix)
+        data = (minify(text) if minify else text).encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=6).hexdigest()
+        hashed = str(Path(name).with_name(f"{source.stem}.{digest}{source.suffix}").as_posix())
+        
+        target = dist / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        # mtime=0 keeps the .gz byte-identical across builds
+        (dist / f"{hashed}.gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if HAVE_BROTLI:
+            (dist / f"{hashed}.br").write_bytes(brotli.compress(data, quality=11))
+        manifest[name] = hashed
+    (dist / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return manifest
+
+
+class AssetManifest:
+    """The built assets of an app: hashed names and the files present on disk."""
+    
+    def __init__(self, static_dir: str):
+        self.dist = os.path.join(static_dir, DIST_DIR)
+        self.paths: Dict[str, str] = {}
+        self.files = set()
+        try:
+            with open(os.path.join(self.dist, MANIFEST), encoding="utf-8") as f:
+                self.paths = json.load(f)
+        except FileNotFoundError:
+            return
+        for root, _, names in os.walk(self.dist):
+            for name in names:
+                self.files.add(os.path.relpath(os.path.join(root, name), self.dist).replace(os.sep, "/"))
+    
+    def url(self, path: str) -> str:
+        """URL of an asset: its hashed build when present, the plain static file otherwise."""
+        hashed = self.paths.get(path)
+        if hashed is None:
+            return url_for("static", filename=path)
+        return url_for("asset", filename=hashed)
+
+
+def asset_url(path: str) -> str:
+    """Template helper: fingerprinted URL of a static file."""
+    manifest: AssetManifest = current_app.extensions["assets"]
+    return manifest.url(path)
+
+
+def serve_asset(filename):
+    """Serve a hashed asset, precompressed when the client accepts it, cached for a year."""
+    manifest = current_app.extensions["assets"]
+    if filename not in manifest.files or filename == MANIFEST:
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    for encoding, suffix in ENCODINGS:
+        if request.accept_encodings[encoding] and filename + suffix in manifest.files:
+            resp = send_from_directory(manifest.dist, filename + suffix, mimetype=mimetype)
+            resp.headers["Content-Encoding"] = encoding
+            break
+    else:
+        resp = send_from_directory(manifest.dist, filename, mimetype=mimetype)
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def init_assets(app, limiter=None):
+    """
+    Load the asset manifest, add the /assets route and the asset_url template helper.
+    
+    Args:
+        app: Flask application
+        limiter: Optional Flask-Limiter instance; assets are exempt
+    """
+    app.extensions["assets"] = AssetManifest(app.static_folder)
+    app.add_url_rule("/assets/<path:filename>", "asset", serve_asset)
+    app.jinja_env.globals["asset_url"] = asset_url
+    if limiter is not None:
+        limiter.exempt(serve_asset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--static-dir", default=str(Path(__file__).resolve().parent / "static"))
+    args = parser.parse_args()
+    
+    for name, hashed in build_assets(args.static_dir).items():
+        source = os.path.getsize(os.path.join(args.static_dir, name))
+        built = os.path.join(args.static_dir, DIST_DIR, hashed)
+        sizes = [os.path.getsize(built)] + [
+            os.path.getsize(built + suffix) for _, suffix in ENCODINGS if os.path.exists(built + suffix)
+        ]
+        print(f"{name:<16} -> {hashed:<28}" + "".join(f"{size:>9,}" for size in [source, *sizes]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Response compression: gzip or brotli, negotiated from Accept-Encoding.
+
+Buffered responses are compressed in one go when they reach
+COMPRESS_MIN_SIZE; smaller ones are not worth the header and CPU.
+Streamed responses (exports, NDJSON) are compressed chunk by chunk, each
+chunk flushed so the client receives rows as they are produced. Brotli
+needs the brotli package and is preferred when the client accepts both.
+
+Responses that already carry a Content-Encoding, such as the precompressed
+copies served from /assets (app/assets.py), are passed through untouched, as
+are ranges and types that do not compress (images, ZIP-based XLSX).
+"""
+import zlib
+
+from flask import request
+
+from app.services import timing
+
+try:
+    import brotli
+    HAVE_BROTLI = True
+except ImportError:
+    HAVE_BROTLI = False
+
+# Types worth compressing, besides every text/* type
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/pdf",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def is_compressible(mimetype):
+    """Whether a response of this type is worth compressing."""
+    return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES)
+
+
+class Encoder:
+    """Incremental compressor for one response body."""
+    
+    def __init__(self, encoding, level, br_level):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=br_level)
+        else:
+            # wbits 31: gzip container
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    
+    def chunk(self, data):
+        """Compress a chunk and flush it, so it can be sent right away."""
+        if self.encoding == "br":
+            return self.compressor.process(data) + self.compressor.flush()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self):
+        """Trailing bytes that end the compressed stream."""
+        if self.encoding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush(zlib.Z_FINISH)
+    
+    def whole(self, data):
+        """Compress a complete body."""
+        if self.encoding == "br":
+            return self.compressor.process(data) + self.compressor.finish()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_FINISH)
+
+
+def compress_stream(chunks, encoder):
+    """Compress an iterable of body chunks; closes it when done."""
+    try:
+        for data in chunks:
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            if data:
+                yield encoder.chunk(data)
+        yield encoder.finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def negotiate(accept_encodings):
+    """Best encoding the client accepts, or None."""
+    offered = ["br", "gzip"] if HAVE_BROTLI else ["gzip"]
+    return accept_encodings.best_match(offered)
+
+
+def init_compression(app):
+    """
+    Compress responses according to Accept-Encoding.
+    
+    Register after the other after_request hooks that time the request
+    (init_metrics): hooks run in reverse order, so the time spent here then
+    shows up as the "compress" stage.
+    
+    Args:
+        app: Flask application
+    """
+    if not app.config.get("COMPRESS_ENABLED"):
+        return
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+    level = app.config["COMPRESS_LEVEL"]
+    br_level = app.config["COMPRESS_BR_LEVEL"]
+    
+    @app.after_request
+    def compress_response(response):
+        response.vary.add("Accept-Encoding")
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or "Content-Range" in response.headers
+            or not is_compressible(response.mimetype)
+        ):
+            return response
+        encoding = negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+        
+        encoder = Encoder(encoding, level, br_level)
+        if response.is_streamed or response.direct_passthrough:
+            # Generators and files: compressed as a stream, whatever their size
+            response.response = compress_stream(response.response, encoder)
+            response.direct_passthrough = False
+            response.headers.pop("Content-Length", None)
+            response.headers.pop("Accept-Ranges", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            with timing.stage("compress"):
+                response.set_data(encoder.whole(data))
+        response.headers["Content-Encoding"] = encoding
+        # The compressed bytes differ from the identity ones; keep validators but make them weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
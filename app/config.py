@@ -1,5 +1,6 @@
 """Configuration for the Investment Share Calculator Flask app."""
 import os
+import tempfile
 from pathlib import Path
 
 # Base directory
@@ -15,6 +16,57 @@ class Config:
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SECURE = False
     SESSION_COOKIE_SAMESITE = 'Lax'
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    # Counters live in one SQLite file shared by all workers on the host (app/ratelimit.py)
+    RATELIMIT_STORAGE_URI = os.environ.get(
+        'RATELIMIT_STORAGE_URI', f"sqlite:///{os.path.join(tempfile.gettempdir(), 'calc-ratelimit.sqlite')}"
+    )
+    RATELIMIT_DEFAULT = os.environ.get('RATELIMIT_DEFAULT', '200 per day;50 per hour')
+    RATELIMIT_LIVE = os.environ.get('RATELIMIT_LIVE', '10 per second;3000 per hour')  # live-update endpoints
+    # Significant digits of the decimal engine's Decimal context (app/services/calculator.py), at least 16
+    DECIMAL_PRECISION = int(os.environ.get('DECIMAL_PRECISION', 20))
+    BATCH_MAX_SCENARIOS = int(os.environ.get('BATCH_MAX_SCENARIOS', 100))
+    SWEEP_MAX_CELLS = int(os.environ.get('SWEEP_MAX_CELLS', 1_000_000))  # grid points x participants
+    SWEEP_TOLERANCE = float(os.environ.get('SWEEP_TOLERANCE', 1e-6))  # percentage points vs Decimal engine
+    # Monte Carlo /api/simulate: draws x participants cap, default draws and processes (0: in-process)
+    SIMULATE_MAX_CELLS = int(os.environ.get('SIMULATE_MAX_CELLS', 10_000_000))
+    SIMULATE_DEFAULT_DRAWS = int(os.environ.get('SIMULATE_DEFAULT_DRAWS', 10_000))
+    SIMULATE_WORKERS = int(os.environ.get('SIMULATE_WORKERS', 0))
+    UPLOAD_MAX_PARTICIPANTS = int(os.environ.get('UPLOAD_MAX_PARTICIPANTS', 1_000_000))
+    # ASGI mode (asgi.py): threads for calculations and largest buffered request body
+    ASGI_EXECUTOR_WORKERS = int(os.environ.get('ASGI_EXECUTOR_WORKERS', os.cpu_count() or 4))
+    ASGI_MAX_BODY = int(os.environ.get('ASGI_MAX_BODY', 16 * 1024 * 1024))
+    # /metrics (needs prometheus_client) and Server-Timing response headers
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    # In-memory result cache (keyed hashes only, never persisted)
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 256))
+    RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 60))  # seconds
+    # Opt-in ETags on /api/calculate: identical requests get 304 (private, no-cache instead of no-store)
+    ETAG_ENABLED = os.environ.get('ETAG_ENABLED', 'false').lower() == 'true'
+    # Mixed into every ETag; empty uses a digest of the app's source, so a deploy that changes code drops old tags
+    ETAG_SALT = os.environ.get('ETAG_SALT', '')
+    # gzip/brotli response compression (app/compression.py); smaller buffered bodies are sent as they are
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))  # bytes
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 4))  # gzip, 1-9
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))  # brotli, 0-11
+    # Decimal places of percentage and money fields in calculation responses; unset keeps full precision
+    # for percentages and rounds money to cents
+    JSON_PERCENT_PLACES = int(os.environ['JSON_PERCENT_PLACES']) if os.environ.get('JSON_PERCENT_PLACES') else None
+    JSON_MONEY_PLACES = int(os.environ.get('JSON_MONEY_PLACES') or 2)
+    # Background jobs (app/jobs.py): opt-in, as queued payloads and results are kept on disk until they expire
+    JOBS_ENABLED = os.environ.get('JOBS_ENABLED', 'false').lower() == 'true'
+    JOBS_DATABASE = os.environ.get('JOBS_DATABASE', os.path.join(tempfile.gettempdir(), 'calc-jobs.sqlite'))
+    JOBS_WORKERS = int(os.environ.get('JOBS_WORKERS', max(1, (os.cpu_count() or 2) // 2)))  # concurrent job processes
+    JOBS_MAX_QUEUED = int(os.environ.get('JOBS_MAX_QUEUED', 100))
+    JOBS_RESULT_TTL = float(os.environ.get('JOBS_RESULT_TTL', 3600))  # seconds a finished job is kept
+    JOBS_MAX_SECONDS = float(os.environ.get('JOBS_MAX_SECONDS', 600))  # largest (and default) wall-clock budget
+    JOBS_MAX_MEMORY_MB = int(os.environ.get('JOBS_MAX_MEMORY_MB', 2048))  # largest (and default) memory budget
+    JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', 0.2))  # seconds between pool rounds
+    # Compile templates and run one calculation at startup (in the master under preload_app)
+    WARM_UP = os.environ.get('WARM_UP', 'true').lower() == 'true'
 
 
 class DevelopmentConfig(Config):
@@ -27,9 +79,18 @@ class ProductionConfig(Config):
     DEBUG = False
 
 
+class TestingConfig(Config):
+    """Testing configuration."""
+    TESTING = True
+    RATELIMIT_ENABLED = False
+    RATELIMIT_STORAGE_URI = 'memory://'
+    WARM_UP = False
+
+
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
 
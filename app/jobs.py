@@ -0,0 +1,478 @@
+"""
+Background jobs for calculations too heavy for a request.
+
+POST /api/jobs queues a calculation of one of the JOB_VIEWS kinds in a SQLite
+file (JOBS_DATABASE). GET /api/jobs/<id> reports its state, GET
+/api/jobs/<id>/result returns the response the synchronous endpoint would
+have given, and DELETE /api/jobs/<id> cancels it.
+
+Jobs run in a job pool, `python -m app.jobs` (gunicorn.conf.py starts one next
+to the web workers when JOBS_ENABLED is set). The pool claims queued jobs by
+priority and runs each in its own forked process, at most JOBS_WORKERS at a
+time, so request workers stay free for interactive traffic. Each job has a
+budget: the pool kills its process after the wall-clock seconds, and the
+address space of the process is capped (RLIMIT_AS, Linux) at the memory
+budget on top of what the pool already uses. Run one pool per database: at
+start it queues again the jobs an earlier pool left running.
+
+Jobs keep participant data on disk. The payload is deleted when a job ends
+and the result JOBS_RESULT_TTL seconds later; the random job id is the only
+handle on a job.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import signal
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from flask import Response, current_app, jsonify, request, url_for
+
+from app.routes_api import api_calculate, api_calculate_batch, api_simulate, api_solve, api_sweep
+
+try:
+    import resource
+    HAVE_RESOURCE = True
+except ImportError:
+    HAVE_RESOURCE = False
+
+logger = logging.getLogger('app.jobs')
+
+# Job kinds and the API views that run them
+JOB_VIEWS = {
+    "calculate": api_calculate,
+    "batch": api_calculate_batch,
+    "sweep": api_sweep,
+    "simulate": api_simulate,
+    "solve": api_solve,
+}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Higher runs first; jobs of equal priority run in submission order
+PRIORITY_RANGE = (-10, 10)
+
+# The pool deletes expired jobs every this many seconds
+PURGE_INTERVAL = 60
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+    "payload TEXT, seconds REAL NOT NULL, memory_mb INTEGER NOT NULL, "
+    "created REAL NOT NULL, started REAL, finished REAL, expires REAL, "
+    "result_status INTEGER, result TEXT, error TEXT)",
+    "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created)",
+)
+
+# Columns reported by JobStore.get
+INFO_COLUMNS = (
+    "id", "kind", "status", "priority", "seconds", "memory_mb",
+    "created", "started", "finished", "expires", "result_status", "error",
+)
+
+
+@dataclass(frozen=True)
+class Job:
+    """A claimed job, as the pool runs it."""
+    id: str
+    kind: str
+    payload: dict
+    seconds: float
+    memory_mb: int
+
+
+class JobStore:
+    """Job queue and results in a SQLite file shared by the web workers and the pool."""
+    
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+    
+    @property
+    def connection(self):
+        """Connection for this thread, reopened after a fork."""
+        local = self.local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                connection.execute(statement)
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+    
+    def submit(self, kind, payload, priority=0, seconds=600, memory_mb=2048, max_queued=None):
+        """
+        Queue a job.
+        
+        Returns:
+            The job id, or None when max_queued jobs are already waiting
+        """
+        job_id = secrets.token_urlsafe(16)
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if max_queued is not None:
+                queued = connection.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+                if queued >= max_queued:
+                    return None
+            connection.execute(
+                "INSERT INTO jobs (id, kind, status, priority, payload, seconds, memory_mb, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, priority, json.dumps(payload), seconds, memory_mb, time.time())
+            )
+        finally:
+            connection.execute("COMMIT")
+        return job_id
+    
+    def claim(self):
+        """Mark the next queued job running and return it, or None when the queue is empty."""
+        row = self.connection.execute(
+            "UPDATE jobs SET status = ?, started = ? WHERE id = ("
+            "SELECT id FROM jobs WHERE status = ? ORDER BY priority DESC, created LIMIT 1"
+            ") RETURNING id, kind, payload, seconds, memory_mb",
+            (RUNNING, time.time(), QUEUED)
+        ).fetchone()
+        if row is None:
+            return None
+        return Job(row[0], row[1], json.loads(row[2]), row[3], row[4])
+    
+    def end(self, job_id, status, ttl, result_status=None, result=None, error=None):
+        """
+        Record the end of a running job; its payload is deleted and the result expires after ttl.
+        
+        Returns:
+            False when the job was no longer running (cancelled meanwhile)
+        """
+        now = time.time()
+        return self.connection.execute(
+            "UPDATE jobs SET status = ?, payload = NULL, finished = ?, expires = ?, "
+            "result_status = ?, result = ?, error = ? WHERE id = ? AND status = ?",
+            (status, now, now + ttl, result_status, result, error, job_id, RUNNING)
+        ).rowcount == 1
+    
+    def cancel(self, job_id, ttl):
+        """Cancel a queued or running job; returns False when it had already ended."""
+        now = time.time()
+        return self.connection.execute(
+            "UPDATE jobs SET status = ?, payload = NULL, finished = ?, expires = ? "
+            "WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, now, now + ttl, job_id, QUEUED, RUNNING)
+        ).rowcount == 1
+    
+    def get(self, job_id):
+        """State of a job as a dict (no payload or result), or None if unknown or expired."""
+        row = self.connection.execute(
+            f"SELECT {', '.join(INFO_COLUMNS)} FROM jobs WHERE id = ? AND (expires IS NULL OR expires > ?)",
+            (job_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        info = dict(zip(INFO_COLUMNS, row))
+        if info["status"] == QUEUED:
+            info["queue_position"] = self.connection.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority > ? OR (priority = ? AND created < ?))",
+                (QUEUED, info["priority"], info["priority"], info["created"])
+            ).fetchone()[0]
+        return info
+    
+    def result(self, job_id):
+        """(response status, response body) of a finished job, or None."""
+        row = self.connection.execute(
+            "SELECT result_status, result FROM jobs WHERE id = ? AND status = ? AND expires > ?",
+            (job_id, DONE, time.time())
+        ).fetchone()
+        return tuple(row) if row else None
+    
+    def cancelled(self, job_ids):
+        """The ids among job_ids whose jobs were cancelled."""
+        if not job_ids:
+            return set()
+        rows = self.connection.execute(
+            f"SELECT id FROM jobs WHERE status = ? AND id IN ({', '.join('?' * len(job_ids))})",
+            (CANCELLED, *job_ids)
+        ).fetchall()
+        return {row[0] for row in rows}
+    
+    def requeue_running(self):
+        """Queue again the jobs left running by a pool that stopped; returns their number."""
+        return self.connection.execute(
+            "UPDATE jobs SET status = ?, started = NULL WHERE status = ?", (QUEUED, RUNNING)
+        ).rowcount
+    
+    def purge(self):
+        """Delete expired jobs; returns their number."""
+        return self.connection.execute("DELETE FROM jobs WHERE expires <= ?", (time.time(),)).rowcount
+
+
+def run_view(app, kind, payload):
+    """
+    Run the API view of a job kind on a payload.
+    
+    Returns:
+        (status code, JSON body) of the response
+    """
+    with app.test_request_context(method="POST", json=payload):
+        response = app.make_response(JOB_VIEWS[kind]())
+        return response.status_code, response.get_data(as_text=True)
+
+
+def limit_memory(memory_mb):
+    """Cap this process's address space at its current size plus memory_mb (Linux only)."""
+    if not HAVE_RESOURCE:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = current + memory_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def run_job(app, store, job, ttl):
+    """Body of a job process: run the job within its memory budget and store the outcome."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    limit_memory(job.memory_mb)
+    try:
+        status, body = run_view(app, job.kind, job.payload)
+    except MemoryError:
+        store.end(job.id, FAILED, ttl, error=f"Memory budget of {job.memory_mb} MB exceeded.")
+        return
+    except Exception as e:
+        logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+        store.end(job.id, FAILED, ttl, error=f"Job failed: {str(e)}")
+        return
+    store.end(job.id, DONE, ttl, result_status=status, result=body)
+
+
+class JobPool:
+    """Runs queued jobs in forked processes, at most JOBS_WORKERS at a time."""
+    
+    def __init__(self, app, store=None):
+        self.app = app
+        self.store = store or JobStore(app.config["JOBS_DATABASE"])
+        self.workers = app.config["JOBS_WORKERS"]
+        self.ttl = app.config["JOBS_RESULT_TTL"]
+        self.poll_interval = app.config["JOBS_POLL_INTERVAL"]
+        self.context = multiprocessing.get_context("fork")
+        self.running = {}  # job id -> (process, job, monotonic deadline)
+        self.stopping = False
+    
+    def step(self):
+        """
+        One round of the pool: reap finished processes, kill cancelled and
+        overdue ones, then start queued jobs while workers are free.
+        
+        Returns:
+            Number of jobs started
+        """
+        now = time.monotonic()
+        cancelled = self.store.cancelled(list(self.running))
+        for job_id, (process, job, deadline) in list(self.running.items()):
+            if not process.is_alive():
+                process.join()
+                if process.exitcode != 0:
+                    self.store.end(job_id, FAILED, self.ttl, error=f"Job process exited with code {process.exitcode}.")
+            elif job_id in cancelled:
+                process.kill()
+                process.join()
+            elif now > deadline:
+                process.kill()
+                process.join()
+                self.store.end(job_id, FAILED, self.ttl, error=f"Time budget of {job.seconds:g} s exceeded.")
+            else:
+                continue
+            del self.running[job_id]
+        
+        started = 0
+        while len(self.running) < self.workers:
+            job = self.store.claim()
+            if job is None:
+                break
+            process = self.context.Process(
+                target=run_job, args=(self.app, self.store, job, self.ttl), name=f"job-{job.kind}", daemon=True
+            )
+            process.start()
+            self.running[job.id] = (process, job, time.monotonic() + job.seconds)
+            started += 1
+        return started
+    
+    def stop(self, *_):
+        self.stopping = True
+    
+    def run(self):
+        """Run until SIGTERM or SIGINT; jobs still running then are queued again."""
+        requeued = self.store.requeue_running()
+        if requeued:
+            logger.info(f"Queued {requeued} interrupted job(s) again")
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info(f"Job pool started with {self.workers} worker(s)")
+        last_purge = 0.0
+        while not self.stopping:
+            self.step()
+            if time.monotonic() - last_purge > PURGE_INTERVAL:
+                self.store.purge()
+                last_purge = time.monotonic()
+            time.sleep(self.poll_interval)
+        for process, _, _ in self.running.values():
+            process.kill()
+            process.join()
+        self.store.requeue_running()
+        logger.info("Job pool stopped")
+
+
+def isoformat(timestamp):
+    return None if timestamp is None else datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def job_payload(info):
+    """JSON form of JobStore.get output."""
+    payload = {
+        "id": info["id"],
+        "kind": info["kind"],
+        "status": info["status"],
+        "priority": info["priority"],
+        "budget": {"seconds": info["seconds"], "memory_mb": info["memory_mb"]},
+        "created": isoformat(info["created"]),
+        "started": isoformat(info["started"]),
+        "finished": isoformat(info["finished"]),
+        "expires": isoformat(info["expires"]),
+    }
+    if "queue_position" in info:
+        payload["queue_position"] = info["queue_position"]
+    if info["error"]:
+        payload["error"] = info["error"]
+    if info["status"] == DONE:
+        payload["result_status"] = info["result_status"]
+        payload["result"] = url_for("job_result", job_id=info["id"])
+    return payload
+
+
+def submit_job():
+    """
+    Queue a calculation.
+    
+    Body: {"kind": one of JOB_VIEWS, "payload": the endpoint's request body,
+    "priority": -10..10 (optional), "budget": {"seconds", "memory_mb"}
+    (optional, at most JOBS_MAX_SECONDS and JOBS_MAX_MEMORY_MB)}.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    config = current_app.config
+    kind = data.get("kind")
+    if kind not in JOB_VIEWS:
+        return jsonify({
+            "error": "invalid_job", "detail": f"Unknown kind {kind!r}; expected one of {', '.join(JOB_VIEWS)}."
+        }), 400
+    if not isinstance(data.get("payload"), dict):
+        return jsonify({"error": "invalid_job", "detail": "Expected a 'payload' object."}), 400
+    try:
+        priority = int(data.get("priority") or 0)
+        budget = data.get("budget") or {}
+        seconds = float(budget.get("seconds") or config["JOBS_MAX_SECONDS"])
+        memory_mb = int(budget.get("memory_mb") or config["JOBS_MAX_MEMORY_MB"])
+    except (AttributeError, TypeError, ValueError):
+        return jsonify({"error": "invalid_job", "detail": "Priority and budget must be numbers."}), 400
+    if not PRIORITY_RANGE[0] <= priority <= PRIORITY_RANGE[1]:
+        return jsonify({
+            "error": "invalid_job", "detail": f"Priority must be between {PRIORITY_RANGE[0]} and {PRIORITY_RANGE[1]}."
+        }), 400
+    if not (0 < seconds <= config["JOBS_MAX_SECONDS"] and 0 < memory_mb <= config["JOBS_MAX_MEMORY_MB"]):
+        return jsonify({
+            "error": "invalid_job",
+            "detail": f"Budget must be within {config['JOBS_MAX_SECONDS']} s and {config['JOBS_MAX_MEMORY_MB']} MB."
+        }), 400
+    
+    store = current_app.extensions["jobs"]
+    job_id = store.submit(kind, data["payload"], priority, seconds, memory_mb, config["JOBS_MAX_QUEUED"])
+    if job_id is None:
+        return jsonify({"error": "queue_full", "detail": "Too many queued jobs; try again later."}), 503
+    resp = jsonify(job_payload(store.get(job_id)))
+    resp.status_code = 202
+    resp.headers["Location"] = url_for("job_status", job_id=job_id)
+    return resp
+
+
+def job_status(job_id):
+    """State of a job."""
+    info = current_app.extensions["jobs"].get(job_id)
+    if info is None:
+        return jsonify({"error": "job_not_found"}), 404
+    return jsonify(job_payload(info)), 200
+
+
+def job_result(job_id):
+    """The response of a finished job, as the synchronous endpoint would have sent it."""
+    store = current_app.extensions["jobs"]
+    result = store.result(job_id)
+    if result is None:
+        info = store.get(job_id)
+        if info is None:
+            return jsonify({"error": "job_not_found"}), 404
+        return jsonify({"error": "job_not_done", "status": info["status"], "detail": info["error"]}), 409
+    status, body = result
+    return Response(body, status=status, mimetype="application/json")
+
+
+def cancel_job(job_id):
+    """Cancel a queued or running job."""
+    store = current_app.extensions["jobs"]
+    if store.get(job_id) is None:
+        return jsonify({"error": "job_not_found"}), 404
+    if not store.cancel(job_id, current_app.config["JOBS_RESULT_TTL"]):
+        return jsonify({"error": "job_ended", "detail": "The job has already ended."}), 409
+    return jsonify(job_payload(store.get(job_id))), 200
+
+
+def init_jobs(app, limiter=None):
+    """
+    Open the job store and add the /api/jobs routes, when JOBS_ENABLED.
+    
+    Args:
+        app: Flask application
+        limiter: Optional Flask-Limiter instance; polling a job is exempt,
+            submitting one counts against the default limits
+    """
+    if not app.config.get("JOBS_ENABLED"):
+        return
+    app.extensions["jobs"] = JobStore(app.config["JOBS_DATABASE"])
+    app.add_url_rule("/api/jobs", "job_submit", submit_job, methods=["POST"])
+    app.add_url_rule("/api/jobs/<job_id>", "job_status", job_status, methods=["GET"])
+    app.add_url_rule("/api/jobs/<job_id>", "job_cancel", cancel_job, methods=["DELETE"])
+    app.add_url_rule("/api/jobs/<job_id>/result", "job_result", job_result)
+    if limiter is not None:
+        limiter.exempt(job_status)
+        limiter.exempt(job_result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--config", default="production", help="Configuration name (see app/config.py)")
+    parser.add_argument("--workers", type=int, help="Overrides JOBS_WORKERS")
+    args = parser.parse_args()
+    
+    from app import create_app
+    app = create_app(args.config)
+    if args.workers:
+        app.config["JOBS_WORKERS"] = args.workers
+    JobPool(app).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Live calculation over a WebSocket (ASGI mode).
+
+Protocol, one JSON text frame per message:
+    client -> {"type": "state", "seq": n, "payload": {...}}  full /api/calculate body
+    client -> {"type": "update", "seq": n, "fields": {...}, "participants": {"<index>": {...}}}
+              changed top-level fields (null removes a field) and changed
+              participant rows by index; a resized list is sent in "fields"
+    server -> {"type": "result", "seq": n, "data": {...}}  /api/calculate payload
+    server -> {"type": "error", "seq": n, "error": "...", "detail": "..."}
+
+Only the newest request is computed: messages that arrive while a
+calculation runs replace each other, and a result is dropped if a newer
+request arrived in the meantime. Messages count against the same live
+rate-limit tier as the HTTP endpoints; a limited message still updates the
+session state but is answered with a "rate_limited" error instead of a
+result.
+"""
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger('app.api')
+
+LIVE_PATH = "/ws/calculate"
+
+
+def apply_message(state, message):
+    """
+    Apply a client message to the session's payload.
+    
+    Args:
+        state: Current /api/calculate payload (not modified)
+        message: Decoded client message
+    
+    Returns:
+        New payload dict
+    """
+    kind = message.get("type")
+    if kind == "state":
+        payload = message.get("payload")
+        if not isinstance(payload, dict):
+            raise ValueError("State message needs a 'payload' object.")
+        return dict(payload)
+    if kind != "update":
+        raise ValueError(f"Unknown message type '{kind}'.")
+    if state is None:
+        raise ValueError("Send a full state before updates.")
+    
+    new_state = dict(state)
+    fields = message.get("fields") or {}
+    if not isinstance(fields, dict):
+        raise ValueError("Update 'fields' must be an object.")
+    for key, value in fields.items():
+        if value is None:
+            new_state.pop(key, None)
+        else:
+            new_state[key] = value
+    
+    rows = message.get("participants") or {}
+    if not isinstance(rows, dict):
+        raise ValueError("Update 'participants' must map indexes to rows.")
+    if rows:
+        participants = list(new_state.get("participants") or [])
+        for index, row in rows.items():
+            position = int(index)
+            if not 0 <= position < len(participants):
+                raise ValueError(f"Participant index {index} out of range.")
+            participants[position] = row
+        new_state["participants"] = participants
+    return new_state
+
+
+def result_frame(seq, data):
+    """Result message around an already serialized /api/calculate payload (bytes)."""
+    return '{"type":"result","seq":%s,"data":%s}' % (json.dumps(seq), data.decode("utf-8"))
+
+
+class LiveSession:
+    """One WebSocket connection: keeps the latest payload and computes off the loop."""
+    
+    def __init__(self, compute, executor, send, max_message, allow=None):
+        self.compute = compute
+        self.executor = executor
+        self.send = send
+        self.max_message = max_message
+        self.allow = allow
+        self.state = None
+        self.latest_seq = None
+        self.pending = None
+        self.wakeup = asyncio.Event()
+    
+    async def send_json(self, message):
+        await self.send({"type": "websocket.send", "text": json.dumps(message, separators=(",", ":"))})
+    
+    async def on_text(self, text):
+        """Handle one client frame; errors are reported to the client."""
+        seq = None
+        try:
+            if len(text) > self.max_message:
+                raise ValueError("Message too large.")
+            message = json.loads(text)
+            if not isinstance(message, dict):
+                raise ValueError("Expected a JSON object.")
+            seq = message.get("seq")
+            self.state = apply_message(self.state, message)
+        except ValueError as e:
+            await self.send_json({"type": "error", "seq": seq, "error": "invalid_message", "detail": str(e)})
+            return
+        if self.allow is not None and not self.allow():
+            await self.send_json({
+                "type": "error", "seq": seq, "error": "rate_limited", "detail": "Too many live updates."
+            })
+            return
+        # Superseded requests are simply overwritten here
+        self.latest_seq = seq
+        self.pending = (seq, self.state)
+        self.wakeup.set()
+    
+    async def worker(self):
+        """Compute the newest pending request, one at a time."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            if self.pending is None:
+                continue
+            seq, payload = self.pending
+            self.pending = None
+            try:
+                data = await loop.run_in_executor(self.executor, self.compute, payload)
+            except Exception as e:
+                logger.warning(f"Live calculation failed: {str(e)}")
+                data = None
+                reply = {"type": "error", "seq": seq, "error": "calculation_failed", "detail": str(e)}
+            if seq != self.latest_seq:
+                continue  # a newer request arrived while computing
+            if data is None:
+                await self.send_json(reply)
+            else:
+                await self.send({"type": "websocket.send", "text": result_frame(seq, data)})
+    
+    async def run(self, receive):
+        """Serve messages until the client disconnects."""
+        task = asyncio.create_task(self.worker())
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                if message["type"] == "websocket.receive":
+                    text = message.get("text")
+                    if text is None and message.get("bytes") is not None:
+                        text = message["bytes"].decode("utf-8", errors="replace")
+                    await self.on_text(text or "")
+        finally:
+            task.cancel()
@@ -1,18 +1,148 @@
 """Logging configuration with file rotation and console toggle."""
+import atexit
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import random
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import List
+
+try:
+    import fcntl
+    HAVE_FCNTL = True
+except ImportError:  # Windows: no cross-process locking
+    HAVE_FCNTL = False
+
+# Loggers on the hot /api/calculate path; LOG_SAMPLE_RATE applies to them
+HOT_LOGGERS = ('app.api',)
+
+
+class SharedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that several worker processes can share.
+    
+    Every write and rollover holds an exclusive lock on <file>.lock, and a
+    file that another process rotated away is reopened before writing, so
+    workers never interleave partial lines or rotate the same file twice.
+    """
+    
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding=None):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=True)
+        self.lock_path = self.baseFilename + '.lock'
+        self.lock_file = open(self.lock_path, 'a')
+        self.lock_pid = os.getpid()
+    
+    def acquire_file_lock(self):
+        # A lock file inherited over fork shares its lock with the parent; reopen it per process
+        if self.lock_pid != os.getpid():
+            self.lock_file = open(self.lock_path, 'a')
+            self.lock_pid = os.getpid()
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+    
+    def release_file_lock(self):
+        fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+    
+    def rotated_elsewhere(self):
+        """Whether the open stream no longer is the file at baseFilename."""
+        try:
+            return os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+    
+    def emit(self, record):
+        if not HAVE_FCNTL:
+            super().emit(record)
+            return
+        try:
+            self.acquire_file_lock()
+        except OSError:
+            self.handleError(record)
+            return
+        try:
+            if self.stream is not None and self.rotated_elsewhere():
+                self.stream.close()
+                self.stream = self._open()
+            super().emit(record)
+        finally:
+            self.release_file_lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+    
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'source': f'{record.filename}:{record.lineno}',
+            'pid': record.process,
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep every record at or above `level` and a `rate` fraction of the rest."""
+    
+    def __init__(self, rate, level=logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.level = level
+    
+    def filter(self, record):
+        return record.levelno >= self.level or random.random() < self.rate
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for an in-process queue: records are passed as they are, not pickled."""
+    
+    def prepare(self, record):
+        return record
+
+
+def start_listener(logger, handlers):
+    """
+    Route `logger` through a queue drained by a background thread.
+    
+    The calling thread only enqueues the record; formatting and disk I/O
+    happen on the listener thread. After a fork (gunicorn with preload) the
+    child gets a fresh queue and its own listener thread.
+    
+    Returns:
+        The running QueueListener
+    """
+    handler = LocalQueueHandler(queue.SimpleQueue())
+    listener = logging.handlers.QueueListener(handler.queue, *handlers, respect_handler_level=True)
+    
+    def restart_in_child():
+        listener.queue = handler.queue = queue.SimpleQueue()
+        listener.start()
+    
+    logger.addHandler(handler)
+    listener.start()
+    os.register_at_fork(after_in_child=restart_in_child)
+    atexit.register(listener.stop)  # flush queued records on exit
+    return listener
 
 
 def setup_logger(name: str = 'app', log_dir: str = None) -> logging.Logger:
     """
     Set up a logger with rotating file handler and optional console output.
     
+    With LOG_MODE=queue (default) requests only put records on an in-memory
+    queue and a background thread writes them; LOG_MODE=sync writes on the
+    calling thread. The log file may be shared by several worker processes.
+    
     Args:
         name: Logger name (default: 'app')
         log_dir: Directory for log files (default: ./logs)
-        
+    
     Returns:
         Configured logger instance
     """
@@ -28,6 +158,10 @@ def setup_logger(name: str = 'app', log_dir: str = None) -> logging.Logger:
     log_dir = log_dir or os.environ.get('LOG_DIR', './logs')
     log_max_size = int(os.environ.get('LOG_MAX_SIZE', 10 * 1024 * 1024))  # 10MB default
     log_max_files = int(os.environ.get('LOG_MAX_FILES', 5))
+    log_mode = os.environ.get('LOG_MODE', 'queue').lower()
+    log_format = os.environ.get('LOG_FORMAT', 'text').lower()
+    sample_rate = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+    sample_level = os.environ.get('LOG_SAMPLE_LEVEL', 'WARNING').upper()
     
     # Create log directory if it doesn't exist
     log_path = Path(log_dir)
@@ -35,10 +169,11 @@ def setup_logger(name: str = 'app', log_dir: str = None) -> logging.Logger:
     
     # Set log level
     logger.setLevel(getattr(logging, log_level, logging.INFO))
+    handlers: List[logging.Handler] = []
     
     # File handler with rotation
     log_file = log_path / 'app.log'
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = SharedRotatingFileHandler(
         log_file,
         maxBytes=log_max_size,
         backupCount=log_max_files,
@@ -47,22 +182,39 @@ def setup_logger(name: str = 'app', log_dir: str = None) -> logging.Logger:
     file_handler.setLevel(logging.DEBUG)
     
     # Format for file logs (detailed)
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    file_formatter: logging.Formatter
+    if log_format == 'json':
+        file_formatter = JsonFormatter()
+    else:
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
     
     # Console handler (optional)
     if log_to_console:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        console_formatter = logging.Formatter(
+        console_formatter = JsonFormatter() if log_format == 'json' else logging.Formatter(
             '%(levelname)s - %(message)s'
         )
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+    
+    if log_mode == 'sync':
+        for handler in handlers:
+            logger.addHandler(handler)
+    else:
+        start_listener(logger, handlers)
+    
+    # Sample the hot path before records are queued, so dropped ones cost nothing
+    if sample_rate < 1:
+        for hot_name in HOT_LOGGERS:
+            if hot_name.startswith(f'{name}.'):
+                logging.getLogger(hot_name).addFilter(
+                    SamplingFilter(sample_rate, getattr(logging, sample_level, logging.WARNING))
+                )
     
     return logger
-
@@ -0,0 +1,138 @@
+"""
+Request instrumentation: Prometheus metrics on /metrics and Server-Timing headers.
+
+Metrics use prometheus_client when it is installed. Under gunicorn, set
+PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) so every worker writes its
+samples to shared files and /metrics aggregates all workers, whichever one
+answers the scrape. Server-Timing needs no dependency.
+"""
+import os
+import time
+
+from flask import Response, g, request
+
+from app.services import timing
+
+try:
+    import prometheus_client
+    HAVE_PROMETHEUS = True
+except ImportError:
+    HAVE_PROMETHEUS = False
+
+# Banner messages are counted by type; the message text itself is unbounded
+BANNER_TYPES = (
+    ("Share budget exceeds", "share_budget"),
+    ("Profit bounds cannot", "profit_bounds"),
+    ("Property weight", "property_weight"),
+    ("Some property weights", "property_weight"),
+    ("Property profit", "profit_range"),
+    ("At least one investor", "no_participants"),
+    ("Project not profitable", "not_profitable"),
+    ("Base pool cannot", "base_pool"),
+    ("Property owner name provided", "property_value_missing"),
+    ("Cash investments", "underfunded"),
+    ("Please correct the form", "invalid_form"),
+    ("An unexpected error", "unexpected"),
+)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PARTICIPANT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 1000, 10000, 100000, 1000000)
+
+if HAVE_PROMETHEUS:
+    REQUEST_LATENCY = prometheus_client.Histogram(
+        "http_request_duration_seconds", "Request latency by endpoint.",
+        ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS
+    )
+    STAGE_LATENCY = prometheus_client.Histogram(
+        "calculation_stage_duration_seconds", "Time per calculation stage.",
+        ["stage"], buckets=LATENCY_BUCKETS
+    )
+    BANNERS = prometheus_client.Counter(
+        "calculation_banners_total", "Calculation errors and warnings by type.",
+        ["kind", "type"]
+    )
+    PARTICIPANTS = prometheus_client.Histogram(
+        "calculation_participants", "Participants per calculation.",
+        buckets=PARTICIPANT_BUCKETS
+    )
+
+
+def banner_type(message):
+    """Map an error or warning message to a bounded type label."""
+    for prefix, kind in BANNER_TYPES:
+        if message.startswith(prefix):
+            return kind
+    return "other"
+
+
+def observe_calculation(participants, errors, warnings):
+    """Record the participant count and banners of one calculation."""
+    if not HAVE_PROMETHEUS:
+        return
+    PARTICIPANTS.observe(participants)
+    for message in errors:
+        BANNERS.labels(kind="error", type=banner_type(message)).inc()
+    for message in warnings:
+        BANNERS.labels(kind="warning", type=banner_type(message)).inc()
+
+
+def server_timing(durations, total):
+    """Format stage durations (seconds) as a Server-Timing header value."""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def metrics_view():
+    """Prometheus text exposition, aggregated across workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(prometheus_client.generate_latest(registry), mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app, limiter=None):
+    """
+    Install request timing hooks and the /metrics endpoint.
+    
+    Args:
+        app: Flask application
+        limiter: Optional Flask-Limiter instance; /metrics is exempt so
+            scrapes never count against the default limits
+    """
+    metrics_enabled = app.config.get("METRICS_ENABLED") and HAVE_PROMETHEUS
+    server_timing_enabled = app.config.get("SERVER_TIMING_ENABLED")
+    if not (metrics_enabled or server_timing_enabled):
+        return
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        timing.begin()
+    
+    @app.after_request
+    def record_request(response):
+        stages = timing.end()
+        start = g.pop("request_start", None)
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        durations = stages.durations if stages is not None else {}
+        if server_timing_enabled:
+            response.headers["Server-Timing"] = server_timing(durations, total)
+        if metrics_enabled and request.endpoint != "metrics":
+            REQUEST_LATENCY.labels(
+                endpoint=request.endpoint or "unmatched", method=request.method,
+                status=str(response.status_code)
+            ).observe(total)
+            for name, seconds in durations.items():
+                STAGE_LATENCY.labels(stage=name).observe(seconds)
+        return response
+    
+    if metrics_enabled:
+        app.add_url_rule("/metrics", "metrics", metrics_view)
+        if limiter is not None:
+            limiter.exempt(metrics_view)
@@ -0,0 +1,157 @@
+"""
+Rate limiting shared by all workers on a host.
+
+SQLiteStorage is a `limits` storage backend (storage URI
+sqlite:////absolute/path.sqlite) that keeps the counters in one SQLite file
+in WAL mode. Every gunicorn or uvicorn worker on the host sees the same
+counts, so a limit means the same thing whatever the worker count.
+
+The counters are fixed windows, not token buckets: Flask-Limiter's strategies
+only call incr/get on a storage, so a bucket refilling over time cannot be
+expressed through this interface. A window allows the same number of hits as a
+bucket of that size, but a client can spend two windows' worth around a
+window boundary. Each check is a single UPSERT statement. It holds SQLite's
+write lock only for that statement, with no transaction around it, but it is
+not lock-free: a lock-free shared counter would need shared memory with atomic
+operations, which the standard library does not offer.
+
+incr follows the `limits` 4+ signature (no elastic_expiry), the version pinned
+in requirements.txt.
+
+Live-calculation endpoints get their own shared tier (RATELIMIT_LIVE) in
+place of the default limits: typing produces short bursts that the hourly
+defaults would throttle within minutes, while the per-second part of the
+tier still stops scripted abuse.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from limits import parse_many
+from limits.storage import Storage
+
+# Views that live updates hit; they share the "live" bucket
+LIVE_ENDPOINTS = ("api.api_calculate", "api.api_calculate_delta")
+LIVE_SCOPE = "live"
+
+# Expired rows are purged every this many increments per connection
+PURGE_INTERVAL = 1000
+
+
+class SQLiteStorage(Storage):
+    """Fixed-window counters in a SQLite file shared between processes."""
+    
+    STORAGE_SCHEME = ["sqlite"]
+    
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        # sqlite:///relative/path or sqlite:////absolute/path
+        self.path = uri.split(":///", 1)[1]
+        self.local = threading.local()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+    
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+    
+    @property
+    def connection(self):
+        """Connection for this thread, reopened after a fork."""
+        local = self.local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")  # counters are disposable
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS counters "
+                "(key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires REAL NOT NULL) WITHOUT ROWID"
+            )
+            local.connection = connection
+            local.pid = os.getpid()
+            local.writes = 0
+        return local.connection
+    
+    def incr(self, key, expiry, amount=1):
+        """Increment a counter, starting a new window when the previous one expired."""
+        now = time.time()
+        connection = self.connection
+        value = connection.execute(
+            "INSERT INTO counters (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = CASE WHEN expires <= ? THEN excluded.value ELSE value + excluded.value END, "
+            "expires = CASE WHEN expires <= ? THEN excluded.expires ELSE expires END "
+            "RETURNING value",
+            (key, amount, now + expiry, now, now)
+        ).fetchone()[0]
+        self.local.writes += 1
+        if self.local.writes % PURGE_INTERVAL == 0:
+            connection.execute("DELETE FROM counters WHERE expires <= ?", (now,))
+        return value
+    
+    def get(self, key):
+        row = self.connection.execute(
+            "SELECT value FROM counters WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def get_expiry(self, key):
+        now = time.time()
+        row = self.connection.execute(
+            "SELECT expires FROM counters WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+    
+    def check(self):
+        try:
+            self.connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def reset(self):
+        return self.connection.execute("DELETE FROM counters").rowcount
+    
+    def clear(self, key):
+        self.connection.execute("DELETE FROM counters WHERE key = ?", (key,))
+
+
+def init_limiter(app):
+    """
+    Create the Flask-Limiter extension for the app.
+    
+    Storage and default limits come from RATELIMIT_STORAGE_URI and
+    RATELIMIT_DEFAULT, which Flask-Limiter reads from the app config.
+    
+    Returns:
+        Limiter instance
+    """
+    return Limiter(app=app, key_func=get_remote_address)
+
+
+def apply_live_tier(app, limiter):
+    """Give the live endpoints the shared RATELIMIT_LIVE tier instead of the defaults."""
+    live_limit = limiter.shared_limit(app.config["RATELIMIT_LIVE"], scope=LIVE_SCOPE)
+    for endpoint in LIVE_ENDPOINTS:
+        app.view_functions[endpoint] = live_limit(app.view_functions[endpoint])
+    app.extensions["live_limits"] = (limiter, list(parse_many(app.config["RATELIMIT_LIVE"])))
+
+
+def allow_live(app, key):
+    """
+    Count one live update outside a Flask request (the WebSocket channel).
+    
+    Args:
+        app: Flask application
+        key: Client address
+    
+    Returns:
+        False once any RATELIMIT_LIVE limit is exhausted for the client
+    """
+    limiter, items = app.extensions.get("live_limits", (None, []))
+    if limiter is None or not limiter.enabled:
+        return True
+    # Same keys as the HTTP live endpoints, so both channels share one bucket
+    return all([limiter.limiter.hit(item, key, LIVE_SCOPE) for item in items])
+
@@ -4,8 +4,12 @@ from flask import Blueprint, render_template, request
 from decimal import Decimal
 
 from app.forms import MainForm
-from app.services.calculator import parse_investors, compute_distribution, compute_role_counts
+from app.metrics import observe_calculation
+from app.services.calculator import (
+    compute_distribution, compute_role_counts, group_participant_fields, parse_investor_rows
+)
 from app.services.models import RoleBonuses, Project
+from app.services.timing import stage
 
 bp = Blueprint('main', __name__)
 logger = logging.getLogger('app')
@@ -22,8 +26,10 @@ def index():
     meta = {}
     role_counts = {'developer': 0, 'constructor': 0, 'investor': 0}
     role_bonuses_per_person = {'developer': 0, 'constructor': 0, 'investor': 0}
+    participant_rows = []
     
     if request.method == 'POST':
+        participant_rows = group_participant_fields(request.form)
         form = MainForm()
         
         # Always preserve form data, even if validation fails
@@ -51,7 +57,8 @@ def index():
                 )
                 
                 # Parse investors
-                investors = parse_investors(request.form)
+                with stage("parse"):
+                    investors = parse_investor_rows(participant_rows)
                 
                 # Get property model (default to "A")
                 property_model = (request.form.get('property_model') or 'A').upper()
@@ -71,10 +78,11 @@ def index():
                         property_profit_max_pct = Decimal(str(request.form.get('property_profit_max_pct')))
                 
                 # Compute distribution (includes validation)
-                results, meta, calc_errors, calc_warnings = compute_distribution(
-                    investors, role_bonuses, project, property_model,
-                    property_weight, property_profit_min_pct, property_profit_max_pct
-                )
+                with stage("compute"):
+                    results, meta, calc_errors, calc_warnings = compute_distribution(
+                        investors, role_bonuses, project, property_model,
+                        property_weight, property_profit_min_pct, property_profit_max_pct
+                    )
                 
                 errors.extend(calc_errors)
                 warnings.extend(calc_warnings)
@@ -118,21 +126,26 @@ def index():
         else:
             errors.append("Please correct the form errors.")
     
+    if request.method == 'POST':
+        observe_calculation(sum(role_counts.values()), errors, warnings)
+    
     # Convert errors/warnings to single strings for template compatibility
     error = errors[0] if errors else None
     warning = warnings[0] if warnings else None
     
-    return render_template(
-        'index.html',
-        form=form,
-        results=results,
-        meta=meta,
-        error=error,
-        warning=warning,
-        info=info,
-        role_counts=role_counts,
-        role_bonuses_per_person=role_bonuses_per_person
-    )
+    with stage("serialize"):
+        return render_template(
+            'index.html',
+            form=form,
+            results=results,
+            meta=meta,
+            error=error,
+            warning=warning,
+            info=info,
+            role_counts=role_counts,
+            role_bonuses_per_person=role_bonuses_per_person,
+            participant_rows=participant_rows
+        )
 
 
 @bp.route("/health")
@@ -1,13 +1,26 @@
 """JSON API routes for live calculation."""
+import json
 import logging
-from flask import Blueprint, request, jsonify
+import secrets
+from typing import Any, Dict, Tuple
+from flask import Blueprint, Response, request, jsonify, current_app
 from decimal import Decimal
+from itsdangerous import BadSignature, URLSafeSerializer
 
-from app.services.calculator import compute_distribution
+from app.metrics import observe_calculation
+from app.services.cache import canonical_inputs, cached_compute, keyed_etag, source_fingerprint
+from app.services.calculator import (
+    DELTA_ROLES, ENGINES, RunningTotals, apply_edit, compute_delta, compute_distribution, compute_simulation,
+    compute_sweep, running_totals
+)
 from app.services.models import RoleBonuses, Project, Investor
+from app.services.serialize import MONEY_PLACES, ROW_KEYS, converter, dumps, value_factors
+from app.services.simulation import SIMULATED_PARAMETERS, parse_distribution
+from app.services.solver import solve_target
+from app.services.timing import stage
 
 api = Blueprint('api', __name__)
-logger = logging.getLogger('app')
+logger = logging.getLogger('app.api')
 
 
 def D(x):
@@ -15,65 +28,104 @@ def D(x):
     return Decimal(str(x or 0))
 
 
-@api.post("/api/calculate")
-def api_calculate():
-    """Calculate investment shares via JSON API."""
-    data = request.get_json(force=True, silent=True) or {}
+def parse_participants(raw_participants):
+    """
+    Parse the JSON participants list into Investor objects.
     
-    try:
-        # Extract project inputs
-        project_cost = D(data.get("project_cost"))
-        sale_price = D(data.get("sale_price"))
-        developer_bonus = D(data.get("developer_bonus"))
-        constructor_bonus = D(data.get("constructor_bonus"))
-        investor_bonus = D(data.get("investor_bonus"))
-        property_value = D(data.get("property_value"))
-        property_owner = (data.get("property_owner") or "").strip()
-        property_base_share = D(data.get("property_base_share"))
-        property_profit_share = D(data.get("property_profit_share"))
-        property_model = (data.get("property_model") or "A").upper()
-        if property_model not in ["A", "B"]:
-            property_model = "A"
-        
-        # In Model B, property pools must be 0
-        property_weight = None
-        property_profit_min_pct = None
-        property_profit_max_pct = None
-        
-        if property_model == "B":
-            property_base_share = Decimal("0")
-            property_profit_share = Decimal("0")
-            property_weight = D(data.get("property_weight") or 1.0)
-            if data.get("property_profit_min_pct") is not None and data.get("property_profit_min_pct") != "":
-                property_profit_min_pct = D(data.get("property_profit_min_pct"))
-            if data.get("property_profit_max_pct") is not None and data.get("property_profit_max_pct") != "":
-                property_profit_max_pct = D(data.get("property_profit_max_pct"))
-        
-        # Parse participants (regular investors, excluding property owner)
-        investors = []
-        for p in data.get("participants", []):
-            # Skip property owner from participants list (handled separately)
-            if p.get("is_property_owner", False):
-                continue
-            name = (p.get("name") or "").strip()
-            role = p.get("role")
-            payment = D(p.get("payment") or 0)
-            if name and role:
-                investors.append(Investor(
-                    name=name,
-                    role=role,
-                    payment=payment
-                ))
-        
-        # Create project and role bonuses models
-        project = Project(
-            project_cost=project_cost,
-            sale_price=sale_price,
-            property_value=property_value,
-            property_owner=property_owner,
-            property_profit_share=property_profit_share
-        )
-        
+    The property owner is skipped here; it is added by compute_distribution.
+    
+    Args:
+        raw_participants: List of participant dicts from the request body
+    
+    Returns:
+        List of Investor objects
+    """
+    investors = []
+    for p in raw_participants or []:
+        # Skip property owner from participants list (handled separately)
+        if p.get("is_property_owner", False):
+            continue
+        name = (p.get("name") or "").strip()
+        role = p.get("role")
+        payment = D(p.get("payment") or 0)
+        if name and role:
+            investors.append(Investor(
+                name=name,
+                role=role,
+                payment=payment
+            ))
+    return investors
+
+
+def parse_calculation_request(data, cache=None):
+    """
+    Parse a /api/calculate payload into compute_distribution arguments.
+    
+    Args:
+        data: Decoded JSON request body
+        cache: Optional dict used to share parsed participant lists and
+            role bonuses between scenarios of one batch
+    
+    Returns:
+        Dict with investors, role_bonuses, project, property_model, the
+        Model B parameters and the engine
+    """
+    # Extract project inputs
+    project_cost = D(data.get("project_cost"))
+    sale_price = D(data.get("sale_price"))
+    developer_bonus = D(data.get("developer_bonus"))
+    constructor_bonus = D(data.get("constructor_bonus"))
+    investor_bonus = D(data.get("investor_bonus"))
+    property_value = D(data.get("property_value"))
+    property_owner = (data.get("property_owner") or "").strip()
+    property_base_share = D(data.get("property_base_share"))
+    property_profit_share = D(data.get("property_profit_share"))
+    property_model = (data.get("property_model") or "A").upper()
+    if property_model not in ["A", "B"]:
+        property_model = "A"
+    engine = (data.get("engine") or "decimal").lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'.")
+    
+    # In Model B, property pools must be 0
+    property_weight = None
+    property_profit_min_pct = None
+    property_profit_max_pct = None
+    
+    if property_model == "B":
+        property_base_share = Decimal("0")
+        property_profit_share = Decimal("0")
+        property_weight = D(data.get("property_weight") or 1.0)
+        if data.get("property_profit_min_pct") is not None and data.get("property_profit_min_pct") != "":
+            property_profit_min_pct = D(data.get("property_profit_min_pct"))
+        if data.get("property_profit_max_pct") is not None and data.get("property_profit_max_pct") != "":
+            property_profit_max_pct = D(data.get("property_profit_max_pct"))
+    
+    # Parse participants (regular investors, excluding property owner);
+    # identical lists within a batch are parsed and validated only once
+    raw_participants = data.get("participants", [])
+    if cache is None:
+        investors = parse_participants(raw_participants)
+    else:
+        participants_key = ("participants", json.dumps(raw_participants, sort_keys=True, default=str))
+        if participants_key not in cache:
+            cache[participants_key] = parse_participants(raw_participants)
+        investors = cache[participants_key]
+    
+    # Create project and role bonuses models
+    project = Project(
+        project_cost=project_cost,
+        sale_price=sale_price,
+        property_value=property_value,
+        property_owner=property_owner,
+        property_profit_share=property_profit_share
+    )
+    
+    bonus_values = (developer_bonus, constructor_bonus, investor_bonus, property_base_share, property_profit_share)
+    bonuses_key = ("role_bonuses", bonus_values)
+    if cache is not None and bonuses_key in cache:
+        role_bonuses = cache[bonuses_key]
+    else:
         role_bonuses = RoleBonuses(
             developer=developer_bonus,
             constructor=constructor_bonus,
@@ -81,66 +133,838 @@ def api_calculate():
             property_base_share=property_base_share,
             property_profit_share=property_profit_share
         )
-        
-        # Compute distribution
-        results, meta, errors, warnings = compute_distribution(
-            investors, role_bonuses, project, property_model,
-            property_weight, property_profit_min_pct, property_profit_max_pct
+        if cache is not None:
+            cache[bonuses_key] = role_bonuses
+    
+    return {
+        "investors": investors,
+        "role_bonuses": role_bonuses,
+        "project": project,
+        "property_model": property_model,
+        "property_weight": property_weight,
+        "property_profit_min_pct": property_profit_min_pct,
+        "property_profit_max_pct": property_profit_max_pct,
+        "engine": engine,
+    }
+
+
+# Request field names accepted as /api/sweep axes, mapped to sweep parameters
+SWEEP_AXES = {
+    "sale_price": "sale_price",
+    "project_cost": "project_cost",
+    "property_weight": "property_weight",
+    "developer_bonus": "developer",
+    "constructor_bonus": "constructor",
+    "investor_bonus": "investor",
+    "property_base_share": "property_base_share",
+    "property_profit_share": "property_profit_share",
+}
+
+
+def parse_axis(spec, max_points):
+    """
+    Parse a sweep axis: a list of values or {"start", "stop", "step"|"num"}.
+    
+    Ranges include the stop value and are generated in Decimal arithmetic so
+    that steps such as 0.1 do not drift.
+    
+    Args:
+        spec: Axis specification from the request body
+        max_points: Largest allowed number of values
+    
+    Returns:
+        List of Decimal values
+    """
+    if isinstance(spec, list):
+        values = [D(v) for v in spec]
+    elif isinstance(spec, dict):
+        start = D(spec.get("start"))
+        stop = D(spec.get("stop"))
+        if spec.get("num") is not None:
+            num = int(spec["num"])
+            if num < 1:
+                raise ValueError("Axis 'num' must be at least 1.")
+            step = (stop - start) / (num - 1) if num > 1 else Decimal("0")
+        else:
+            step = D(spec.get("step"))
+            if step <= 0:
+                raise ValueError("Axis 'step' must be positive.")
+            num = int((stop - start) / step) + 1 if stop >= start else 0
+        if num > max_points:
+            raise ValueError(f"Axis has more than {max_points} values.")
+        values = [start + step * i for i in range(num)]
+    else:
+        raise ValueError("Axis must be a list or a {start, stop, step} object.")
+    if len(values) > max_points:
+        raise ValueError(f"Axis has more than {max_points} values.")
+    return values
+
+
+# Request field names accepted as /api/solve variables, mapped to solver variables
+SOLVE_VARIABLES = {
+    "developer_bonus": "developer",
+    "constructor_bonus": "constructor",
+    "investor_bonus": "investor",
+    "property_base_share": "property_base_share",
+    "property_profit_share": "property_profit_share",
+    "property_weight": "property_weight",
+    "sale_price": "sale_price",
+    "payment": "payment",
+}
+
+# Largest histogram bin count accepted by /api/simulate
+SIMULATE_MAX_BINS = 1000
+
+
+def summary_payload(summary, column=None):
+    """
+    JSON form of a simulation summary (app.services.simulation.summarize).
+    
+    Args:
+        summary: Dict of summary arrays
+        column: Participant index for per-participant summaries
+    
+    Returns:
+        Dict with mean, std, min, max, percentiles and, when present, histogram
+    """
+    if column is not None:
+        summary = {
+            key: values[:, column] if key == "percentiles" else values[column]
+            for key, values in summary.items()
+        }
+    payload = {
+        "mean": float(summary["mean"]),
+        "std": float(summary["std"]),
+        "min": float(summary["min"]),
+        "max": float(summary["max"]),
+        "percentiles": summary["percentiles"].tolist(),
+    }
+    if "counts" in summary:
+        payload["histogram"] = {"edges": summary["edges"].tolist(), "counts": summary["counts"].tolist()}
+    return payload
+
+
+def run_calculation(params):
+    """Run compute_distribution on parsed request parameters, through the result cache if enabled."""
+    return cached_compute(
+        current_app.extensions.get("result_cache"), compute_distribution,
+        params["investors"], params["role_bonuses"], params["project"], params["property_model"],
+        params["property_weight"], params["property_profit_min_pct"], params["property_profit_max_pct"],
+        engine=params["engine"]
+    )
+
+
+# Fixed-point formatters of the dict payloads, as the default ResponseWriter:
+# exact percentages, money in cents
+format_percent = converter(None)
+format_money = converter(MONEY_PLACES)
+
+
+def format_result(r, factors):
+    """
+    Format one result (Result or ResultRecord) as an API row of strings.
+    
+    factors is value_factors(project, meta), computed once per response.
+    """
+    # Use profit_share if available (Model B), otherwise use total_share (Model A)
+    profit_pct = r.profit_share if r.profit_share is not None else r.total_share
+    sale_factor, profit_factor = factors
+    return {
+        "name": r.name,
+        "role": r.role,
+        "payment": format_money(r.payment),
+        "share_base_pct": format_percent(r.share),
+        "share_role_pct": format_percent(r.bonus),
+        "share_property_pct": format_percent(r.profit_bonus),
+        "total_equity_pct": format_percent(r.total_share),  # Equity percentage
+        "total_profit_pct": format_percent(profit_pct),  # Profit percentage
+        "total_share_pct": format_percent(r.total_share),  # Legacy field (equity)
+        "final_value": format_money(r.total_share * sale_factor),
+        "profit_value": format_money(profit_pct * profit_factor)
+    }
+
+
+def build_response_payload(results, meta, errors, warnings, project):
+    """
+    Format compute_distribution output as the /api/calculate JSON payload.
+    
+    Args:
+        results: List of Result objects
+        meta: Meta dict from compute_distribution
+        errors: List of error messages
+        warnings: List of warning messages
+        project: Project the results were computed for
+    
+    Returns:
+        JSON-serializable dict
+    """
+    # Format results for JSON
+    factors = value_factors(project, meta)
+    results_json = [format_result(r, factors) for r in results]
+    
+    # Build pools detail
+    pools_detail = {
+        "base_pool": format_percent(meta.get("base_pool", Decimal("0"))),
+        "role_pool": format_percent(meta.get("role_pool", Decimal("0"))),
+        "property_pool": format_percent(meta.get("property_pool", Decimal("0"))),
+        "dev": format_percent(meta.get("developer_bonus", Decimal("0"))),
+        "const": format_percent(meta.get("constructor_bonus", Decimal("0"))),
+        "inv": format_percent(meta.get("investor_bonus", Decimal("0"))),
+        "prop_base": format_percent(meta.get("property_base_share", Decimal("0"))),
+        "prop_profit_effective": format_percent(meta.get("property_profit_share_effective", Decimal("0")))
+    }
+    
+    # Build totals
+    totals_json = {
+        "cash_total": format_money(meta.get("cash_total", Decimal("0"))),
+        "project_cost": format_money(project.project_cost),
+        "sale_price": format_money(project.sale_price),
+        "profit": format_money(meta.get("project_profit", Decimal("0"))),
+        "total_pct_sum": format_percent(meta.get("total_pct_sum", Decimal("0")))
+    }
+    
+    return {
+        "results": results_json,
+        "totals": totals_json,
+        "pools": pools_detail,
+        "banners": {
+            "errors": errors,
+            "warnings": warnings
+        }
+    }
+
+
+# Scenario fields carried in a delta state token
+STATE_FIELDS = (
+    "project_cost", "sale_price", "developer_bonus", "constructor_bonus", "investor_bonus",
+    "property_value", "property_owner", "property_base_share", "property_profit_share",
+    "property_model", "property_weight", "property_profit_min_pct", "property_profit_max_pct",
+)
+
+
+def state_serializer():
+    """Signer for delta state tokens, keyed with the app secret."""
+    secret_key = current_app.config.get("SECRET_KEY")
+    if not secret_key:
+        raise RuntimeError("SECRET_KEY must be set to sign delta state tokens.")
+    return URLSafeSerializer(secret_key, salt="calc-state")
+
+
+def dump_state(data, totals):
+    """
+    Encode a scenario and its running totals as a signed state token.
+    
+    The token holds no participant rows, so its size does not grow with the
+    cap table.
+    
+    Args:
+        data: Request payload (only STATE_FIELDS are kept)
+        totals: RunningTotals of the participants
+    
+    Returns:
+        URL-safe token string
+    """
+    scenario = {field: data[field] for field in STATE_FIELDS if data.get(field) is not None}
+    return state_serializer().dumps({
+        "scenario": scenario,
+        "cash_total": str(totals.cash_total),
+        "role_counts": totals.role_counts,
+    })
+
+
+def load_state(token):
+    """
+    Decode a state token from dump_state.
+    
+    Raises:
+        BadSignature: If the token was not issued by this app
+    
+    Returns:
+        Tuple of (scenario dict, RunningTotals)
+    """
+    state = state_serializer().loads(token or "")
+    totals = RunningTotals(cash_total=Decimal(state["cash_total"]), role_counts=state["role_counts"])
+    return state["scenario"], totals
+
+
+def parse_edit_participant(raw):
+    """Build the Investor an edit refers to; name, role and payment are required."""
+    if not isinstance(raw, dict):
+        raise ValueError("Edit participant must be an object.")
+    name = (raw.get("name") or "").strip()
+    if not name or not raw.get("role"):
+        raise ValueError("Edit participant needs a name and a role.")
+    return Investor(name=name, role=raw["role"], payment=D(raw.get("payment") or 0))
+
+
+def apply_request_edits(scenario, totals, edits):
+    """
+    Apply a list of delta edits to a scenario and its running totals.
+    
+    Supported edits:
+        {"op": "add", "name", "role", "payment"}
+        {"op": "remove", "name", "role", "payment"}
+        {"op": "change", "name", "role", "payment", "previous": {"name", "role", "payment"}}
+        {"op": "set", "field", "value"}, field being one of STATE_FIELDS
+    
+    Args:
+        scenario: Scenario fields from the state token
+        totals: RunningTotals from the state token
+        edits: List of edit dicts
+    
+    Returns:
+        Tuple of (scenario, totals, dict of added or changed participants by name)
+    """
+    scenario = dict(scenario)
+    rows = {}
+    for edit in edits:
+        op = edit.get("op") if isinstance(edit, dict) else None
+        if op == "add":
+            participant = parse_edit_participant(edit)
+            totals = apply_edit(totals, added=participant)
+            rows[participant.name] = participant
+        elif op == "remove":
+            participant = parse_edit_participant(edit)
+            totals = apply_edit(totals, removed=participant)
+            rows.pop(participant.name, None)
+        elif op == "change":
+            participant = parse_edit_participant(edit)
+            previous = parse_edit_participant({"name": participant.name, **(edit.get("previous") or {})})
+            totals = apply_edit(totals, removed=previous, added=participant)
+            rows.pop(previous.name, None)
+            rows[participant.name] = participant
+        elif op == "set":
+            field = edit.get("field")
+            if field not in STATE_FIELDS:
+                raise ValueError(f"Field '{field}' cannot be set.")
+            scenario[field] = edit.get("value")
+        else:
+            raise ValueError(f"Unknown edit op '{op}'.")
+    return scenario, totals, rows
+
+
+def json_response(body, status=200):
+    """Response for a body that is already serialized JSON."""
+    return Response(body, status=status, mimetype="application/json")
+
+
+def calculation_etag(data, params):
+    """
+    Strong ETag for an /api/calculate request, or None when ETAG_ENABLED is off.
+    
+    The tag is a keyed hash (see keyed_etag) of everything the response
+    depends on: the canonical calculation inputs, the scenario fields echoed
+    in the state token, the response rounding, the decimal engine's
+    precision and ETAG_SALT (by default source_fingerprint), so tags do not
+    survive a change of precision or a deploy. It is derived from the
+    request alone, so a match is answered without computing anything.
+    """
+    if not current_app.config.get("ETAG_ENABLED"):
+        return None
+    writer = current_app.extensions["response_writer"]
+    canonical = b"\n".join((
+        canonical_inputs(
+            params["investors"], params["role_bonuses"], params["project"], params["property_model"],
+            params["property_weight"], params["property_profit_min_pct"], params["property_profit_max_pct"],
+            engine=params["engine"]
+        ),
+        json.dumps([data.get(field) for field in STATE_FIELDS], default=str).encode("utf-8"),
+        json.dumps([writer.percent_places, writer.money_places]).encode("utf-8"),
+        json.dumps([
+            current_app.config.get("DECIMAL_PRECISION"), current_app.config.get("ETAG_SALT") or source_fingerprint()
+        ]).encode("utf-8"),
+    ))
+    secret = current_app.secret_key or b""
+    return keyed_etag(canonical, secret.encode("utf-8") if isinstance(secret, str) else secret)
+
+
+def calculate_payload(data, params=None):
+    """
+    Compute the /api/calculate response payload for a decoded request body.
+    
+    Shared by the HTTP endpoint and the live WebSocket channel; needs an app
+    context. Raises on malformed input.
+    
+    Args:
+        data: Decoded request body
+        params: Result of parse_calculation_request(data), if already parsed
+    
+    Returns:
+        The payload serialized as UTF-8 JSON bytes (see ResponseWriter)
+    """
+    if params is None:
+        with stage("parse"):
+            params = parse_calculation_request(data)
+    
+    # Compute distribution
+    with stage("compute"):
+        results, meta, errors, warnings = run_calculation(params)
+    observe_calculation(len(params["investors"]), errors, warnings)
+    
+    with stage("serialize"):
+        extra = {}
+        # Token for /api/calculate/delta; only cap tables of the bonus roles can be updated incrementally
+        if all(inv.role in DELTA_ROLES for inv in params["investors"]):
+            extra["state"] = dump_state(data, running_totals(params["investors"]))
+        return current_app.extensions["response_writer"].payload(
+            results, meta, errors, warnings, params["project"], extra
         )
+
+
+@api.post("/api/calculate")
+def api_calculate():
+    """
+    Calculate investment shares via JSON API.
+    
+    With ETAG_ENABLED the response carries a strong ETag, and a request
+    whose If-None-Match holds the tag of its own inputs is answered 304
+    without computing or serializing; the client reuses its previous body.
+    """
+    with stage("parse"):
+        data = request.get_json(force=True, silent=True) or {}
+    
+    try:
+        with stage("parse"):
+            params = parse_calculation_request(data)
+        etag = calculation_etag(data, params)
+        # Weak comparison, as RFC 9110 prescribes for If-None-Match: compressed responses carry W/"..."
+        if etag is not None and not request.if_none_match.star_tag and request.if_none_match.contains_weak(etag):
+            resp = Response(status=304)
+            resp.set_etag(etag)
+            return resp
         
-        # Format results for JSON
-        results_json = []
-        for r in results:
-            # Use profit_share if available (Model B), otherwise use total_share (Model A)
-            profit_pct = r.profit_share if r.profit_share is not None else r.total_share
-            results_json.append({
-                "name": r.name,
-                "role": r.role,
-                "payment": str(r.payment),
-                "share_base_pct": str(r.share),
-                "share_role_pct": str(r.bonus),
-                "share_property_pct": str(r.profit_bonus),
-                "total_equity_pct": str(r.total_share),  # Equity percentage
-                "total_profit_pct": str(profit_pct),  # Profit percentage
-                "total_share_pct": str(r.total_share),  # Legacy field (equity)
-                "final_value": str((r.total_share / Decimal("100")) * project.sale_price),
-                "profit_value": str((profit_pct / Decimal("100")) * meta.get("project_profit", Decimal("0")))
-            })
-        
-        # Build pools detail
-        pools_detail = {
-            "base_pool": str(meta.get("base_pool", Decimal("0"))),
-            "role_pool": str(meta.get("role_pool", Decimal("0"))),
-            "property_pool": str(meta.get("property_pool", Decimal("0"))),
-            "dev": str(meta.get("developer_bonus", Decimal("0"))),
-            "const": str(meta.get("constructor_bonus", Decimal("0"))),
-            "inv": str(meta.get("investor_bonus", Decimal("0"))),
-            "prop_base": str(meta.get("property_base_share", Decimal("0"))),
-            "prop_profit_effective": str(meta.get("property_profit_share_effective", Decimal("0")))
+        resp = json_response(calculate_payload(data, params))
+        if etag is not None:
+            resp.set_etag(etag)
+        return resp
+    
+    except Exception as e:
+        logger.error(f"API calculation failed: {str(e)}", exc_info=True)
+        return jsonify({"error": "calculation_failed", "detail": str(e)}), 400
+
+
+@api.post("/api/calculate/delta")
+def api_calculate_delta():
+    """
+    Recalculate after a few edits without resending the cap table.
+    
+    Body: {"state": token, "edits": [...]}, the token coming from
+    /api/calculate or a previous delta response. The server keeps no
+    state: the token carries the scenario and running totals, and the work
+    is proportional to the number of edits. Results are returned for the
+    added or changed participants and the property owner; "factors" let
+    the client rescale every other row (see compute_delta).
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    edits = data.get("edits")
+    if not isinstance(edits, list):
+        return jsonify({"error": "invalid_delta", "detail": "Expected an 'edits' list."}), 400
+    
+    try:
+        scenario, totals = load_state(data.get("state"))
+    except (BadSignature, KeyError, TypeError) as e:
+        logger.warning(f"Rejected delta state: {str(e)}")
+        return jsonify({"error": "invalid_state", "detail": "State token is invalid."}), 400
+    
+    try:
+        with stage("parse"):
+            scenario, totals, rows = apply_request_edits(scenario, totals, edits)
+            params = parse_calculation_request({**scenario, "participants": []})
+        with stage("compute"):
+            results, meta, errors, warnings = compute_delta(
+                totals, list(rows.values()), params["role_bonuses"], params["project"], params["property_model"],
+                params["property_weight"], params["property_profit_min_pct"], params["property_profit_max_pct"]
+            )
+    except Exception as e:
+        logger.warning(f"Delta calculation failed: {str(e)}")
+        return jsonify({"error": "invalid_delta", "detail": str(e)}), 400
+    observe_calculation(totals.participants, errors, warnings)
+    
+    extra = {}
+    factors = meta.get("factors")
+    if factors:
+        extra["factors"] = {
+            "base_per_payment": str(factors["base_per_payment"]),
+            "role_bonus_per_head": {role: str(v) for role, v in factors["role_bonus_per_head"].items()},
+            "role_bonus_extra_units": factors["role_bonus_extra_units"],
+            "profit_per_equity": str(factors["profit_per_equity"]),
         }
+    extra["state"] = dump_state(scenario, totals)
+    return json_response(current_app.extensions["response_writer"].payload(
+        results, meta, errors, warnings, params["project"], extra
+    ))
+
+
+@api.post("/api/calculate/upload")
+def api_calculate_upload():
+    """
+    Calculate a cap table uploaded as CSV or NDJSON and stream the results back.
+    
+    The body (text/csv with a name,role,payment header, or
+    application/x-ndjson with one {"name", "role", "payment"} object per
+    line) is read line by line from the request stream, so only the
+    participant records are kept in memory. Scenario fields such as
+    project_cost, sale_price, the bonuses, the property fields and engine
+    come from the query string. Results are streamed in chunks in the upload
+    format, or in the one given by ?format=csv|ndjson; NDJSON output ends
+    with a {"summary": {...}} line holding totals, pools and banners.
+    """
+    # Rarely used: imported on first use rather than at worker startup
+    from app.services.upload import detect_format, iter_lines, read_csv, read_ndjson, stream_csv, stream_ndjson
+    
+    max_rows = current_app.config.get("UPLOAD_MAX_PARTICIPANTS", 1000000)
+    
+    try:
+        input_format = detect_format(request.content_type)
+        output_format = (request.args.get("format") or input_format).lower()
+        if output_format not in ("csv", "ndjson"):
+            raise ValueError(f"Unknown output format '{output_format}'.")
+        with stage("parse"):
+            params = parse_calculation_request(request.args.to_dict())
+            reader = read_csv if input_format == "csv" else read_ndjson
+            participants = list(reader(iter_lines(request.stream), max_rows))
+        with stage("compute"):
+            results, meta, errors, warnings = compute_distribution(
+                participants, params["role_bonuses"], params["project"], params["property_model"],
+                params["property_weight"], params["property_profit_min_pct"], params["property_profit_max_pct"],
+                engine=params["engine"]
+            )
+    except ValueError as e:
+        return jsonify({"error": "invalid_upload", "detail": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Upload calculation failed: {str(e)}", exc_info=True)
+        return jsonify({"error": "calculation_failed", "detail": str(e)}), 400
+    
+    observe_calculation(len(participants), errors, warnings)
+    project = params["project"]
+    summary = build_response_payload([], meta, errors, warnings, project)
+    del summary["results"]
+    if errors:
+        return jsonify({"error": "calculation_failed", "detail": errors[0], **summary}), 400
+    
+    writer = current_app.extensions["response_writer"]
+    if output_format == "csv":
+        return Response(stream_csv(writer.values(results, meta, project), ROW_KEYS), mimetype="text/csv")
+    
+    def ndjson_rows():
+        yield from writer.json_rows(results, meta, project)
+        yield dumps({"summary": summary}).decode("utf-8")
+    
+    return Response(stream_ndjson(ndjson_rows()), mimetype="application/x-ndjson")
+
+
+@api.post("/api/export")
+def api_export():
+    """
+    Calculate a scenario and stream the results as a CSV, XLSX or PDF document.
+    
+    Takes the /api/calculate payload as a JSON body, or as JSON in a
+    "payload" form field so that a plain form submission downloads the file
+    directly. ?format=csv|xlsx|pdf (default csv) picks the document type; the
+    PDF ends with a signature table holding one signature field per
+    participant. Rows are formatted and written as the response is sent.
+    """
+    # Rarely used: imported on first use rather than at worker startup
+    from app.services.export import EXPORT_FORMATS, stream_export_csv, stream_pdf, stream_xlsx, summary_lines
+    
+    export_format = (request.args.get("format") or "csv").lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "invalid_export", "detail": f"Unknown export format '{export_format}'."}), 400
+    
+    try:
+        with stage("parse"):
+            data = request.get_json(force=True, silent=True)
+            if data is None:
+                data = json.loads(request.form.get("payload") or "{}")
+            params = parse_calculation_request(data)
+        with stage("compute"):
+            results, meta, errors, warnings = run_calculation(params)
+    except Exception as e:
+        logger.warning(f"Export failed: {str(e)}")
+        return jsonify({"error": "calculation_failed", "detail": str(e)}), 400
+    
+    observe_calculation(len(params["investors"]), errors, warnings)
+    project = params["project"]
+    summary = build_response_payload([], meta, errors, warnings, project)
+    if errors:
+        del summary["results"]
+        return jsonify({"error": "calculation_failed", "detail": errors[0], **summary}), 400
+    
+    lines = summary_lines(summary)
+    rows = current_app.extensions["response_writer"].values(results, meta, project)
+    if export_format == "csv":
+        chunks = stream_export_csv(rows, lines)
+    elif export_format == "xlsx":
+        chunks = stream_xlsx(rows, lines)
+    else:
+        chunks = stream_pdf(rows, lines, ((r.name, r.role) for r in results))
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(chunks, mimetype=mimetype, headers={
+        "Content-Disposition": f'attachment; filename="investment-results.{extension}"'
+    })
+
+
+@api.post("/api/calculate/batch")
+def api_calculate_batch():
+    """
+    Calculate several scenarios in one request.
+    
+    Body: {"base": {...}, "scenarios": [{...}, ...]}. Each scenario is
+    merged over the optional "base" payload and uses the same fields as
+    /api/calculate. Results come back in input order; a failing scenario
+    yields an error entry without affecting the others.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    scenarios = data.get("scenarios")
+    base = data.get("base") or {}
+    
+    if not isinstance(scenarios, list) or not isinstance(base, dict):
+        return jsonify({"error": "invalid_batch", "detail": "Expected a 'scenarios' list."}), 400
+    
+    max_scenarios = current_app.config.get("BATCH_MAX_SCENARIOS", 100)
+    if len(scenarios) > max_scenarios:
+        return jsonify({
+            "error": "batch_too_large",
+            "detail": f"At most {max_scenarios} scenarios per batch."
+        }), 400
+    
+    # Parsed participant lists and role bonuses shared across scenarios
+    cache: Dict[Tuple, Any] = {}
+    writer = current_app.extensions["response_writer"]
+    out = []
+    for index, scenario in enumerate(scenarios):
+        try:
+            if not isinstance(scenario, dict):
+                raise ValueError("Scenario must be an object.")
+            params = parse_calculation_request({**base, **scenario}, cache)
+            results, meta, errors, warnings = run_calculation(params)
+            payload = writer.payload(results, meta, errors, warnings, params["project"], {"index": index})
+        except Exception as e:
+            logger.warning(f"Batch scenario {index} failed: {str(e)}")
+            payload = dumps({"index": index, "error": "calculation_failed", "detail": str(e)})
+        out.append(payload)
+    
+    return json_response(b'{"count":%d,"scenarios":[' % len(out) + b",".join(out) + b"]}")
+
+
+@api.post("/api/sweep")
+def api_sweep():
+    """
+    Evaluate a grid of scenarios (sensitivity table) in one vectorized pass.
+    
+    Body: the /api/calculate payload plus "axes", mapping any of SWEEP_AXES
+    to a list of values or a {"start", "stop", "step"} range. The response
+    lists the axes in grid order; per-participant arrays have the grid shape
+    followed by the participant count.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    max_cells = current_app.config.get("SWEEP_MAX_CELLS", 1000000)
+    
+    try:
+        raw_axes = data.get("axes") or {}
+        if not isinstance(raw_axes, dict) or not raw_axes:
+            return jsonify({"error": "invalid_sweep", "detail": "Expected a non-empty 'axes' object."}), 400
+        unknown = [name for name in raw_axes if name not in SWEEP_AXES]
+        if unknown:
+            return jsonify({"error": "invalid_sweep", "detail": f"Unknown axes: {', '.join(unknown)}."}), 400
         
-        # Build totals
-        totals_json = {
-            "cash_total": str(meta.get("cash_total", Decimal("0"))),
-            "project_cost": str(project_cost),
-            "sale_price": str(sale_price),
-            "profit": str(meta.get("project_profit", Decimal("0"))),
-            "total_pct_sum": str(meta.get("total_pct_sum", Decimal("0")))
-        }
+        axes = {SWEEP_AXES[name]: parse_axis(spec, max_cells) for name, spec in raw_axes.items()}
+        params = parse_calculation_request(data)
         
-        payload = {
-            "results": results_json,
-            "totals": totals_json,
-            "pools": pools_detail,
-            "banners": {
-                "errors": errors,
-                "warnings": warnings
-            }
-        }
+        cells = len(params["investors"]) + 1
+        for values in axes.values():
+            cells *= len(values)
+        if cells > max_cells:
+            return jsonify({
+                "error": "sweep_too_large",
+                "detail": f"Grid points x participants must not exceed {max_cells}."
+            }), 400
         
-        return jsonify(payload), 200
+        sweep, errors, warnings = compute_sweep(
+            params["investors"], params["role_bonuses"], params["project"], axes,
+            params["property_model"], params["property_weight"],
+            params["property_profit_min_pct"], params["property_profit_max_pct"],
+            tolerance=current_app.config.get("SWEEP_TOLERANCE", 1e-6)
+        )
+    except ValueError as e:
+        return jsonify({"error": "invalid_sweep", "detail": str(e)}), 400
+    except Exception as e:
+        logger.error(f"API sweep failed: {str(e)}", exc_info=True)
+        return jsonify({"error": "calculation_failed", "detail": str(e)}), 400
+    
+    payload: Dict[str, Any] = {"banners": {"errors": errors, "warnings": warnings}}
+    if sweep:
+        payload.update({
+            "axes": [
+                {"name": name, "values": sweep["axes"][SWEEP_AXES[name]].tolist()} for name in raw_axes
+            ],
+            "shape": list(sweep["shape"]),
+            "participants": [
+                {"name": name, "role": role} for name, role in zip(sweep["names"], sweep["roles"])
+            ],
+            "status": sweep["status"].tolist(),
+            "profit": sweep["project_profit"].tolist(),
+            "share_base_pct": sweep["base"].tolist(),
+            "share_role_pct": sweep["role"].tolist(),
+            "share_property_pct": sweep["property"].tolist(),
+            "total_equity_pct": sweep["equity"].tolist(),
+            "total_profit_pct": sweep["profit"].tolist(),
+            "final_value": sweep["final_value"].tolist(),
+            "profit_value": sweep["profit_value"].tolist(),
+            "max_deviation": sweep["max_deviation"],
+        })
+    return jsonify(payload), 200
+
+
+@api.post("/api/simulate")
+def api_simulate():
+    """
+    Monte Carlo payout simulation over an uncertain sale price and project cost.
+    
+    Body: the /api/calculate payload plus "distributions", mapping sale_price
+    and/or project_cost to a distribution object (see
+    app.services.simulation.DISTRIBUTIONS), and optional "draws", "seed",
+    "bins" and "percentiles". The response holds percentile summaries of the
+    drawn parameters and the project profit, and per-participant summaries
+    with histograms. Without a seed one is chosen and returned, so any run
+    can be repeated.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    max_cells = current_app.config.get("SIMULATE_MAX_CELLS", 10_000_000)
+    
+    try:
+        raw_specs = data.get("distributions") or {}
+        if not isinstance(raw_specs, dict) or not raw_specs:
+            return jsonify({
+                "error": "invalid_simulation", "detail": "Expected a non-empty 'distributions' object."
+            }), 400
+        unknown = [name for name in raw_specs if name not in SIMULATED_PARAMETERS]
+        if unknown:
+            return jsonify({
+                "error": "invalid_simulation", "detail": f"Unknown distributions: {', '.join(unknown)}."
+            }), 400
+        specs = {name: parse_distribution(spec) for name, spec in raw_specs.items()}
+        draws = int(data.get("draws") or current_app.config.get("SIMULATE_DEFAULT_DRAWS", 10_000))
+        seed = data.get("seed")
+        seed = secrets.randbits(32) if seed is None else int(seed)
+        if seed < 0:
+            raise ValueError("Seed must be a non-negative integer.")
+        bins = int(data.get("bins") or 20)
+        if bins > SIMULATE_MAX_BINS:
+            raise ValueError(f"At most {SIMULATE_MAX_BINS} histogram bins are allowed.")
+        percentiles = data.get("percentiles")
+        if percentiles is not None:
+            percentiles = [float(q) for q in percentiles]
+        params = parse_calculation_request(data)
+        
+        if draws * (len(params["investors"]) + 1) > max_cells:
+            return jsonify({
+                "error": "simulation_too_large",
+                "detail": f"Draws x participants must not exceed {max_cells}."
+            }), 400
         
+        simulation, errors, warnings = compute_simulation(
+            params["investors"], params["role_bonuses"], params["project"], specs, draws, seed,
+            params["property_model"], params["property_weight"],
+            params["property_profit_min_pct"], params["property_profit_max_pct"],
+            percentiles=percentiles, bins=bins,
+            workers=current_app.config.get("SIMULATE_WORKERS", 0),
+            tolerance=current_app.config.get("SWEEP_TOLERANCE", 1e-6)
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "invalid_simulation", "detail": str(e)}), 400
     except Exception as e:
-        logger.error(f"API calculation failed: {str(e)}", exc_info=True)
+        logger.error(f"API simulate failed: {str(e)}", exc_info=True)
         return jsonify({"error": "calculation_failed", "detail": str(e)}), 400
+    
+    banners = {"errors": errors, "warnings": warnings}
+    if not simulation:
+        return jsonify({"banners": banners}), 200
+    return jsonify({
+        "banners": banners,
+        "draws": simulation["draws"],
+        "seed": simulation["seed"],
+        "status_counts": simulation["status_counts"],
+        "percentiles": simulation["percentiles"],
+        "sale_price": summary_payload(simulation["sale_price"]),
+        "project_cost": summary_payload(simulation["project_cost"]),
+        "profit": summary_payload(simulation["project_profit"]),
+        "participants": [
+            {
+                "name": name,
+                "role": role,
+                "final_value": summary_payload(simulation["final_value"], i),
+                "profit_value": summary_payload(simulation["profit_value"], i),
+                "total_profit_pct": summary_payload(simulation["profit"], i),
+            }
+            for i, (name, role) in enumerate(zip(simulation["names"], simulation["roles"]))
+        ],
+        "max_deviation": simulation["max_deviation"],
+    }), 200
+
 
+@api.post("/api/solve")
+def api_solve():
+    """
+    Find the value of one input that gives a participant a target share or payout.
+    
+    Body: the /api/calculate payload plus "target" ({"participant", "metric",
+    "value", optional "tolerance"}; metric is total_share, profit_share,
+    final_value or profit_value) and "variable" ({"name", "min", "max"}, name
+    from SOLVE_VARIABLES; "payment" also takes the paying "participant").
+    The response is the /api/calculate payload at the solution plus "solution".
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    
+    try:
+        target = data.get("target")
+        variable = data.get("variable")
+        if not isinstance(target, dict) or not isinstance(variable, dict):
+            return jsonify({
+                "error": "invalid_solve", "detail": "Expected 'target' and 'variable' objects."
+            }), 400
+        name = variable.get("name")
+        if name not in SOLVE_VARIABLES:
+            return jsonify({
+                "error": "invalid_solve",
+                "detail": f"Unknown variable {name!r}; expected one of {', '.join(SOLVE_VARIABLES)}."
+            }), 400
+        if target.get("value") is None or target.get("value") == "":
+            return jsonify({"error": "invalid_solve", "detail": "Expected a target 'value'."}), 400
+        
+        lower, upper = (
+            None if variable.get(key) is None or variable.get(key) == "" else D(variable[key])
+            for key in ("min", "max")
+        )
+        tolerance = D(target["tolerance"]) if target.get("tolerance") else Decimal("1e-9")
+        params = parse_calculation_request(data)
+        solution, method, evaluations, errors, warnings = solve_target(
+            params["investors"], params["role_bonuses"], params["project"],
+            (target.get("participant") or "").strip(), target.get("metric") or "", D(target["value"]),
+            SOLVE_VARIABLES[name], lower, upper, (variable.get("participant") or "").strip() or None,
+            params["property_model"], params["property_weight"],
+            params["property_profit_min_pct"], params["property_profit_max_pct"],
+            tolerance=tolerance, engine=params["engine"]
+        )
+    except ValueError as e:
+        return jsonify({"error": "invalid_solve", "detail": str(e)}), 400
+    except Exception as e:
+        logger.error(f"API solve failed: {str(e)}", exc_info=True)
+        return jsonify({"error": "calculation_failed", "detail": str(e)}), 400
+    
+    if solution is None:
+        return jsonify({"banners": {"errors": errors, "warnings": warnings}}), 200
+    solved = {
+        "variable": name,
+        "participant": variable.get("participant"),
+        "value": str(solution.value),
+        "target": str(D(target["value"])),
+        "achieved": str(solution.achieved),
+        "metric": target.get("metric"),
+        "method": method,
+        "evaluations": evaluations,
+    }
+    return json_response(current_app.extensions["response_writer"].payload(
+        solution.results, solution.meta, errors, warnings, solution.project, {"solution": solved}
+    ))
@@ -0,0 +1,184 @@
+"""In-memory LRU + TTL cache for compute_distribution results."""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from app.services.models import Investor, RoleBonuses, Project
+from app.services.records import copy_records
+
+
+def canonical_inputs(
+    investors: Sequence[Investor],
+    role_bonuses: RoleBonuses,
+    project: Project,
+    property_model: str = "A",
+    property_weight: Optional[Decimal] = None,
+    property_profit_min_pct: Optional[Decimal] = None,
+    property_profit_max_pct: Optional[Decimal] = None,
+    engine: str = "decimal"
+) -> bytes:
+    """
+    Encode the inputs of compute_distribution as canonical bytes.
+    
+    Decimals keep their exact string form ("1000" and "1000.0" differ) because
+    the API echoes inputs such as payments back in that form.
+    
+    Returns:
+        UTF-8 encoded canonical JSON
+    """
+    def dec(value: Optional[Decimal]) -> Optional[str]:
+        return None if value is None else str(value)
+    
+    document = [
+        [[inv.name, inv.role, str(inv.payment)] for inv in investors],
+        [
+            str(role_bonuses.developer), str(role_bonuses.constructor), str(role_bonuses.investor),
+            str(role_bonuses.property_base_share), str(role_bonuses.property_profit_share),
+        ],
+        [
+            str(project.project_cost), str(project.sale_price), str(project.property_value),
+            project.property_owner, str(project.property_profit_share),
+        ],
+        [property_model, dec(property_weight), dec(property_profit_min_pct), dec(property_profit_max_pct)],
+        engine,
+    ]
+    return json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def keyed_etag(canonical: bytes, secret: bytes) -> str:
+    """
+    Strong entity tag for canonical request bytes.
+    
+    A BLAKE2b digest keyed with a key derived from `secret` (the app's
+    SECRET_KEY): every worker issues the same tag for the same request, and
+    the tag reveals nothing about the inputs to anyone without the key.
+    
+    Returns:
+        Hex digest, without quotes
+    """
+    key = hashlib.blake2b(secret, digest_size=32, person=b"calc-etag").digest()
+    return hashlib.blake2b(canonical, key=key, digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def source_fingerprint() -> str:
+    """
+    Digest of the app package's Python source, read once per process.
+    
+    Salts ETags so that tags issued by one release are not answered with a
+    304 by another that computes or formats results differently.
+    
+    Returns:
+        Hex digest
+    """
+    package = Path(__file__).resolve().parent.parent
+    digest = hashlib.blake2b(digest_size=16, person=b"calc-source")
+    for path in sorted(package.rglob("*.py")):
+        digest.update(path.relative_to(package).as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded LRU cache with per-entry time-to-live.
+    
+    Keys are keyed BLAKE2b digests of the canonical inputs; the hashing key is
+    random per process, so the cache never holds plaintext inputs as keys and
+    digests cannot be compared across processes. Entries live in memory only.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 60.0,
+        secret: Optional[bytes] = None,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._secret = secret or os.urandom(32)
+        self._clock = clock
+        self._data: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def make_key(self, canonical: bytes) -> bytes:
+        """Digest canonical input bytes into a cache key."""
+        return hashlib.blake2b(canonical, key=self._secret, digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key: bytes, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+def cached_compute(
+    cache: Optional[ResultCache],
+    compute: Callable[..., Tuple[list, dict, list, list]],
+    *args: Any,
+    **kwargs: Any
+) -> Tuple[list, dict, list, list]:
+    """
+    Call compute_distribution through the cache.
+    
+    Returns fresh containers and result records on every call, so callers may
+    extend errors or warnings, or modify a result, without touching the cached
+    entry.
+    
+    Args:
+        cache: ResultCache, or None to always compute
+        compute: compute_distribution (or a function with the same signature)
+        *args, **kwargs: Arguments for compute
+    
+    Returns:
+        Tuple of (results list, meta dict, errors list, warnings list)
+    """
+    if cache is None:
+        return compute(*args, **kwargs)
+    
+    key = cache.make_key(canonical_inputs(*args, **kwargs))
+    value = cache.get(key)
+    if value is None:
+        value = compute(*args, **kwargs)
+        cache.set(key, value)
+    results, meta, errors, warnings = value
+    return copy_records(results), dict(meta), list(errors), list(warnings)
@@ -1,52 +1,198 @@
 """Core calculation logic for investment shares."""
-from decimal import Decimal
-from typing import List, Tuple, Dict
-from werkzeug.datastructures import ImmutableMultiDict
+import heapq
+import re
+from dataclasses import dataclass
+from decimal import Context, Decimal, ROUND_HALF_EVEN, localcontext
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional, Sequence, Tuple, Dict
+from pydantic import TypeAdapter
 
 from app.services.models import Investor, RoleBonuses, Project, Result
+from app.services.records import ParticipantLike, ParticipantRecord, ResultRecord, to_models
+from app.services.timing import stage
 
+# Engines accepted by compute_distribution
+ENGINES = ("decimal", "array", "fixed")
 
-def parse_investors(form: ImmutableMultiDict) -> List[Investor]:
+# Rounding policy of the decimal engine:
+# - Each calculation runs in a local context of DECIMAL_PRECISION significant
+#   digits, rounding half-even, whatever the caller's context.
+# - Percentages are quantized to PERCENT_PLACES decimal places, half-even, as
+#   they are produced, and pools are apportioned whole with the largest-remainder
+#   method in units of PERCENT_QUANTUM, ties going to the earlier participant
+#   (as fixed_point.largest_remainder): base shares are payment times
+#   base_pool / cash total (apportion), role pools are split per head with the
+#   leftover units going to the members whose base share was rounded down the
+#   most (split_role_bonus), so equity is rounded as a whole. Equity shares are
+#   the exact sums of their quantized parts, so equity sums to exactly 100%
+#   whenever every pool has a recipient.
+# - Money is not rounded: payments and the Model B property value times its
+#   weight are exact, so shares stay continuous in the inputs (the solver and
+#   sweeps rely on that); responses round money to cents (app.services.serialize).
+# - Profit shares are renormalized, and Model B profit bounds applied, with the
+#   same largest-remainder method, so they sum to exactly 100% and each is
+#   within one unit of its exact value scaled from equity.
+DECIMAL_PRECISION = 20
+MIN_DECIMAL_PRECISION = 16  # keeps 100% exact at PERCENT_PLACES with room for the products
+PERCENT_PLACES = 10
+PERCENT_QUANTUM = Decimal(1).scaleb(-PERCENT_PLACES)
+HUNDRED = Decimal("100")
+
+# Participant form fields: name3/role3/paid3 or participants[3][name]
+PARTICIPANT_FIELD = re.compile(r"(name|role|paid)(\d+)|participants\[(\d+)\]\[(name|role|paid|payment)\]")
+
+# Validates a whole list of participants in one call
+INVESTOR_LIST: TypeAdapter[List[Investor]] = TypeAdapter(List[Investor])
+
+
+@lru_cache(maxsize=None)
+def engine_context(precision: int) -> Context:
+    """
+    Decimal context of the decimal engine.
+    
+    Args:
+        precision: Significant digits, at least MIN_DECIMAL_PRECISION
+    
+    Returns:
+        Context rounding half-even with the default traps
+    """
+    if precision < MIN_DECIMAL_PRECISION:
+        raise ValueError(f"Decimal precision must be at least {MIN_DECIMAL_PRECISION}.")
+    return Context(prec=precision, rounding=ROUND_HALF_EVEN)
+
+
+def set_decimal_precision(precision: int) -> None:
+    """Set the precision compute_distribution uses when none is given (DECIMAL_PRECISION config)."""
+    global DECIMAL_PRECISION
+    engine_context(precision)
+    DECIMAL_PRECISION = precision
+
+
+def apportion(values: Sequence[Decimal], total: Decimal) -> List[Decimal]:
+    """
+    Round percentages to PERCENT_QUANTUM so that they sum to exactly total.
+    
+    Each value is rounded half-even; units missing from total then go to the
+    values with the largest rounding remainders, and units in excess are taken
+    from those with the smallest, ties favouring the earlier value. For values
+    that sum to total this is the largest-remainder method of
+    fixed_point.largest_remainder. Runs in the current context.
+    
+    Args:
+        values: Unrounded, non-negative parts of total
+        total: Sum of the result, a multiple of PERCENT_QUANTUM
+    
+    Returns:
+        List of percentages at PERCENT_PLACES
+    """
+    quantum = PERCENT_QUANTUM
+    rounded = [value.quantize(quantum) for value in values]
+    missing = int((total - sum(rounded, Decimal("0"))).scaleb(PERCENT_PLACES))
+    if missing > 0:
+        # nlargest keeps equal remainders in index order, so earlier values win ties
+        remainders = [value - share for value, share in zip(values, rounded)]
+        for index in heapq.nlargest(missing, range(len(remainders)), key=remainders.__getitem__):
+            rounded[index] += quantum
+    elif missing < 0:
+        # Scanned from the end so that, among equal remainders, later values give units back
+        remainders = [value - share for value, share in zip(values, rounded)]
+        for index in heapq.nsmallest(-missing, reversed(range(len(remainders))), key=remainders.__getitem__):
+            rounded[index] -= quantum
+    return rounded
+
+
+def split_role_bonus(bonus: Decimal, count: int) -> Tuple[Decimal, int]:
+    """
+    Split a role pool over the role's count members.
+    
+    The pool is split per head in whole units of PERCENT_QUANTUM; the leftover
+    units go one each to as many members, so the bonuses sum to exactly the
+    pool. compute_distribution gives them to the members whose base share was
+    rounded down the most; compute_delta reports their count.
+    
+    Args:
+        bonus: Role pool in percent
+        count: Members of the role, at least 1
+    
+    Returns:
+        Tuple of (bonus per member at PERCENT_PLACES, number of leading
+        members that get one PERCENT_QUANTUM more)
+    """
+    units, extra = divmod(int(bonus.quantize(PERCENT_QUANTUM).scaleb(PERCENT_PLACES)), count)
+    return Decimal(units).scaleb(-PERCENT_PLACES), extra
+
+
+def group_participant_fields(form: Mapping[str, str]) -> List[Tuple[int, Dict[str, str]]]:
+    """
+    Group indexed participant fields in one pass over the form.
+    
+    Both name3/role3/paid3 and participants[3][name|role|paid|payment]
+    are accepted; fields with the same index form one row. Missing indexes
+    (deleted rows) are skipped rather than ending the list.
+    
+    Args:
+        form: Form data (first value per key)
+    
+    Returns:
+        (index, {"name", "role", "paid"}) pairs sorted by index
+    """
+    rows: Dict[int, Dict[str, str]] = {}
+    match = PARTICIPANT_FIELD.fullmatch
+    for key, value in form.items():
+        m = match(key)
+        if m is None:
+            continue
+        field, index, bracket_index, bracket_field = m.groups()
+        if field is None:
+            index = bracket_index
+            field = "paid" if bracket_field == "payment" else bracket_field
+        rows.setdefault(int(index), {})[field] = value
+    return sorted(rows.items())
+
+
+def parse_investors(form: Mapping[str, str]) -> List[Investor]:
     """
     Parse investor data from form submission.
     
     Args:
         form: Flask request form data
-        
+    
     Returns:
         List of Investor objects
     """
-    investors = []
-    i = 1
+    return parse_investor_rows(group_participant_fields(form))
+
+
+def parse_investor_rows(grouped: Sequence[Tuple[int, Dict[str, str]]]) -> List[Investor]:
+    """
+    Build Investor objects from grouped form rows, validated in one call.
     
-    while f'name{i}' in form:
-        name = form.get(f'name{i}', '').strip()
-        role = form.get(f'role{i}', '').strip()
-        
+    Rows without a name or role are ignored; Developers never pay.
+    
+    Args:
+        grouped: Output of group_participant_fields
+    
+    Returns:
+        List of Investor objects
+    """
+    rows: List[Dict[str, Any]] = []
+    for _, fields in grouped:
+        name = fields.get('name', '').strip()
+        role = fields.get('role', '').strip()
         if name and role:
-            if role == 'Developer':
-                payment = Decimal("0")
-            else:
-                payment_str = form.get(f'paid{i}', '0') or '0'
-                payment = Decimal(payment_str)
-            
-            investors.append(Investor(
-                name=name,
-                role=role,
-                payment=payment
-            ))
-        i += 1
+            payment = Decimal("0") if role == 'Developer' else Decimal(fields.get('paid') or '0')
+            rows.append({'name': name, 'role': role, 'payment': payment})
     
-    return investors
+    return INVESTOR_LIST.validate_python(rows)
 
 
-def compute_role_counts(investors: List[Investor]) -> dict:
+def compute_role_counts(investors: Sequence[ParticipantLike]) -> dict:
     """
     Count investors by role.
     
     Args:
-        investors: List of Investor objects
-        
+        investors: Investor objects or participant records
+    
     Returns:
         Dictionary with role counts
     """
@@ -65,48 +211,435 @@ def compute_role_counts(investors: List[Investor]) -> dict:
     return counts
 
 
-def compute_distribution(
-    investors: List[Investor],
+def _build_meta(
+    project: Project,
     role_bonuses: RoleBonuses,
+    property_model: str,
+    property_weight: Decimal,
+    property_profit_min_pct: Optional[Decimal],
+    property_profit_max_pct: Optional[Decimal],
+    project_profit: Decimal,
+    is_profitable: bool,
+    role_pool: Decimal,
+    property_pool: Decimal,
+    base_pool: Decimal,
+    property_profit_share_effective: Decimal,
+    cash_total_display: Decimal,
+    totals: Tuple[Any, ...]
+) -> Dict:
+    """Build the meta dict returned by compute_distribution."""
+    total_base_shares, total_role_bonuses, total_property_shares, total_equity_shares, total_profit_shares = totals
+    return {
+        'base_pool': base_pool,
+        'role_pool': role_pool,
+        'property_pool': property_pool,
+        'cash_total': cash_total_display,
+        'total_pct_sum': total_equity_shares,  # Equity total (legacy)
+        'total_pct_sum_equity': total_equity_shares,
+        'total_pct_sum_profit': total_profit_shares,
+        'total_base_shares': total_base_shares,
+        'total_role_bonuses': total_role_bonuses,
+        'total_property_shares': total_property_shares,
+        'project_cost': project.project_cost,
+        'sale_price': project.sale_price,
+        'project_profit': project_profit,
+        'property_value': project.property_value,
+        'property_owner': project.property_owner,
+        'developer_bonus': role_bonuses.developer,
+        'constructor_bonus': role_bonuses.constructor,
+        'investor_bonus': role_bonuses.investor,
+        'property_base_share': role_bonuses.property_base_share if property_model == "A" else Decimal("0"),
+        'property_profit_share_effective': property_profit_share_effective,
+        'is_profitable': is_profitable,
+        'property_model': property_model,
+        'property_weight': property_weight if property_model == "B" else None,
+        'property_profit_min_pct': property_profit_min_pct if property_model == "B" else None,
+        'property_profit_max_pct': property_profit_max_pct if property_model == "B" else None
+    }
+
+
+def _distribute_decimal(
+    investors: Sequence[ParticipantLike],
     project: Project,
-    property_model: str = "A",
-    property_weight: Decimal = None,
-    property_profit_min_pct: Decimal = None,
-    property_profit_max_pct: Decimal = None
-) -> Tuple[List[Result], Dict, List[str], List[str]]:
+    role_bonuses: RoleBonuses,
+    property_model: str,
+    property_weight: Decimal,
+    property_profit_min_pct: Optional[Decimal],
+    property_profit_max_pct: Optional[Decimal],
+    base_pool: Decimal,
+    property_pool: Decimal,
+    is_profitable: bool,
+    errors: List[str],
+    warnings: List[str]
+) -> Tuple[List[ResultRecord], Decimal, Decimal, Tuple[Decimal, Decimal, Decimal, Decimal, Decimal]]:
     """
-    Compute share distribution enforcing a strict 100% budget.
+    Per-participant part of compute_distribution in Decimal arithmetic.
     
-    Property Models:
-    - Model A (Negotiated %): property gets fixed pools; property value excluded from cash base
-    - Model B (Valued contribution): property value participates in base pool; no property pools
+    Runs in the caller's Decimal context (engine_context) and quantizes as
+    documented at DECIMAL_PRECISION. Errors and warnings are appended in place.
     
-    Algorithm:
-    Model A:
-    1. role_pool = developer_bonus + constructor_bonus + investor_bonus
-    2. property_pool = property_base_share + (property_profit_share if profitable else 0)
-    3. base_pool = 100 - role_pool - property_pool
-    4. cash_base_denominator: SUM(payments of non-property participants only)
-    5. property gets entire property_pool; NOT included in base denominator
+    Returns:
+        Tuple of (results, base pool after adjustment, cash total for display,
+        share totals)
+    """
+    quantum = PERCENT_QUANTUM
     
-    Model B:
-    1. role_pool = developer_bonus + constructor_bonus + investor_bonus
-    2. property_pool = 0
-    3. base_pool = 100 - role_pool
-    4. cash_base_denominator: SUM(all cash-like payments) INCLUDING property value
-    5. property's payment = property_value; role bonus = 0
+    # Build participants list (add property owner if exists)
+    # Inputs were validated by the Pydantic models; the engine works on plain records
+    participants = [ParticipantRecord(inv.name, inv.role, inv.payment) for inv in investors]
+    if project.property_owner and project.property_value > 0:
+        participants.append(ParticipantRecord(project.property_owner, "Property Owner", project.property_value))
     
-    Args:
-        investors: List of Investor objects (excluding property owner)
-        role_bonuses: Role bonus percentages
-        project: Project details
-        property_model: "A" for Negotiated %, "B" for Valued contribution
+    # Effective cash: Model A excludes the property owner; in Model B the owner
+    # contributes property_value * property_weight
+    owner_payment_eff = Decimal("0")
+    if property_model == "A":
+        cash_total_eff = sum(p.payment for p in participants if p.role != "Property Owner")
+    else:
+        owner_payment_eff = project.property_value * property_weight
+        cash_total_eff = sum(
+            owner_payment_eff if p.role == "Property Owner" else p.payment for p in participants
+        )
+    
+    # If no cash contributors and base_pool > 0, base shares = 0
+    if cash_total_eff == 0 and base_pool > 0:
+        warnings.append("Base pool cannot be distributed; only role/property pools apply.")
+        base_pool = Decimal("0")
+    
+    # Base shares: payment * (base_pool / cash total), apportioned so they sum
+    # to exactly the base pool
+    base_pool_pct = base_pool.quantize(quantum)
+    base_per_payment = base_pool_pct / cash_total_eff if cash_total_eff > 0 else Decimal("0")
+    property_idx = None
+    base_exact = []
+    for idx, participant in enumerate(participants):
+        if participant.role != "Property Owner":
+            base_exact.append(participant.payment * base_per_payment)
+        else:
+            property_idx = idx
+            # Model A: no base share; Model B: base share from the effective property value
+            base_exact.append(owner_payment_eff * base_per_payment)
+    base_shares = apportion(base_exact, base_pool_pct if base_per_payment else Decimal("0"))
+    
+    # Per-person role bonuses: each role pool is split whole (split_role_bonus),
+    # its leftover units going to the members whose base share was rounded down
+    # the most, so each equity share is the largest-remainder rounding of its
+    # exact value (ties to the earlier member)
+    role_members: Dict[str, List[int]] = {"Developer": [], "Constructor": [], "Investor": []}
+    for idx, participant in enumerate(participants):
+        if participant.role in role_members:
+            role_members[participant.role].append(idx)
+    zero = Decimal("0").quantize(quantum)
+    role_shares = [zero] * len(participants)
+    for role, bonus in (
+        ("Developer", role_bonuses.developer),
+        ("Constructor", role_bonuses.constructor),
+        ("Investor", role_bonuses.investor),
+    ):
+        members = role_members[role]
+        if members:
+            per_head, extra = split_role_bonus(bonus, len(members))
+            for idx in members:
+                role_shares[idx] = per_head
+            for idx in heapq.nlargest(extra, members, key=lambda i: base_exact[i] - base_shares[i]):
+                role_shares[idx] = per_head + quantum
+    
+    # Equity distribution (equity_pct) - used for sale value
+    owner_pool = property_pool.quantize(quantum)
+    equity_shares = []
+    for participant, share_base_pct, share_role_pct in zip(participants, base_shares, role_shares):
+        share_property_pct = zero
+        # Model A: property owner gets entire property_pool; no role bonus in either model
+        if participant.role == "Property Owner" and property_model == "A":
+            share_property_pct = owner_pool
+        # Regular participants: pro-rata base share + per-head role bonus
+        equity_pct = share_base_pct + share_role_pct + share_property_pct
+        equity_shares.append((participant, share_base_pct, share_role_pct, share_property_pct, equity_pct))
+    
+    # Profit distribution (profit_pct) starts from equity, with bounds for Model B.
+    # Scaling and renormalizing are one step: the shares that follow equity are
+    # apportioned what is left of 100%
+    profit_shares = [equity[4] for equity in equity_shares]
+    equity_sum = sum(profit_shares, zero)
+    if property_model == "B" and property_idx is not None and is_profitable:
+        property_equity_pct = profit_shares[property_idx]
+        target_profit_pct = property_equity_pct
+        if property_profit_min_pct is not None:
+            target_profit_pct = max(target_profit_pct, property_profit_min_pct)
+        if property_profit_max_pct is not None:
+            target_profit_pct = min(target_profit_pct, property_profit_max_pct)
         
+        # If target differs from equity, scale the others proportionally
+        if target_profit_pct != property_equity_pct:
+            delta = target_profit_pct - property_equity_pct
+            others = profit_shares[:property_idx] + profit_shares[property_idx + 1:]
+            others_sum = equity_sum - property_equity_pct
+            if others_sum == 0:
+                errors.append("Profit bounds cannot be satisfied with current role/base pools.")
+                return [], base_pool, Decimal("0"), (Decimal("0"),) * 5
+            if others_sum - delta < 0:
+                errors.append("Profit bounds cannot be satisfied; would result in negative allocations.")
+                return [], base_pool, Decimal("0"), (Decimal("0"),) * 5
+            # Scaling the others leaves the profit total at equity_sum
+            property_profit_pct = (target_profit_pct * HUNDRED / equity_sum).quantize(quantum)
+            scale = (HUNDRED - property_profit_pct) / others_sum
+            profit_shares = apportion([share * scale for share in others], HUNDRED - property_profit_pct)
+            profit_shares.insert(property_idx, property_profit_pct)
+            equity_sum = HUNDRED
+    
+    # Renormalize profit shares to exactly 100%
+    if equity_sum > 0 and equity_sum != HUNDRED:
+        scale = HUNDRED / equity_sum
+        profit_shares = apportion([share * scale for share in profit_shares], HUNDRED)
+    
+    results = [
+        ResultRecord(
+            name=participant.name,
+            role=participant.role,
+            payment=participant.payment,
+            share=share_base_pct,  # Base share
+            bonus=share_role_pct,  # Role bonus
+            profit_bonus=share_property_pct,  # Property share (Model A) or 0 (Model B)
+            total_share=equity_pct,  # Equity percentage (for sale value)
+            profit_share=profit_pct  # Profit percentage (for profit distribution)
+        )
+        for (participant, share_base_pct, share_role_pct, share_property_pct, equity_pct), profit_pct
+        in zip(equity_shares, profit_shares)
+    ]
+    
+    totals = (
+        sum((r.share for r in results), zero),
+        sum((r.bonus for r in results), zero),
+        results[property_idx].profit_bonus if property_idx is not None else zero,
+        sum((r.total_share for r in results), zero),
+        sum(profit_shares, zero),
+    )
+    
+    # Cash investment total (for display)
+    # Model A: exclude property from cash total
+    # Model B: include property in cash total
+    if property_model == "A":
+        cash_total_display = sum(p.payment for p in participants if p.role != "Property Owner")
+    else:
+        cash_total_display = sum(p.payment for p in participants)
+    
+    return results, base_pool, Decimal(cash_total_display), totals
+
+
+def _distribute_array(
+    investors: Sequence[ParticipantLike],
+    project: Project,
+    role_bonuses: RoleBonuses,
+    property_model: str,
+    property_weight: Decimal,
+    property_profit_min_pct: Optional[Decimal],
+    property_profit_max_pct: Optional[Decimal],
+    base_pool: Decimal,
+    errors: List[str],
+    warnings: List[str]
+) -> Tuple[List[ResultRecord], Decimal, Decimal, Tuple[Decimal, Decimal, Decimal, Decimal, Decimal]]:
+    """
+    Per-participant part of compute_distribution on contiguous arrays.
+    
+    Payments and role codes are stored in NumPy arrays and all shares are
+    computed by app.services.vectorized in float64; the outputs are converted
+    back to Decimal once at the end. Errors and warnings are appended in place.
+    
     Returns:
-        Tuple of (results list, meta dict, errors list, warnings list)
+        Tuple of (results, base pool after adjustment, cash total for display,
+        share totals)
+    """
+    import numpy as np
+    from app.services import vectorized
+    
+    participants = vectorized.build_participant_arrays(investors, project)
+    params = {
+        "sale_price": project.sale_price,
+        "project_cost": project.project_cost,
+        "property_weight": property_weight,
+        "developer": role_bonuses.developer,
+        "constructor": role_bonuses.constructor,
+        "investor": role_bonuses.investor,
+        "property_base_share": role_bonuses.property_base_share,
+        "property_profit_share": role_bonuses.property_profit_share,
+    }
+    out = vectorized.evaluate_grid(
+        participants,
+        {name: np.asarray([float(value)]) for name, value in params.items()},
+        property_model,
+        None if property_profit_min_pct is None else float(property_profit_min_pct),
+        None if property_profit_max_pct is None else float(property_profit_max_pct)
+    )
+    
+    if out["cash_total_eff"][0] == 0 and base_pool > 0:
+        warnings.append("Base pool cannot be distributed; only role/property pools apply.")
+        base_pool = Decimal("0")
+    
+    if out["status"][0] == vectorized.STATUS_BOUNDS_INFEASIBLE:
+        owner = participants.owner_index
+        others_sum = out["equity"][0].sum() - (out["equity"][0][owner] if owner is not None else 0.0)
+        if others_sum == 0:
+            errors.append("Profit bounds cannot be satisfied with current role/base pools.")
+        else:
+            errors.append("Profit bounds cannot be satisfied; would result in negative allocations.")
+        return [], base_pool, Decimal("0"), (Decimal("0"),) * 5
+    
+    def to_decimal(values: "np.ndarray") -> List[Decimal]:
+        # Convert each distinct value once; role and property columns repeat a lot
+        unique, inverse = np.unique(values, return_inverse=True)
+        converted = [Decimal(repr(v)) for v in unique.tolist()]
+        return [converted[i] for i in inverse.tolist()]
+    
+    payments = [inv.payment for inv in investors]
+    if participants.owner_index is not None:
+        payments.append(project.property_value)
+    columns = zip(
+        participants.names, participants.roles, payments,
+        to_decimal(out["base"][0]), to_decimal(out["role"][0]), to_decimal(out["property"][0]),
+        to_decimal(out["equity"][0]), to_decimal(out["profit"][0])
+    )
+    results = [
+        ResultRecord(
+            name=name, role=role, payment=payment, share=share, bonus=bonus,
+            profit_bonus=profit_bonus, total_share=total_share, profit_share=profit_share
+        )
+        for name, role, payment, share, bonus, profit_bonus, total_share, profit_share in columns
+    ]
+    
+    owner_mask = participants.role_codes == vectorized.PROPERTY_OWNER
+    sums = [
+        Decimal(repr(float(value))) for value in (
+            out["base"][0].sum(),
+            out["role"][0].sum(),
+            out["property"][0][owner_mask].sum(),
+            out["equity"][0].sum(),
+            out["profit"][0].sum(),
+        )
+    ]
+    totals = (sums[0], sums[1], sums[2], sums[3], sums[4])
+    
+    # Cash investment total (for display), summed exactly
+    cash_total_display = sum(inv.payment for inv in investors)
+    if property_model == "B" and participants.owner_index is not None:
+        cash_total_display += project.property_value
+    
+    return results, base_pool, Decimal(cash_total_display), totals
+
+
+def _distribute_fixed(
+    investors: Sequence[ParticipantLike],
+    project: Project,
+    role_bonuses: RoleBonuses,
+    property_model: str,
+    property_weight: Decimal,
+    property_profit_min_pct: Optional[Decimal],
+    property_profit_max_pct: Optional[Decimal],
+    base_pool: Decimal,
+    property_pool: Decimal,
+    is_profitable: bool,
+    errors: List[str],
+    warnings: List[str]
+) -> Tuple[List[ResultRecord], Decimal, Decimal, Tuple[Decimal, Decimal, Decimal, Decimal, Decimal]]:
+    """
+    Per-participant part of compute_distribution in scaled-integer arithmetic.
+    
+    Amounts are integer cents and percentages integer units of 1e-8 %; see
+    app.services.fixed_point for the rounding policy. Errors and warnings are
+    appended in place.
+    
+    Returns:
+        Tuple of (results, base pool after adjustment, cash total for display,
+        share totals)
+    """
+    from app.services import fixed_point as fp
+    
+    names = [inv.name for inv in investors]
+    roles = [inv.role for inv in investors]
+    payments = [inv.payment for inv in investors]
+    owner_index = None
+    if project.property_owner and project.property_value > 0:
+        owner_index = len(names)
+        names.append(project.property_owner)
+        roles.append("Property Owner")
+        payments.append(project.property_value)
+    
+    out = fp.distribute(
+        [fp.to_cents(p) for p in payments], roles, owner_index, property_model,
+        fp.to_pct_units(base_pool), fp.to_pct_units(property_pool),
+        {
+            "Developer": fp.to_pct_units(role_bonuses.developer),
+            "Constructor": fp.to_pct_units(role_bonuses.constructor),
+            "Investor": fp.to_pct_units(role_bonuses.investor),
+        },
+        fp.to_units(property_weight, fp.WEIGHT_SCALE), is_profitable,
+        None if property_profit_min_pct is None else fp.to_pct_units(property_profit_min_pct),
+        None if property_profit_max_pct is None else fp.to_pct_units(property_profit_max_pct)
+    )
+    
+    if out.cash_total_eff == 0 and base_pool > 0:
+        warnings.append("Base pool cannot be distributed; only role/property pools apply.")
+        base_pool = Decimal("0")
+    if out.error:
+        errors.append(out.error)
+        return [], base_pool, Decimal("0"), (Decimal("0"),) * 5
+    
+    pct = fp.from_pct_units
+    results = [
+        ResultRecord(
+            name=names[i], role=roles[i], payment=payments[i],
+            share=pct(out.base[i]), bonus=pct(out.role[i]), profit_bonus=pct(out.property[i]),
+            total_share=pct(out.equity[i]), profit_share=pct(out.profit[i])
+        )
+        for i in range(len(names))
+    ]
+    totals = (
+        pct(sum(out.base)),
+        pct(sum(out.role)),
+        pct(out.property[owner_index]) if owner_index is not None else Decimal("0"),
+        pct(sum(out.equity)),
+        pct(sum(out.profit)),
+    )
+    
+    cash_total_display = sum(payments[:len(investors)], Decimal("0"))
+    if property_model == "B" and owner_index is not None:
+        cash_total_display += project.property_value
+    
+    return results, base_pool, cash_total_display, totals
+
+
+@dataclass(frozen=True)
+class ScenarioPools:
+    """Normalized scenario parameters and share pools, independent of participants."""
+    property_model: str
+    property_weight: Decimal
+    property_profit_min_pct: Optional[Decimal]
+    property_profit_max_pct: Optional[Decimal]
+    project_profit: Decimal
+    is_profitable: bool
+    role_pool: Decimal
+    property_pool: Decimal
+    base_pool: Decimal
+    property_profit_share_effective: Decimal
+
+
+def compute_pools(
+    role_bonuses: RoleBonuses,
+    project: Project,
+    property_model: str,
+    property_weight: Optional[Decimal],
+    property_profit_min_pct: Optional[Decimal],
+    property_profit_max_pct: Optional[Decimal]
+) -> Tuple[Optional[ScenarioPools], List[str], List[str]]:
+    """
+    Validate scenario parameters and compute the share pools.
+    
+    This is the participant-independent first stage of compute_distribution.
+    
+    Returns:
+        Tuple of (ScenarioPools or None on a blocking error, errors list, warnings list)
     """
-    errors = []
-    warnings = []
+    errors: List[str] = []
+    warnings: List[str] = []
     
     # Normalize property_model
     property_model = property_model.upper() if property_model else "A"
@@ -128,17 +661,17 @@ def compute_distribution(
     if property_model == "B":
         if property_weight < 0:
             errors.append("Property weight must be >= 0.")
-            return [], {}, errors, warnings
+            return None, errors, warnings
         if property_profit_min_pct is not None and (property_profit_min_pct < 0 or property_profit_min_pct > 100):
             errors.append("Property profit min must be between 0 and 100.")
-            return [], {}, errors, warnings
+            return None, errors, warnings
         if property_profit_max_pct is not None and (property_profit_max_pct < 0 or property_profit_max_pct > 100):
             errors.append("Property profit max must be between 0 and 100.")
-            return [], {}, errors, warnings
+            return None, errors, warnings
         if property_profit_min_pct is not None and property_profit_max_pct is not None:
             if property_profit_min_pct > property_profit_max_pct:
                 errors.append("Property profit min cannot be greater than max.")
-                return [], {}, errors, warnings
+                return None, errors, warnings
         if property_weight > 2:
             warnings.append(f"Property weight ({property_weight:.2f}) is above recommended range (0.5–2.0).")
     
@@ -165,7 +698,7 @@ def compute_distribution(
                 f"Share budget exceeds 100% by {excess:.2f}%. "
                 f"Reduce role pools ({role_pool:.2f}%) or property pool ({property_pool:.2f}%)."
             )
-            return [], {}, errors, warnings
+            return None, errors, warnings
         
         # Warn if not profitable
         if not is_profitable and project.property_value > 0:
@@ -182,215 +715,126 @@ def compute_distribution(
                 f"Share budget exceeds 100% by {excess:.2f}%. "
                 f"Reduce role pools ({role_pool:.2f}%)."
             )
-            return [], {}, errors, warnings
+            return None, errors, warnings
         
         # Warn if property owner provided but value <= 0
         if project.property_owner and project.property_value <= 0:
             warnings.append("Property owner name provided but property value is 0 or missing.")
     
-    # Build participants list (add property owner if exists)
-    participants = list(investors)
-    has_property_owner = project.property_owner and project.property_value > 0
-    if has_property_owner:
-        participants.append(Investor(
-            name=project.property_owner,
-            role="Property Owner",
-            payment=project.property_value,
-            property_profit_share=Decimal("0")  # Not used in Model B, but keep for consistency
-        ))
-    
-    if not participants:
-        errors.append("At least one investor or property owner is required.")
-        return [], {}, errors, warnings
+    return ScenarioPools(
+        property_model=property_model,
+        property_weight=property_weight,
+        property_profit_min_pct=property_profit_min_pct,
+        property_profit_max_pct=property_profit_max_pct,
+        project_profit=project_profit,
+        is_profitable=is_profitable,
+        role_pool=role_pool,
+        property_pool=property_pool,
+        base_pool=base_pool,
+        property_profit_share_effective=property_profit_share_effective if property_model == "A" else Decimal("0"),
+    ), errors, warnings
+
+
+def compute_distribution(
+    investors: Sequence[ParticipantLike],
+    role_bonuses: RoleBonuses,
+    project: Project,
+    property_model: str = "A",
+    property_weight: Optional[Decimal] = None,
+    property_profit_min_pct: Optional[Decimal] = None,
+    property_profit_max_pct: Optional[Decimal] = None,
+    engine: str = "decimal",
+    precision: Optional[int] = None
+) -> Tuple[List[ResultRecord], Dict, List[str], List[str]]:
+    """
+    Compute share distribution enforcing a strict 100% budget.
     
-    # Compute role counts
-    role_counts = compute_role_counts(participants)
+    Property Models:
+    - Model A (Negotiated %): property gets fixed pools; property value excluded from cash base
+    - Model B (Valued contribution): property value participates in base pool; no property pools
     
-    # Calculate per-person role bonuses
-    dev_bonus_per_person = (
-        role_bonuses.developer / Decimal(str(role_counts['developer']))
-        if role_counts['developer'] > 0 else Decimal("0")
-    )
-    const_bonus_per_person = (
-        role_bonuses.constructor / Decimal(str(role_counts['constructor']))
-        if role_counts['constructor'] > 0 else Decimal("0")
-    )
-    inv_bonus_per_person = (
-        role_bonuses.investor / Decimal(str(role_counts['investor']))
-        if role_counts['investor'] > 0 else Decimal("0")
-    )
+    Algorithm:
+    Model A:
+    1. role_pool = developer_bonus + constructor_bonus + investor_bonus
+    2. property_pool = property_base_share + (property_profit_share if profitable else 0)
+    3. base_pool = 100 - role_pool - property_pool
+    4. cash_base_denominator: SUM(payments of non-property participants only)
+    5. property gets entire property_pool; NOT included in base denominator
     
-    # Calculate effective cash and equity distribution
-    if property_model == "A":
-        # Model A: exclude property owner from cash base denominator
-        cash_contributors = [
-            p for p in participants
-            if p.role != "Property Owner" and p.payment > 0
-        ]
-        cash_total_eff = sum(p.payment for p in cash_contributors)
-    else:
-        # Model B: calculate effective cash with property_weight
-        # For each participant, effective payment = payment
-        # For property owner, effective payment = property_value * property_weight
-        cash_total_eff = Decimal("0")
-        for p in participants:
-            if p.role == "Property Owner":
-                cash_total_eff += project.property_value * property_weight
-            else:
-                cash_total_eff += p.payment
+    Model B:
+    1. role_pool = developer_bonus + constructor_bonus + investor_bonus
+    2. property_pool = 0
+    3. base_pool = 100 - role_pool
+    4. cash_base_denominator: SUM(all cash-like payments) INCLUDING property value
+    5. property's payment = property_value; role bonus = 0
     
-    # If no cash contributors and base_pool > 0, base shares = 0
-    if cash_total_eff == 0 and base_pool > 0:
-        warnings.append("Base pool cannot be distributed; only role/property pools apply.")
-        base_pool = Decimal("0")
-    
-    # Calculate equity distribution (equity_pct) - used for sale value
-    equity_shares = []
-    for participant in participants:
-        share_base_pct = Decimal("0")
-        share_role_pct = Decimal("0")
-        share_property_pct = Decimal("0")
-        
-        if participant.role == "Property Owner":
-            if property_model == "A":
-                # Model A: property owner gets entire property_pool
-                share_property_pct = property_pool
-            else:
-                # Model B: property owner gets base share from effective property value
-                if cash_total_eff > 0 and base_pool > 0:
-                    eff_payment = project.property_value * property_weight
-                    share_base_pct = (eff_payment / cash_total_eff) * base_pool
-                # No role bonus for property owner in Model B
-        else:
-            # Regular participants: base share + role bonus
-            # Base share: distribute base_pool pro-rata by cash contribution
-            if cash_total_eff > 0 and base_pool > 0:
-                share_base_pct = (participant.payment / cash_total_eff) * base_pool
-            
-            # Role bonus: per-head split
-            if participant.role == "Developer":
-                share_role_pct = dev_bonus_per_person
-            elif participant.role == "Constructor":
-                share_role_pct = const_bonus_per_person
-            elif participant.role == "Investor":
-                share_role_pct = inv_bonus_per_person
-        
-        equity_pct = share_base_pct + share_role_pct + share_property_pct
-        equity_shares.append((participant, share_base_pct, share_role_pct, share_property_pct, equity_pct))
-    
-    # Calculate profit distribution (profit_pct) - with bounds for Model B
-    profit_shares = []
-    property_idx = None
-    
-    for idx, (participant, share_base_pct, share_role_pct, share_property_pct, equity_pct) in enumerate(equity_shares):
-        if participant.role == "Property Owner":
-            property_idx = idx
-        profit_shares.append(equity_pct)  # Start with equity_pct
+    Args:
+        investors: Investor objects or participant records (excluding property owner)
+        role_bonuses: Role bonus percentages
+        project: Project details
+        property_model: "A" for Negotiated %, "B" for Valued contribution
+        engine: "decimal" (default) for Decimal arithmetic with the rounding
+            policy documented at DECIMAL_PRECISION, "array" to compute all
+            shares on contiguous float64 arrays (meant for very large cap
+            tables), or "fixed" for scaled-integer arithmetic with the rounding
+            policy documented in app.services.fixed_point
+        precision: Significant digits of the decimal engine's context
+            (default DECIMAL_PRECISION)
     
-    # Apply profit bounds for Model B
-    if property_model == "B" and property_idx is not None and is_profitable:
-        property_equity_pct = profit_shares[property_idx]
-        target_profit_pct = property_equity_pct
-        
-        # Apply min/max bounds
-        if property_profit_min_pct is not None:
-            target_profit_pct = max(target_profit_pct, property_profit_min_pct)
-        if property_profit_max_pct is not None:
-            target_profit_pct = min(target_profit_pct, property_profit_max_pct)
-        
-        # If target differs from equity, adjust others proportionally
-        if target_profit_pct != property_equity_pct:
-            delta = target_profit_pct - property_equity_pct
-            
-            # Calculate sum of others
-            others_sum = sum(profit_shares[i] for i in range(len(profit_shares)) if i != property_idx)
-            
-            if others_sum == 0 and delta != 0:
-                errors.append("Profit bounds cannot be satisfied with current role/base pools.")
-                return [], {}, errors, warnings
-            
-            # Adjust others proportionally
-            if others_sum > 0:
-                for i in range(len(profit_shares)):
-                    if i != property_idx:
-                        # Scale down/up proportionally
-                        profit_shares[i] = profit_shares[i] * (others_sum - delta) / others_sum
-                        if profit_shares[i] < 0:
-                            errors.append("Profit bounds cannot be satisfied; would result in negative allocations.")
-                            return [], {}, errors, warnings
-            
-            # Set property profit to target
-            profit_shares[property_idx] = target_profit_pct
-    
-    # Renormalize profit shares to exactly 100% (handle rounding drift)
-    profit_sum = sum(profit_shares)
-    if profit_sum > 0:
-        # Normalize to 100%
-        for i in range(len(profit_shares)):
-            profit_shares[i] = (profit_shares[i] / profit_sum) * Decimal("100")
-    
-    # Build results
-    results = []
-    for idx, (participant, share_base_pct, share_role_pct, share_property_pct, equity_pct) in enumerate(equity_shares):
-        profit_pct = profit_shares[idx]
-        
-        # Calculate final values (stored in Result model via total_share and profit_share)
-        # These are calculated in the template/results rendering, not stored here
-        
-        results.append(Result(
-            name=participant.name,
-            role=participant.role,
-            payment=participant.payment,
-            share=share_base_pct,  # Base share
-            bonus=share_role_pct,  # Role bonus
-            profit_bonus=share_property_pct,  # Property share (Model A) or 0 (Model B)
-            total_share=equity_pct,  # Equity percentage (for sale value)
-            profit_share=profit_pct  # Profit percentage (for profit distribution) - NEW
-        ))
+    Returns:
+        Tuple of (results list, meta dict, errors list, warnings list). Results
+        are ResultRecord objects; use records.to_models for Pydantic Results
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'; expected one of {', '.join(ENGINES)}.")
     
-    # Calculate totals
-    total_base_shares = sum(r.share for r in results)
-    total_role_bonuses = sum(r.bonus for r in results)
-    total_property_shares = sum(r.profit_bonus for r in results if r.role == "Property Owner")
-    total_equity_shares = sum(r.total_share for r in results)
-    total_profit_shares = sum(r.profit_share if r.profit_share is not None else r.total_share for r in results)
+    with stage("validate"):
+        pools, errors, warnings = compute_pools(
+            role_bonuses, project, property_model, property_weight,
+            property_profit_min_pct, property_profit_max_pct
+        )
+    if pools is None:
+        return [], {}, errors, warnings
+    property_model = pools.property_model
+    property_weight = pools.property_weight
+    property_profit_min_pct = pools.property_profit_min_pct
+    property_profit_max_pct = pools.property_profit_max_pct
+    project_profit = pools.project_profit
+    is_profitable = pools.is_profitable
+    role_pool = pools.role_pool
+    property_pool = pools.property_pool
+    base_pool = pools.base_pool
+    property_profit_share_effective = pools.property_profit_share_effective
     
-    # Cash investment total (for display)
-    # Model A: exclude property from cash total
-    # Model B: include property in cash total
-    if property_model == "A":
-        cash_total_display = sum(p.payment for p in participants if p.role != "Property Owner")
+    if not investors and not (project.property_owner and project.property_value > 0):
+        errors.append("At least one investor or property owner is required.")
+        return [], {}, errors, warnings
+    if engine == "array":
+        results, base_pool, cash_total_display, totals = _distribute_array(
+            investors, project, role_bonuses, property_model, property_weight,
+            property_profit_min_pct, property_profit_max_pct, base_pool, errors, warnings
+        )
+    elif engine == "fixed":
+        results, base_pool, cash_total_display, totals = _distribute_fixed(
+            investors, project, role_bonuses, property_model, property_weight,
+            property_profit_min_pct, property_profit_max_pct, base_pool, property_pool,
+            is_profitable, errors, warnings
+        )
     else:
-        cash_total_display = sum(p.payment for p in participants)
-    
-    meta = {
-        'base_pool': base_pool,
-        'role_pool': role_pool,
-        'property_pool': property_pool,
-        'cash_total': cash_total_display,
-        'total_pct_sum': total_equity_shares,  # Equity total (legacy)
-        'total_pct_sum_equity': total_equity_shares,
-        'total_pct_sum_profit': total_profit_shares,
-        'total_base_shares': total_base_shares,
-        'total_role_bonuses': total_role_bonuses,
-        'total_property_shares': total_property_shares,
-        'project_cost': project.project_cost,
-        'sale_price': project.sale_price,
-        'project_profit': project_profit,
-        'property_value': project.property_value,
-        'property_owner': project.property_owner,
-        'developer_bonus': role_bonuses.developer,
-        'constructor_bonus': role_bonuses.constructor,
-        'investor_bonus': role_bonuses.investor,
-        'property_base_share': role_bonuses.property_base_share if property_model == "A" else Decimal("0"),
-        'property_profit_share_effective': property_profit_share_effective if property_model == "A" else Decimal("0"),
-        'is_profitable': is_profitable,
-        'property_model': property_model,
-        'property_weight': property_weight if property_model == "B" else None,
-        'property_profit_min_pct': property_profit_min_pct if property_model == "B" else None,
-        'property_profit_max_pct': property_profit_max_pct if property_model == "B" else None
-    }
-    
+        with localcontext(engine_context(precision or DECIMAL_PRECISION)):
+            results, base_pool, cash_total_display, totals = _distribute_decimal(
+                investors, project, role_bonuses, property_model, property_weight,
+                property_profit_min_pct, property_profit_max_pct, base_pool, property_pool,
+                is_profitable, errors, warnings
+            )
+    if errors:
+        return [], {}, errors, warnings
+    meta = _build_meta(
+        project, role_bonuses, property_model, property_weight,
+        property_profit_min_pct, property_profit_max_pct,
+        project_profit, is_profitable, role_pool, property_pool, base_pool,
+        property_profit_share_effective, cash_total_display, totals
+    )
     return results, meta, errors, warnings
 
 
@@ -406,14 +850,15 @@ def compute_shares(
         investors: List of Investor objects
         role_bonuses: Role bonus percentages
         project: Project details
-        
+    
     Returns:
         Tuple of (list of Result objects, totals dictionary)
     """
-    results, meta, errors, warnings = compute_distribution(investors, role_bonuses, project)
+    records, meta, errors, warnings = compute_distribution(investors, role_bonuses, project)
     
     if errors:
         raise ValueError(errors[0])
+    results = to_models(records)
     
     # Convert meta to totals format for backward compatibility
     totals = {
@@ -430,3 +875,648 @@ def compute_shares(
     
     return results, totals
 
+
+
+def _check_model_b(
+    weights: Any,
+    property_profit_min_pct: Optional[Decimal],
+    property_profit_max_pct: Optional[Decimal],
+    errors: List[str],
+    warnings: List[str]
+) -> bool:
+    """
+    Validate Model B inputs of a vectorized run; errors and warnings are appended in place.
+    
+    Args:
+        weights: Array of the property weights used
+        property_profit_min_pct: Lower bound on the owner's profit share
+        property_profit_max_pct: Upper bound on the owner's profit share
+    
+    Returns:
+        True when the run must stop
+    """
+    if (weights < 0).any():
+        errors.append("Property weight must be >= 0.")
+        return True
+    for label, bound in (("min", property_profit_min_pct), ("max", property_profit_max_pct)):
+        if bound is not None and (bound < 0 or bound > 100):
+            errors.append(f"Property profit {label} must be between 0 and 100.")
+            return True
+    if property_profit_min_pct is not None and property_profit_max_pct is not None:
+        if property_profit_min_pct > property_profit_max_pct:
+            errors.append("Property profit min cannot be greater than max.")
+            return True
+    if (weights > 2).any():
+        warnings.append("Some property weights are above recommended range (0.5–2.0).")
+    return False
+
+
+def _engine_deviation(
+    investors: List[Investor],
+    project: Project,
+    params: Mapping[str, Any],
+    grid_out: Mapping[str, Any],
+    indices: Sequence[int],
+    property_model: str,
+    property_profit_min_pct: Optional[Decimal],
+    property_profit_max_pct: Optional[Decimal]
+) -> float:
+    """
+    Re-compute vectorized scenarios with compute_distribution.
+    
+    Args:
+        investors: Investor objects (excluding property owner)
+        project: Project details for fields that are not scenario parameters
+        params: Scenario parameter arrays passed to evaluate_grid
+        grid_out: Its output
+        indices: Scenarios to check
+    
+    Returns:
+        Largest deviation of equity and profit shares, in percentage points
+    """
+    import numpy as np
+    from app.services import vectorized
+    
+    max_deviation = 0.0
+    for index in indices:
+        point = {name: Decimal(repr(float(params[name][index]))) for name in vectorized.GRID_PARAMETERS}
+        results, _, point_errors, _ = compute_distribution(
+            investors,
+            RoleBonuses(
+                developer=point["developer"],
+                constructor=point["constructor"],
+                investor=point["investor"],
+                property_base_share=point["property_base_share"],
+                property_profit_share=point["property_profit_share"]
+            ),
+            project.model_copy(update={
+                "sale_price": point["sale_price"],
+                "project_cost": point["project_cost"]
+            }),
+            property_model, point["property_weight"],
+            property_profit_min_pct, property_profit_max_pct
+        )
+        if point_errors:
+            continue
+        expected_equity = np.asarray([float(r.total_share) for r in results])
+        expected_profit = np.asarray([float(r.profit_share) for r in results])
+        max_deviation = max(
+            max_deviation,
+            float(np.abs(grid_out["equity"][index] - expected_equity).max()),
+            float(np.abs(grid_out["profit"][index] - expected_profit).max())
+        )
+    return max_deviation
+
+
+def compute_sweep(
+    investors: List[Investor],
+    role_bonuses: RoleBonuses,
+    project: Project,
+    axes: Mapping[str, Sequence[Decimal]],
+    property_model: str = "A",
+    property_weight: Optional[Decimal] = None,
+    property_profit_min_pct: Optional[Decimal] = None,
+    property_profit_max_pct: Optional[Decimal] = None,
+    tolerance: float = 1e-6,
+    verify_points: int = 3
+) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """
+    Evaluate the distribution over a grid of scenario parameters.
+    
+    Every combination of the axis values is evaluated in one vectorized pass
+    (see app.services.vectorized). A few grid points are re-computed with
+    compute_distribution and the largest deviation must stay within tolerance.
+    
+    Args:
+        investors: List of Investor objects (excluding property owner)
+        role_bonuses: Role bonus percentages for parameters without an axis
+        project: Project details for parameters without an axis
+        axes: Values per swept parameter; keys from GRID_PARAMETERS
+            (sale_price, project_cost, property_weight or a RoleBonuses field)
+        property_model: "A" for Negotiated %, "B" for Valued contribution
+        tolerance: Maximum allowed deviation from the Decimal engine, in
+            percentage points
+        verify_points: Number of grid points checked against the Decimal engine
+    
+    Returns:
+        Tuple of (sweep dict, errors list, warnings list). The sweep dict holds
+        the axes, the grid shape, participant names/roles, a status array of
+        the grid shape and per-participant arrays of shape (*grid, participants)
+    """
+    import numpy as np
+    from app.services import vectorized
+    
+    errors: List[str] = []
+    warnings: List[str] = []
+    
+    property_model = (property_model or "A").upper()
+    if property_model not in ["A", "B"]:
+        property_model = "A"
+    
+    unknown = [name for name in axes if name not in vectorized.GRID_PARAMETERS]
+    if unknown:
+        errors.append(f"Unknown sweep parameter(s): {', '.join(unknown)}.")
+        return {}, errors, warnings
+    if any(len(values) == 0 for values in axes.values()):
+        errors.append("Every sweep axis needs at least one value.")
+        return {}, errors, warnings
+    
+    weight = Decimal("1.0") if property_weight is None else Decimal(str(property_weight))
+    base_values = {
+        "sale_price": project.sale_price,
+        "project_cost": project.project_cost,
+        "property_weight": weight,
+        "developer": role_bonuses.developer,
+        "constructor": role_bonuses.constructor,
+        "investor": role_bonuses.investor,
+        "property_base_share": role_bonuses.property_base_share,
+        "property_profit_share": role_bonuses.property_profit_share,
+    }
+    axis_arrays = {name: np.asarray([float(v) for v in values], dtype=np.float64) for name, values in axes.items()}
+    
+    # Validate inputs that compute_distribution rejects for every scenario
+    if any((axis_arrays[name] < 0).any() for name in axis_arrays if name != "property_weight"):
+        errors.append("Sweep values must be non-negative.")
+        return {}, errors, warnings
+    if any((axis_arrays[name] > 100).any() for name in axis_arrays if name in RoleBonuses.model_fields):
+        errors.append("Role bonus sweep values must be between 0 and 100.")
+        return {}, errors, warnings
+    if property_model == "B":
+        weights = axis_arrays.get("property_weight", np.asarray([float(weight)]))
+        if _check_model_b(weights, property_profit_min_pct, property_profit_max_pct, errors, warnings):
+            return {}, errors, warnings
+    
+    participants = vectorized.build_participant_arrays(investors, project)
+    if len(participants) == 0:
+        errors.append("At least one investor or property owner is required.")
+        return {}, errors, warnings
+    
+    # Cartesian product of the axes, flattened to G scenarios
+    names = list(axis_arrays)
+    shape = tuple(len(axis_arrays[name]) for name in names)
+    mesh = np.meshgrid(*(axis_arrays[name] for name in names), indexing="ij")
+    size = int(np.prod(shape))
+    params = {name: np.full(size, float(value)) for name, value in base_values.items()}
+    for name, grid in zip(names, mesh):
+        params[name] = grid.ravel()
+    
+    grid_out = vectorized.evaluate_grid(
+        participants, params, property_model,
+        None if property_profit_min_pct is None else float(property_profit_min_pct),
+        None if property_profit_max_pct is None else float(property_profit_max_pct)
+    )
+    
+    # Spot-check evenly spaced valid grid points against the Decimal engine
+    max_deviation = 0.0
+    valid = np.flatnonzero(grid_out["status"] == vectorized.STATUS_OK)
+    if valid.size and verify_points > 0:
+        picks = np.unique(valid[np.linspace(0, valid.size - 1, min(verify_points, valid.size)).astype(int)])
+        max_deviation = _engine_deviation(
+            investors, project, params, grid_out, [int(index) for index in picks],
+            property_model, property_profit_min_pct, property_profit_max_pct
+        )
+    if max_deviation > tolerance:
+        errors.append(
+            f"Vectorized sweep deviates from the Decimal engine by {max_deviation:.2e} "
+            f"percentage points (tolerance {tolerance:.2e})."
+        )
+    
+    if (grid_out["status"] == vectorized.STATUS_BUDGET_EXCEEDED).any():
+        warnings.append("Share budget exceeds 100% at some grid points; they are marked with status 1.")
+    if (grid_out["status"] == vectorized.STATUS_BOUNDS_INFEASIBLE).any():
+        warnings.append("Profit bounds cannot be satisfied at some grid points; they are marked with status 2.")
+    
+    n = len(participants)
+    sweep = {
+        "axes": axis_arrays,
+        "shape": shape,
+        "names": participants.names,
+        "roles": participants.roles,
+        "status": grid_out["status"].reshape(shape),
+        "max_deviation": max_deviation,
+    }
+    for key in ("project_profit", "base_pool"):
+        sweep[key] = grid_out[key].reshape(shape)
+    for key in ("base", "role", "property", "equity", "profit", "final_value", "profit_value"):
+        sweep[key] = grid_out[key].reshape(shape + (n,))
+    
+    return sweep, errors, warnings
+
+
+def compute_simulation(
+    investors: List[Investor],
+    role_bonuses: RoleBonuses,
+    project: Project,
+    distributions: Mapping[str, Any],
+    draws: int,
+    seed: int,
+    property_model: str = "A",
+    property_weight: Optional[Decimal] = None,
+    property_profit_min_pct: Optional[Decimal] = None,
+    property_profit_max_pct: Optional[Decimal] = None,
+    percentiles: Optional[Sequence[float]] = None,
+    bins: int = 20,
+    workers: int = 0,
+    tolerance: float = 1e-6,
+    verify_points: int = 3
+) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """
+    Monte Carlo simulation of the distribution over uncertain sale price and project cost.
+    
+    Draws are evaluated in vectorized chunks (see app.services.simulation),
+    optionally in a process pool; the same seed gives the same draws for any
+    number of workers. Statistics cover the draws whose status is ok. A few
+    draws are re-computed with compute_distribution and the largest deviation
+    must stay within tolerance.
+    
+    Args:
+        investors: List of Investor objects (excluding property owner)
+        role_bonuses: Role bonus percentages
+        project: Project details; sale price and cost are used when not drawn
+        distributions: DistributionSpec per drawn parameter (sale_price, project_cost)
+        draws: Number of scenarios
+        seed: Seed of the random streams
+        property_model: "A" for Negotiated %, "B" for Valued contribution
+        percentiles: Percentiles to report, 0-100 (default PERCENTILES)
+        bins: Histogram bins per participant
+        workers: Processes for the chunks; 0 or 1 runs them in this process
+        tolerance: Maximum allowed deviation from the Decimal engine, in
+            percentage points
+        verify_points: Number of draws checked against the Decimal engine
+    
+    Returns:
+        Tuple of (simulation dict, errors list, warnings list). The simulation
+        dict holds participant names/roles, status counts, summaries of the
+        drawn parameters and the project profit, and per-participant summaries
+        (app.services.simulation.summarize) of final_value, profit_value and
+        profit (%), with histograms
+    """
+    import numpy as np
+    from app.services import simulation, vectorized
+    
+    errors: List[str] = []
+    warnings: List[str] = []
+    
+    property_model = (property_model or "A").upper()
+    if property_model not in ["A", "B"]:
+        property_model = "A"
+    
+    unknown = [name for name in distributions if name not in simulation.SIMULATED_PARAMETERS]
+    if unknown:
+        errors.append(f"Unknown simulation parameter(s): {', '.join(unknown)}.")
+        return {}, errors, warnings
+    if draws < 1:
+        errors.append("At least one draw is required.")
+        return {}, errors, warnings
+    percentiles = simulation.PERCENTILES if percentiles is None else percentiles
+    if bins < 1:
+        errors.append("At least one histogram bin is required.")
+        return {}, errors, warnings
+    if any(not 0 <= q <= 100 for q in percentiles):
+        errors.append("Percentiles must be between 0 and 100.")
+        return {}, errors, warnings
+    
+    weight = Decimal("1.0") if property_weight is None else Decimal(str(property_weight))
+    if property_model == "B":
+        if _check_model_b(np.asarray([float(weight)]), property_profit_min_pct, property_profit_max_pct, errors, warnings):
+            return {}, errors, warnings
+    
+    participants = vectorized.build_participant_arrays(investors, project)
+    if len(participants) == 0:
+        errors.append("At least one investor or property owner is required.")
+        return {}, errors, warnings
+    
+    base = {
+        "sale_price": float(project.sale_price),
+        "project_cost": float(project.project_cost),
+        "property_weight": float(weight),
+        "developer": float(role_bonuses.developer),
+        "constructor": float(role_bonuses.constructor),
+        "investor": float(role_bonuses.investor),
+        "property_base_share": float(role_bonuses.property_base_share),
+        "property_profit_share": float(role_bonuses.property_profit_share),
+    }
+    min_pct = None if property_profit_min_pct is None else float(property_profit_min_pct)
+    max_pct = None if property_profit_max_pct is None else float(property_profit_max_pct)
+    sample = simulation.run_simulation(
+        participants, base, distributions, draws, seed, property_model, min_pct, max_pct, workers
+    )
+    
+    status = sample["status"]
+    counts = simulation.status_counts(status)
+    valid = np.flatnonzero(status == vectorized.STATUS_OK)
+    if counts["budget_exceeded"]:
+        warnings.append(f"Share budget exceeds 100% in {counts['budget_exceeded']} draws; they are left out.")
+    if counts["bounds_infeasible"]:
+        warnings.append(f"Profit bounds cannot be satisfied in {counts['bounds_infeasible']} draws; they are left out.")
+    if valid.size == 0:
+        errors.append("No draw produced a valid distribution.")
+        return {}, errors, warnings
+    
+    # Spot-check evenly spaced valid draws against the Decimal engine
+    max_deviation = 0.0
+    if verify_points > 0:
+        picks = np.unique(valid[np.linspace(0, valid.size - 1, min(verify_points, valid.size)).astype(int)])
+        params = {name: np.full(picks.size, value) for name, value in base.items()}
+        for name in simulation.SIMULATED_PARAMETERS:
+            params[name] = sample[name][picks]
+        point_out = vectorized.evaluate_grid(participants, params, property_model, min_pct, max_pct)
+        max_deviation = _engine_deviation(
+            investors, project, params, point_out, range(picks.size),
+            property_model, property_profit_min_pct, property_profit_max_pct
+        )
+    if max_deviation > tolerance:
+        errors.append(
+            f"Vectorized simulation deviates from the Decimal engine by {max_deviation:.2e} "
+            f"percentage points (tolerance {tolerance:.2e})."
+        )
+    
+    result = {
+        "draws": draws,
+        "seed": seed,
+        "names": participants.names,
+        "roles": participants.roles,
+        "status_counts": counts,
+        "percentiles": list(percentiles),
+        "max_deviation": max_deviation,
+    }
+    if valid.size < draws:
+        sample = {key: values[valid] for key, values in sample.items()}
+    for key in ("sale_price", "project_cost", "project_profit"):
+        result[key] = simulation.summarize(sample[key], percentiles)
+    for key in ("final_value", "profit_value", "profit"):
+        result[key] = simulation.summarize(sample[key], percentiles, bins)
+    
+    return result, errors, warnings
+
+
+# Role names tracked by RunningTotals, keyed like compute_role_counts
+DELTA_ROLES = {"Developer": "developer", "Constructor": "constructor", "Investor": "investor"}
+
+
+@dataclass(frozen=True)
+class RunningTotals:
+    """Participant aggregates that compute_delta needs (property owner excluded)."""
+    cash_total: Decimal
+    role_counts: Dict[str, int]
+    
+    @property
+    def participants(self) -> int:
+        return sum(self.role_counts.values())
+
+
+def running_totals(investors: Sequence[Investor]) -> RunningTotals:
+    """
+    Aggregate a cap table for later delta updates.
+    
+    Args:
+        investors: Investor objects (excluding property owner)
+    
+    Returns:
+        RunningTotals with the cash total and per-role head counts
+    """
+    counts = {key: 0 for key in DELTA_ROLES.values()}
+    cash_total = Decimal("0")
+    for inv in investors:
+        if inv.role not in DELTA_ROLES:
+            raise ValueError(f"Role '{inv.role}' cannot be part of a delta state.")
+        counts[DELTA_ROLES[inv.role]] += 1
+        cash_total += inv.payment
+    return RunningTotals(cash_total=cash_total, role_counts=counts)
+
+
+def apply_edit(
+    totals: RunningTotals,
+    removed: Optional[Investor] = None,
+    added: Optional[Investor] = None
+) -> RunningTotals:
+    """
+    Update running totals for one participant edit in O(1).
+    
+    An add passes only added, a remove only removed and a change passes the
+    participant before and after the edit.
+    
+    Args:
+        totals: Aggregates before the edit
+        removed: Participant leaving the cap table (or its previous values)
+        added: Participant joining the cap table (or its new values)
+    
+    Returns:
+        New RunningTotals
+    """
+    counts = dict(totals.role_counts)
+    cash_total = totals.cash_total
+    if removed is not None:
+        if removed.role not in DELTA_ROLES:
+            raise ValueError(f"Role '{removed.role}' cannot be edited through a delta.")
+        counts[DELTA_ROLES[removed.role]] -= 1
+        cash_total -= removed.payment
+        if counts[DELTA_ROLES[removed.role]] < 0 or cash_total < 0:
+            raise ValueError(f"Removed participant '{removed.name}' is not part of the state.")
+    if added is not None:
+        if added.role not in DELTA_ROLES:
+            raise ValueError(f"Role '{added.role}' cannot be edited through a delta.")
+        counts[DELTA_ROLES[added.role]] += 1
+        cash_total += added.payment
+    return RunningTotals(cash_total=cash_total, role_counts=counts)
+
+
+def compute_delta(
+    totals: RunningTotals,
+    rows: Sequence[Investor],
+    role_bonuses: RoleBonuses,
+    project: Project,
+    property_model: str = "A",
+    property_weight: Optional[Decimal] = None,
+    property_profit_min_pct: Optional[Decimal] = None,
+    property_profit_max_pct: Optional[Decimal] = None
+) -> Tuple[List[ResultRecord], Dict, List[str], List[str]]:
+    """
+    Re-derive a distribution from running totals instead of the full cap table.
+    
+    Every share depends on the other participants only through cash_total_eff,
+    the role head counts and (Model B) the sum of the other equity shares, so
+    the cost is O(len(rows)). Results are returned for rows plus the property
+    owner; meta["factors"] holds what a client needs to rescale the rows it
+    already has: share_base_pct = payment * base_per_payment,
+    share_role_pct = role_bonus_per_head[role] (role_bonus_extra_units[role]
+    members of the role hold one PERCENT_QUANTUM more, see split_role_bonus)
+    and, for anyone but the property owner,
+    total_profit_pct = total_equity_pct * profit_per_equity. Runs, and
+    quantizes every share, as the decimal engine of compute_distribution.
+    
+    Args:
+        totals: Aggregates of the whole cap table (excluding property owner)
+        rows: Participants to return results for (normally the edited ones)
+        role_bonuses: Role bonus percentages
+        project: Project details
+        property_model: "A" or "B"
+        property_weight: Model B weight for the property value
+        property_profit_min_pct: Model B lower bound on the owner's profit share
+        property_profit_max_pct: Model B upper bound on the owner's profit share
+    
+    Returns:
+        Tuple of (results list, meta dict, errors list, warnings list)
+    """
+    with localcontext(engine_context(DECIMAL_PRECISION)):
+        return _compute_delta(
+            totals, rows, role_bonuses, project, property_model, property_weight,
+            property_profit_min_pct, property_profit_max_pct
+        )
+
+
+def _compute_delta(
+    totals: RunningTotals,
+    rows: Sequence[Investor],
+    role_bonuses: RoleBonuses,
+    project: Project,
+    property_model: str,
+    property_weight: Optional[Decimal],
+    property_profit_min_pct: Optional[Decimal],
+    property_profit_max_pct: Optional[Decimal]
+) -> Tuple[List[ResultRecord], Dict, List[str], List[str]]:
+    """compute_delta in the decimal engine's context."""
+    pools, errors, warnings = compute_pools(
+        role_bonuses, project, property_model, property_weight,
+        property_profit_min_pct, property_profit_max_pct
+    )
+    if pools is None:
+        return [], {}, errors, warnings
+    property_model = pools.property_model
+    property_weight = pools.property_weight
+    base_pool = pools.base_pool
+    
+    has_property_owner = bool(project.property_owner and project.property_value > 0)
+    if totals.participants == 0 and not has_property_owner:
+        errors.append("At least one investor or property owner is required.")
+        return [], {}, errors, warnings
+    
+    bonus_pools = {
+        "developer": role_bonuses.developer,
+        "constructor": role_bonuses.constructor,
+        "investor": role_bonuses.investor,
+    }
+    role_split = {
+        role: split_role_bonus(bonus_pools[key], totals.role_counts[key])
+        if totals.role_counts[key] > 0 else (Decimal("0"), 0)
+        for role, key in DELTA_ROLES.items()
+    }
+    per_head = {role: split[0] for role, split in role_split.items()}
+    extra_units = {role: split[1] for role, split in role_split.items()}
+    total_role_bonuses = sum(
+        (
+            per_head[role] * totals.role_counts[key] + extra_units[role] * PERCENT_QUANTUM
+            for role, key in DELTA_ROLES.items()
+        ),
+        Decimal("0")
+    )
+    
+    # Effective cash, as in compute_distribution
+    owner_payment_eff = Decimal("0")
+    if property_model == "B" and has_property_owner:
+        owner_payment_eff = project.property_value * property_weight
+    cash_total_eff = totals.cash_total + owner_payment_eff
+    if cash_total_eff == 0 and base_pool > 0:
+        warnings.append("Base pool cannot be distributed; only role/property pools apply.")
+        base_pool = Decimal("0")
+    distribute_base = cash_total_eff > 0 and base_pool > 0
+    
+    # Rows are rounded as in the decimal engine of compute_distribution, role
+    # bonuses by the same split; only its apportioning of base and profit shares,
+    # and of the split's leftover units, needs the whole table
+    quantum = PERCENT_QUANTUM
+    zero = Decimal("0").quantize(quantum)
+    base_per_payment = base_pool.quantize(quantum) / cash_total_eff if distribute_base else Decimal("0")
+    
+    def base_share(payment: Decimal) -> Decimal:
+        return (payment * base_per_payment).quantize(quantum)
+    
+    # Property owner equity and the sum of everyone else's
+    owner_base = zero
+    owner_property = zero
+    if has_property_owner:
+        if property_model == "A":
+            owner_property = pools.property_pool.quantize(quantum)
+        else:
+            owner_base = base_share(owner_payment_eff)
+    owner_equity = owner_base + owner_property
+    others_base = base_share(totals.cash_total)
+    others_sum = others_base + total_role_bonuses
+    
+    # Model B profit bounds scale every other profit share by the same factor
+    owner_profit = owner_equity
+    others_factor = Decimal("1")
+    others_target = others_sum
+    if property_model == "B" and has_property_owner and pools.is_profitable:
+        target_profit_pct = owner_equity
+        if pools.property_profit_min_pct is not None:
+            target_profit_pct = max(target_profit_pct, pools.property_profit_min_pct)
+        if pools.property_profit_max_pct is not None:
+            target_profit_pct = min(target_profit_pct, pools.property_profit_max_pct)
+        if target_profit_pct != owner_equity:
+            delta = target_profit_pct - owner_equity
+            if others_sum == 0:
+                errors.append("Profit bounds cannot be satisfied with current role/base pools.")
+                return [], {}, errors, warnings
+            others_target = others_sum - delta
+            if others_target < 0:
+                errors.append("Profit bounds cannot be satisfied; would result in negative allocations.")
+                return [], {}, errors, warnings
+            others_factor = others_target / others_sum
+            owner_profit = target_profit_pct
+    profit_sum = others_target + owner_profit
+    
+    def profit_share(scaled: Decimal) -> Decimal:
+        return (scaled * HUNDRED / profit_sum if profit_sum > 0 else scaled).quantize(quantum)
+    
+    results = []
+    for row in rows:
+        share_base_pct = base_share(row.payment)
+        share_role_pct = per_head.get(row.role, zero)
+        equity_pct = share_base_pct + share_role_pct
+        scaled = equity_pct * others_target / others_sum if others_factor != 1 else equity_pct
+        results.append(ResultRecord(
+            name=row.name,
+            role=row.role,
+            payment=row.payment,
+            share=share_base_pct,
+            bonus=share_role_pct,
+            profit_bonus=zero,
+            total_share=equity_pct,
+            profit_share=profit_share(scaled)
+        ))
+    if has_property_owner:
+        results.append(ResultRecord(
+            name=project.property_owner,
+            role="Property Owner",
+            payment=project.property_value,
+            share=owner_base,
+            bonus=zero,
+            profit_bonus=owner_property,
+            total_share=owner_equity,
+            profit_share=profit_share(owner_profit)
+        ))
+    
+    if property_model == "A":
+        cash_total_display = totals.cash_total
+    else:
+        cash_total_display = totals.cash_total + (project.property_value if has_property_owner else Decimal("0"))
+    total_equity_shares = others_sum + owner_equity
+    meta = _build_meta(
+        project, role_bonuses, property_model, property_weight,
+        pools.property_profit_min_pct, pools.property_profit_max_pct,
+        pools.project_profit, pools.is_profitable, pools.role_pool, pools.property_pool, base_pool,
+        pools.property_profit_share_effective, cash_total_display,
+        (
+            others_base + owner_base, total_role_bonuses, owner_property, total_equity_shares,
+            profit_share(profit_sum)
+        )
+    )
+    meta['factors'] = {
+        'base_per_payment': base_per_payment,
+        'role_bonus_per_head': per_head,
+        'role_bonus_extra_units': extra_units,
+        'profit_per_equity': others_factor * Decimal("100") / profit_sum if profit_sum > 0 else Decimal("1"),
+    }
+    
+    return results, meta, errors, warnings
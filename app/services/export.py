@@ -0,0 +1,487 @@
+"""
+Streamed result exports: CSV, XLSX and PDF.
+
+Each writer consumes result rows lazily (tuples of strings in ROW_FIELDS
+order, from ResponseWriter.values) and yields the document in chunks,
+so the size of what is held at once does not grow with the cap table. Only
+the standard library is used: the XLSX workbook is a zip archive written to
+a non-seekable sink, and the PDF is written object by object, one page at a
+time, with its cross-reference table at the end. PDF text uses the built-in
+Helvetica font with WinAnsi encoding; characters outside it (such as Arabic
+names) print as "?", so the web page prints such results itself
+(needsBrowserPDF in app.js).
+"""
+import csv
+import io
+import zipfile
+import zlib
+from array import array
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import IO, Any, Dict, Iterable, Iterator, List, Sequence, Tuple, cast
+from xml.sax.saxutils import escape
+
+from app.services.serialize import ROW_KEYS
+
+TITLE = "Investment Share Calculator Results"
+FOOTER = "Services by https://suar.services"
+
+# Exported result columns (keys of the API result rows) and their labels
+EXPORT_COLUMNS = (
+    ("name", "Name"),
+    ("role", "Role"),
+    ("payment", "Payment (€)"),
+    ("share_base_pct", "Base Share (%)"),
+    ("share_role_pct", "Role Bonus (%)"),
+    ("share_property_pct", "Property Share (%)"),
+    ("total_equity_pct", "Equity Share (%)"),
+    ("total_profit_pct", "Profit Share (%)"),
+    ("final_value", "Final Share Value (€)"),
+    ("profit_value", "Profit Value (€)"),
+)
+
+# Columns written as text; all others are numbers
+TEXT_COLUMNS = ("name", "role")
+
+# (position in a result row, written as text) per exported column
+EXPORT_CELLS = tuple((ROW_KEYS.index(key), key in TEXT_COLUMNS) for key, _ in EXPORT_COLUMNS)
+
+# Format: (mimetype, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "pdf": ("application/pdf", "pdf"),
+}
+
+# Rows per yielded CSV/XLSX chunk
+CHUNK_ROWS = 500
+
+# PDF layout, in points: A4 landscape
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+MARGIN = 36
+FONT_SIZE = 8
+HEADER_FONT_SIZE = 7
+ROW_HEIGHT = 14
+HEADER_HEIGHT = 22
+SIGNATURE_ROW_HEIGHT = 36
+RESULT_WIDTHS = (120, 70) + (72.5,) * 8
+SIGNATURE_COLUMNS = (("Name", 230), ("Role", 110), ("Signature", 300), ("Date", 130))
+
+
+def format_amount(value: Any) -> str:
+    """Format a numeric string with two decimals, as the results table does."""
+    return f"{Decimal(value):.2f}"
+
+
+def summary_lines(summary: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Label the totals and pools of a /api/calculate payload for an export header.
+    
+    Args:
+        summary: Payload from build_response_payload ("totals" and "pools" are used)
+    
+    Returns:
+        (label, value) pairs
+    """
+    totals = summary["totals"]
+    pools = summary["pools"]
+    return [
+        ("Project Cost (€)", format_amount(totals["project_cost"])),
+        ("Sale Price (€)", format_amount(totals["sale_price"])),
+        ("Total Profit (€)", format_amount(totals["profit"])),
+        ("Cash Investment (€)", format_amount(totals["cash_total"])),
+        ("Base Pool (%)", format_amount(pools["base_pool"])),
+        ("Role Pools (%)", format_amount(pools["role_pool"])),
+        ("Property Pool (%)", format_amount(pools["property_pool"])),
+        ("Total (%)", format_amount(totals["total_pct_sum"])),
+    ]
+
+
+def generated_at() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+def stream_export_csv(rows: Iterable[Sequence[str]], summary: Sequence[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Render result rows as CSV for spreadsheets.
+    
+    Starts with a byte order mark (so Excel reads the file as UTF-8) and "#"
+    comment lines holding the title and summary, then the labelled table.
+    
+    Yields:
+        UTF-8 chunks of CHUNK_ROWS rows
+    """
+    buffer = io.StringIO()
+    buffer.write("\ufeff")
+    buffer.write(f"# {TITLE}\r\n# Generated: {generated_at()}\r\n")
+    for label, value in summary:
+        buffer.write(f"# {label}: {value}\r\n")
+    writer = csv.writer(buffer)
+    writer.writerow([label for _, label in EXPORT_COLUMNS])
+    pending = 0
+    for row in rows:
+        writer.writerow([row[index] for index, _ in EXPORT_CELLS])
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class ChunkSink:
+    """Write-only stream collecting bytes until the caller drains them; has no tell(), so zipfile streams."""
+    
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+XLSX_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+XLSX_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XLSX_DOC_RELS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+XLSX_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# Fixed workbook parts: a "Results" sheet, a "Summary" sheet and three cell
+# styles (0 default, 1 two-decimal number, 2 bold header)
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet2.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        f'<Relationships xmlns="{XLSX_RELS}">'
+        f'<Relationship Id="rId1" Type="{XLSX_DOC_RELS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        f'<workbook xmlns="{XLSX_MAIN}" xmlns:r="{XLSX_DOC_RELS}"><sheets>'
+        '<sheet name="Results" sheetId="1" r:id="rId1"/>'
+        '<sheet name="Summary" sheetId="2" r:id="rId2"/>'
+        '</sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        f'<Relationships xmlns="{XLSX_RELS}">'
+        f'<Relationship Id="rId1" Type="{XLSX_DOC_RELS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{XLSX_DOC_RELS}/worksheet" Target="worksheets/sheet2.xml"/>'
+        f'<Relationship Id="rId3" Type="{XLSX_DOC_RELS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/styles.xml": (
+        f'<styleSheet xmlns="{XLSX_MAIN}">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="2" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+
+def xlsx_text(value: str, style: int = 0) -> str:
+    # Inline strings need no shared-strings table, so rows can be written as they come
+    return f'<c t="inlineStr" s="{style}"><is><t>{escape(value)}</t></is></c>'
+
+
+def xlsx_row(cells: Iterable[str]) -> str:
+    return f'<row>{"".join(cells)}</row>'
+
+
+def stream_xlsx(rows: Iterable[Sequence[str]], summary: Sequence[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Render result rows as an XLSX workbook.
+    
+    The "Results" sheet holds the table, with a frozen header row and
+    full-precision numbers shown with two decimals; the "Summary" sheet
+    holds the title and summary. The sheet XML is deflated into the archive
+    as rows arrive.
+    
+    Yields:
+        Chunks of the zip archive
+    """
+    sink = ChunkSink()
+    with zipfile.ZipFile(cast(IO[bytes], sink), "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in XLSX_PARTS.items():
+            archive.writestr(name, XLSX_HEAD + xml)
+        yield sink.drain()
+        
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write((
+                f'{XLSX_HEAD}<worksheet xmlns="{XLSX_MAIN}"><sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                '</sheetView></sheetViews><sheetData>'
+                + xlsx_row(xlsx_text(label, 2) for _, label in EXPORT_COLUMNS)
+            ).encode("utf-8"))
+            chunk: List[str] = []
+            for row in rows:
+                chunk.append(xlsx_row(
+                    xlsx_text(row[index]) if text else f'<c s="1"><v>{row[index]}</v></c>'
+                    for index, text in EXPORT_CELLS
+                ))
+                if len(chunk) >= CHUNK_ROWS:
+                    sheet.write("".join(chunk).encode("utf-8"))
+                    chunk = []
+                    yield sink.drain()
+            sheet.write(("".join(chunk) + "</sheetData></worksheet>").encode("utf-8"))
+        
+        summary_rows = [xlsx_row([xlsx_text(TITLE, 2)]), xlsx_row([xlsx_text("Generated"), xlsx_text(generated_at())])]
+        for label, value in summary:
+            summary_rows.append(xlsx_row([xlsx_text(label), f'<c s="1"><v>{value}</v></c>']))
+        archive.writestr(
+            "xl/worksheets/sheet2.xml",
+            f'{XLSX_HEAD}<worksheet xmlns="{XLSX_MAIN}"><sheetData>{"".join(summary_rows)}</sheetData></worksheet>'
+        )
+    yield sink.drain()
+
+
+def pdf_string(value: str) -> bytes:
+    """Encode text as the body of a PDF literal string (WinAnsi)."""
+    data = value.encode("cp1252", errors="replace")
+    if b"\\" in data or b"(" in data or b")" in data:
+        data = data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    return data
+
+
+def fit(value: str, width: float, size: int = FONT_SIZE) -> str:
+    """Shorten text to roughly fit a column of `width` points."""
+    limit = max(int((width - 4) / (size * 0.55)), 4)
+    return value if len(value) <= limit else value[:limit - 3] + "..."
+
+
+def references(ids: Sequence[int], chunk: int = 1000) -> Iterator[bytes]:
+    """Indirect references "n 0 R" to the given objects, a chunk at a time."""
+    for start in range(0, len(ids), chunk):
+        yield b" ".join(b"%d 0 R" % i for i in ids[start:start + chunk]) + b" "
+
+
+class PdfWriter:
+    """
+    Incremental PDF writer.
+    
+    A page and its objects are returned as bytes once the page is full. Until
+    close() writes the cross-reference table only object offsets and page and
+    field ids are kept, in compact arrays of a few bytes per object.
+    """
+    
+    def __init__(self) -> None:
+        self.offsets = array("Q", [0])
+        self.position = 0
+        self.catalog_id = self.reserve()
+        self.pages_id = self.reserve()
+        self.font_id = self.reserve()
+        self.bold_id = self.reserve()
+        self.page_ids = array("I")
+        self.field_ids = array("I")
+        self.page_id = 0
+        self.content: List[bytes] = []
+        self.annots: List[int] = []
+        self.pending: List[bytes] = []
+        self.y = 0.0
+    
+    def reserve(self) -> int:
+        self.offsets.append(0)
+        return len(self.offsets) - 1
+    
+    def emit(self, data: bytes) -> bytes:
+        self.position += len(data)
+        return data
+    
+    def write_object(self, obj_id: int, body: bytes) -> bytes:
+        self.offsets[obj_id] = self.position
+        return self.emit(b"%d 0 obj\n%s\nendobj\n" % (obj_id, body))
+    
+    def write_list_object(self, obj_id: int, head: bytes, ids: Sequence[int], tail: bytes) -> Iterator[bytes]:
+        """Write an object holding a long array of references, in chunks."""
+        self.offsets[obj_id] = self.position
+        yield self.emit(b"%d 0 obj\n%s[" % (obj_id, head))
+        for chunk in references(ids):
+            yield self.emit(chunk)
+        yield self.emit(b"]%s\nendobj\n" % tail)
+    
+    def start(self) -> bytes:
+        """File header and the two fonts."""
+        return (
+            self.emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+            + self.write_object(self.font_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                              b"/Encoding /WinAnsiEncoding >>")
+            + self.write_object(self.bold_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold "
+                                              b"/Encoding /WinAnsiEncoding >>")
+        )
+    
+    def start_page(self) -> None:
+        self.page_id = self.reserve()
+        self.y = PAGE_HEIGHT - MARGIN
+    
+    def text(self, x: float, y: float, value: str, size: int = FONT_SIZE, font: bytes = b"F1") -> None:
+        self.content.append(b"BT /%s %d Tf %.2f %.2f Td (%s) Tj ET\n" % (font, size, x, y, pdf_string(value)))
+    
+    def rule(self, y: float) -> None:
+        self.content.append(b"%.2f %.2f m %.2f %.2f l S\n" % (MARGIN, y, PAGE_WIDTH - MARGIN, y))
+    
+    def row(self, cells: Sequence[str], widths: Sequence[float], height: float) -> None:
+        """Draw one table row below the current position and underline it."""
+        # One text object per row; each Td moves to the next column
+        ops = [b"BT /F1 %d Tf %.2f %.2f Td" % (FONT_SIZE, MARGIN + 2, self.y - height / 2 - FONT_SIZE / 3)]
+        for value, width in zip(cells, widths):
+            ops.append(b"(%s) Tj %.2f 0 Td" % (pdf_string(fit(value, width)), width))
+        ops.append(b"ET\n")
+        self.content.append(b" ".join(ops))
+        self.y -= height
+        self.rule(self.y)
+    
+    def header(self, labels: Sequence[str], widths: Sequence[float]) -> None:
+        """Draw a bold header row; a trailing unit such as "(%)" goes on a second line."""
+        x = float(MARGIN)
+        for label, width in zip(labels, widths):
+            for line, value in enumerate(label.replace(" (", "\n(").split("\n")):
+                self.text(x + 2, self.y - 9 - line * 9, fit(value, width, HEADER_FONT_SIZE), HEADER_FONT_SIZE, b"F2")
+            x += width
+        self.y -= HEADER_HEIGHT
+        self.rule(self.y)
+    
+    def fits(self, height: float) -> bool:
+        return self.y - height >= MARGIN + ROW_HEIGHT
+    
+    def signature_field(self, name: str, x: float, width: float, height: float) -> None:
+        """Add an unsigned signature form field over the given box of the next row."""
+        field_id = self.reserve()
+        self.field_ids.append(field_id)
+        self.annots.append(field_id)
+        self.pending.append(self.write_object(field_id, (
+            b"<< /Type /Annot /Subtype /Widget /FT /Sig /T (%s) /F 4 /P %d 0 R /Rect [%.2f %.2f %.2f %.2f] >>"
+        ) % (pdf_string(name), self.page_id, x, self.y - height + 2, x + width, self.y - 2)))
+    
+    def finish_page(self) -> bytes:
+        """Add the footer and emit the page with its content stream."""
+        self.text(MARGIN, MARGIN / 2, FOOTER)
+        self.text(PAGE_WIDTH - MARGIN - 40, MARGIN / 2, f"Page {len(self.page_ids) + 1}")
+        stream = zlib.compress(b"0.5 w 0.75 G\n" + b"".join(self.content))
+        content_id = self.reserve()
+        data = b"".join(self.pending) + self.write_object(
+            content_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        annots = b" /Annots [%s]" % b"".join(references(self.annots)) if self.annots else b""
+        data += self.write_object(self.page_id, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R%s >>"
+        ) % (self.pages_id, PAGE_WIDTH, PAGE_HEIGHT, self.font_id, self.bold_id, content_id, annots))
+        self.page_ids.append(self.page_id)
+        self.content = []
+        self.annots = []
+        self.pending = []
+        return data
+    
+    def close(self) -> Iterator[bytes]:
+        """Page tree, form, catalog, cross-reference table and trailer."""
+        yield from self.write_list_object(
+            self.pages_id, b"<< /Type /Pages /Kids ", self.page_ids, b" /Count %d >>" % len(self.page_ids)
+        )
+        form = b""
+        if self.field_ids:
+            form_id = self.reserve()
+            yield from self.write_list_object(form_id, b"<< /Fields ", self.field_ids, b" >>")
+            form = b" /AcroForm %d 0 R" % form_id
+        yield self.write_object(self.catalog_id, b"<< /Type /Catalog /Pages %d 0 R%s >>" % (self.pages_id, form))
+        xref = self.position
+        count = len(self.offsets)
+        yield b"xref\n0 %d\n0000000000 65535 f \n" % count
+        for start in range(1, count, 1000):
+            yield b"".join(b"%010d 00000 n \n" % offset for offset in self.offsets[start:start + 1000])
+        yield b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, self.catalog_id, xref)
+
+
+def stream_pdf(
+    rows: Iterable[Sequence[str]],
+    summary: Sequence[Tuple[str, str]],
+    signers: Iterable[Tuple[str, str]],
+) -> Iterator[bytes]:
+    """
+    Render result rows as a PDF with a signature section.
+    
+    The first page carries the title and summary; the results table and
+    then the signature table (one row and one signature form field per
+    participant) follow, with their header rows repeated on every page.
+    
+    Args:
+        rows: Result rows in ROW_FIELDS order
+        summary: (label, value) pairs from summary_lines
+        signers: (name, role) per participant, in table order
+    
+    Yields:
+        PDF bytes, about one page at a time
+    """
+    pdf = PdfWriter()
+    date = generated_at()
+    result_header = [label for _, label in EXPORT_COLUMNS]
+    signature_header = [label for label, _ in SIGNATURE_COLUMNS]
+    signature_widths = [width for _, width in SIGNATURE_COLUMNS]
+    
+    yield pdf.start()
+    pdf.start_page()
+    pdf.text(MARGIN, pdf.y - 16, TITLE, 16, b"F2")
+    pdf.text(MARGIN, pdf.y - 30, f"Generated: {date}")
+    pdf.y -= 42
+    for index, (label, value) in enumerate(summary):
+        column, line = divmod(index, 4)
+        pdf.text(MARGIN + column * 260, pdf.y - (line + 1) * 12, f"{label}: {value}")
+    pdf.y -= 62
+    pdf.header(result_header, RESULT_WIDTHS)
+    
+    for row in rows:
+        if not pdf.fits(ROW_HEIGHT):
+            yield pdf.finish_page()
+            pdf.start_page()
+            pdf.header(result_header, RESULT_WIDTHS)
+        pdf.row([
+            row[index] if text else format_amount(row[index]) for index, text in EXPORT_CELLS
+        ], RESULT_WIDTHS, ROW_HEIGHT)
+    
+    if not pdf.fits(44 + HEADER_HEIGHT + SIGNATURE_ROW_HEIGHT):
+        yield pdf.finish_page()
+        pdf.start_page()
+    pdf.text(MARGIN, pdf.y - 26, "Signatures", 12, b"F2")
+    pdf.text(MARGIN, pdf.y - 38, f"Date: {date}")
+    pdf.y -= 44
+    pdf.header(signature_header, signature_widths)
+    
+    signature_x = MARGIN + sum(signature_widths[:2])
+    for index, (name, role) in enumerate(signers, 1):
+        if not pdf.fits(SIGNATURE_ROW_HEIGHT):
+            yield pdf.finish_page()
+            pdf.start_page()
+            pdf.header(signature_header, signature_widths)
+        pdf.signature_field(f"signature_{index}", signature_x, signature_widths[2], SIGNATURE_ROW_HEIGHT)
+        pdf.row([name, role, "", ""], signature_widths, SIGNATURE_ROW_HEIGHT)
+    
+    yield pdf.finish_page()
+    yield from pdf.close()
@@ -0,0 +1,215 @@
+"""
+Scaled-integer fixed-point arithmetic for the share distribution.
+
+Rounding policy:
+- Money is held in integer cents; inputs are rounded to the cent, half-even.
+- Percentages are held in integer units of 1e-8 % (basis points x 10^6);
+  inputs are rounded to that grid, half-even.
+- The property weight is held in units of 1e-6.
+- Products are exact Python integers and every division rounds exactly once,
+  half-even (see div_round), so results are deterministic across platforms.
+  A participant's equity share is rounded from the exact sum of its base
+  share and per-head bonus, so it may differ by one unit from the sum of the
+  separately rounded components.
+- Profit shares are renormalized with the largest-remainder method and sum
+  to exactly 100%: each share is floored, then the missing units go to the
+  largest remainders, ties broken by participant order.
+"""
+import heapq
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Dict, List, Optional, Sequence
+
+CENTS = 100
+PCT_SCALE = 10 ** 8  # units per 1%
+HUNDRED_PCT = 100 * PCT_SCALE
+WEIGHT_SCALE = 10 ** 6  # units per 1.0 property weight
+
+ROLE_BONUS_KEYS = ("Developer", "Constructor", "Investor")
+
+
+def to_units(value: Decimal, scale: int) -> int:
+    """Round a Decimal to an integer number of 1/scale units, half-even."""
+    return int((Decimal(value) * scale).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def to_cents(value: Decimal) -> int:
+    """Round a money amount to integer cents, half-even."""
+    return to_units(value, CENTS)
+
+
+def to_pct_units(value: Decimal) -> int:
+    """Round a percentage to integer units of 1e-8 %, half-even."""
+    return to_units(value, PCT_SCALE)
+
+
+def from_pct_units(units: int) -> Decimal:
+    """Convert percentage units back to an exact Decimal percentage."""
+    return Decimal(units).scaleb(-8)
+
+
+def div_round(numerator: int, denominator: int) -> int:
+    """Integer division rounded half-even; denominator must be positive."""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient % 2 == 1):
+        quotient += 1
+    return quotient
+
+
+def largest_remainder(weights: Sequence[int], total: int) -> List[int]:
+    """
+    Split total units in proportion to non-negative integer weights.
+    
+    The parts sum to exactly total. Each part is floored, then the remaining
+    units go to the largest remainders; ties go to the earlier index.
+    
+    Args:
+        weights: Non-negative integer weights with a positive sum
+        total: Number of units to distribute
+    
+    Returns:
+        List of integer parts
+    """
+    weight_sum = sum(weights)
+    parts = []
+    remainders = []
+    for index, weight in enumerate(weights):
+        part, remainder = divmod(weight * total, weight_sum)
+        parts.append(part)
+        remainders.append((-remainder, index))
+    missing = total - sum(parts)
+    for _, index in heapq.nsmallest(missing, remainders):
+        parts[index] += 1
+    return parts
+
+
+@dataclass
+class FixedDistribution:
+    """Per-participant shares in percentage units."""
+    base: List[int] = field(default_factory=list)
+    role: List[int] = field(default_factory=list)
+    property: List[int] = field(default_factory=list)
+    equity: List[int] = field(default_factory=list)
+    profit: List[int] = field(default_factory=list)
+    base_pool: int = 0
+    cash_total_eff: int = 0  # cents x WEIGHT_SCALE
+    error: Optional[str] = None
+
+
+def distribute(
+    payments: Sequence[int],
+    roles: Sequence[str],
+    owner_index: Optional[int],
+    property_model: str,
+    base_pool: int,
+    property_pool: int,
+    role_bonuses: Dict[str, int],
+    weight: int,
+    is_profitable: bool,
+    profit_min: Optional[int] = None,
+    profit_max: Optional[int] = None
+) -> FixedDistribution:
+    """
+    Integer version of the per-participant steps of compute_distribution.
+    
+    Args:
+        payments: Payments in cents, property owner carrying the property value
+        roles: Participant roles
+        owner_index: Index of the property owner, if any
+        property_model: "A" or "B"
+        base_pool: Base pool in percentage units
+        property_pool: Property pool in percentage units (Model A)
+        role_bonuses: Total bonus per role name in percentage units
+        weight: Property weight in WEIGHT_SCALE units (Model B)
+        is_profitable: Whether the project makes a profit
+        profit_min: Model B lower bound on the owner's profit share, in units
+        profit_max: Model B upper bound on the owner's profit share, in units
+    
+    Returns:
+        FixedDistribution; error is set when profit bounds cannot be met
+    """
+    out = FixedDistribution(base_pool=base_pool)
+    
+    counts = {role: 0 for role in ROLE_BONUS_KEYS}
+    for role in roles:
+        if role in counts:
+            counts[role] += 1
+    
+    # Effective payments carry WEIGHT_SCALE so the weighted property value stays exact
+    effective = []
+    for index, payment in enumerate(payments):
+        if index == owner_index:
+            effective.append(payment * weight if property_model == "B" else 0)
+        else:
+            effective.append(payment * WEIGHT_SCALE)
+    cash_total_eff = sum(effective)
+    out.cash_total_eff = cash_total_eff
+    if cash_total_eff == 0 and base_pool > 0:
+        base_pool = 0
+        out.base_pool = 0
+    
+    # Per-role constants: the rounded per-head bonus and the terms of
+    # equity = (effective * base_pool * count + bonus * cte) / (cte * count)
+    denominator = cash_total_eff if cash_total_eff > 0 else 1
+    pool = base_pool if cash_total_eff > 0 else 0
+    per_role = {}
+    for role in set(roles):
+        count = counts.get(role, 0)
+        bonus = role_bonuses.get(role, 0) if count else 0
+        per_role[role] = (
+            div_round(bonus, max(count, 1)), max(count, 1), bonus * denominator, denominator * max(count, 1)
+        )
+    
+    base_shares = out.base
+    role_shares = out.role
+    property_shares = out.property
+    equity_shares = out.equity
+    for index, role in enumerate(roles):
+        base_num = effective[index] * pool
+        if index == owner_index:
+            equity_num, equity_den, per_head = base_num, denominator, 0
+        else:
+            per_head, count, bonus_term, equity_den = per_role[role]
+            equity_num = base_num * count + bonus_term
+        # Half-even rounding, inlined from div_round for the hot loop
+        base, remainder = divmod(base_num, denominator)
+        if 2 * remainder > denominator or (2 * remainder == denominator and base & 1):
+            base += 1
+        # Equity is rounded once from the exact sum, so per-head rounding
+        # does not accumulate across a role's members
+        equity, remainder = divmod(equity_num, equity_den)
+        if 2 * remainder > equity_den or (2 * remainder == equity_den and equity & 1):
+            equity += 1
+        prop = property_pool if index == owner_index and property_model == "A" else 0
+        base_shares.append(base)
+        role_shares.append(per_head)
+        property_shares.append(prop)
+        equity_shares.append(equity + prop)
+    
+    profit = list(out.equity)
+    if property_model == "B" and owner_index is not None and is_profitable:
+        owner_equity = profit[owner_index]
+        target = owner_equity
+        if profit_min is not None:
+            target = max(target, profit_min)
+        if profit_max is not None:
+            target = min(target, profit_max)
+        if target != owner_equity:
+            delta = target - owner_equity
+            others_sum = sum(profit) - owner_equity
+            if others_sum == 0:
+                out.error = "Profit bounds cannot be satisfied with current role/base pools."
+                return out
+            scaled_sum = others_sum - delta
+            for index in range(len(profit)):
+                if index != owner_index:
+                    if scaled_sum < 0 and profit[index] > 0:
+                        out.error = "Profit bounds cannot be satisfied; would result in negative allocations."
+                        return out
+                    profit[index] = div_round(profit[index] * scaled_sum, others_sum)
+            profit[owner_index] = target
+    
+    # Renormalize to exactly 100%
+    out.profit = largest_remainder(profit, HUNDRED_PCT) if sum(profit) > 0 else profit
+    return out
@@ -0,0 +1,71 @@
+"""
+Lightweight internal records for the calculation engines.
+
+Inputs are validated once at the boundary (the Pydantic models in
+app.services.models); inside the engines participants and results are plain
+slotted dataclasses, which skip per-object validation and the instance dict.
+ResultRecord has the same attribute names as models.Result, so templates and
+serializers accept either; call to_models when Pydantic objects are needed.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, List, Union
+
+from app.services.models import Investor, Result
+
+
+@dataclass(frozen=True, slots=True)
+class ParticipantRecord:
+    """A validated participant as used inside the engines."""
+    name: str
+    role: str
+    payment: Decimal
+
+
+# Anything the engines accept as a participant
+ParticipantLike = Union[Investor, ParticipantRecord]
+
+
+@dataclass(slots=True)
+class ResultRecord:
+    """Calculation result for a single participant; mirrors models.Result."""
+    name: str
+    role: str
+    payment: Decimal
+    share: Decimal  # Base share percentage
+    bonus: Decimal  # Role bonus percentage
+    profit_bonus: Decimal  # Property share percentage
+    total_share: Decimal  # Equity percentage (for sale value)
+    profit_share: Decimal  # Profit percentage (for profit distribution)
+    
+    def to_model(self) -> Result:
+        """Convert to a validated Pydantic Result."""
+        return Result(
+            name=self.name,
+            role=self.role,
+            payment=self.payment,
+            share=self.share,
+            bonus=self.bonus,
+            profit_bonus=self.profit_bonus,
+            total_share=self.total_share,
+            profit_share=self.profit_share
+        )
+
+
+def to_models(records: Iterable[ResultRecord]) -> List[Result]:
+    """Convert result records to Pydantic Result models."""
+    return [record.to_model() for record in records]
+
+
+def copy_records(records: Iterable[ResultRecord]) -> List[ResultRecord]:
+    """
+    Independent copies of result records, for results shared through a cache.
+    
+    ResultRecord is not frozen, since the engines build one per participant
+    and a frozen dataclass is several times slower to construct; the fields
+    are immutable, so a shallow copy is enough.
+    """
+    return [
+        ResultRecord(r.name, r.role, r.payment, r.share, r.bonus, r.profit_bonus, r.total_share, r.profit_share)
+        for r in records
+    ]
@@ -0,0 +1,235 @@
+"""
+Direct-to-bytes serialization of calculation responses.
+
+Each result row is formatted once into a tuple of field strings in
+ROW_FIELDS order, with no per-row dict and no key strings. JSON rows are
+written from one %-format template (/api/calculate, delta, batch, solve and
+NDJSON uploads); the CSV upload and the CSV, XLSX and PDF exports take the
+tuples as they are. The small remainder of a JSON payload (totals, pools,
+banners, state) goes through orjson when it is installed and the standard
+library otherwise.
+
+Rounding policy: money fields are rounded half-even to MONEY_PLACES (cents)
+unless configured otherwise; percent fields keep their exact value unless
+decimal places are configured. Values are always written in fixed-point
+notation, so a zero share is "0.0000000000", never "0E-10".
+"""
+import json
+from decimal import Context, Decimal, ROUND_HALF_EVEN, localcontext
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, cast
+
+from app.services.models import Project
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+HUNDRED = Decimal("100")
+ZERO = Decimal("0")
+MONEY_PLACES = 2
+
+# Per-participant fields in output order, with their field type
+ROW_FIELDS = (
+    ("name", "text"),
+    ("role", "text"),
+    ("payment", "money"),
+    ("share_base_pct", "percent"),
+    ("share_role_pct", "percent"),
+    ("share_property_pct", "percent"),
+    ("total_equity_pct", "percent"),
+    ("total_profit_pct", "percent"),
+    ("total_share_pct", "percent"),
+    ("final_value", "money"),
+    ("profit_value", "money"),
+)
+ROW_KEYS = tuple(key for key, _ in ROW_FIELDS)
+
+# Rows formatted per chunk of a streamed response (ResponseWriter.chunks)
+CHUNK_ROWS = 500
+
+POOL_FIELDS = (
+    ("base_pool", "base_pool"),
+    ("role_pool", "role_pool"),
+    ("property_pool", "property_pool"),
+    ("dev", "developer_bonus"),
+    ("const", "constructor_bonus"),
+    ("inv", "investor_bonus"),
+    ("prop_base", "property_base_share"),
+    ("prop_profit_effective", "property_profit_share_effective"),
+)
+
+ROUNDING = Context(rounding=ROUND_HALF_EVEN)
+
+# The stdlib's C string escaper (ASCII output, as jsonify); missing from the type stubs
+encode_string = cast(Callable[[str], str], getattr(json.encoder, "encode_basestring_ascii"))
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON as UTF-8 bytes; Decimals become strings."""
+    if HAVE_ORJSON:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def value_factors(project: Project, meta: Dict[str, Any]) -> Tuple[Decimal, Decimal]:
+    """
+    Sale value and profit per percentage point of share.
+    
+    final_value and profit_value of a row are its equity and profit
+    percentages times these factors.
+    """
+    return project.sale_price / HUNDRED, meta.get("project_profit", ZERO) / HUNDRED
+
+
+def converter(places: Optional[int]) -> Callable[[Decimal], str]:
+    """
+    Formatter of a numeric field in fixed-point notation: exact, or with
+    `places` digits rounded in the current context (ResponseWriter uses ROUNDING).
+    """
+    spec = "f" if places is None else f".{places}f"
+    return lambda value: format(value, spec)
+
+
+# One %-format template for a whole row; text values arrive already JSON-encoded
+ROW_TEMPLATE = "{" + ",".join(
+    f'"{key}":%s' if kind == "text" else f'"{key}":"%s"' for key, kind in ROW_FIELDS
+) + "}"
+
+
+class ResponseWriter:
+    """
+    Serializer for calculation responses, configured once per app.
+    
+    Args:
+        percent_places: Decimal places of percentage fields (None keeps full precision)
+        money_places: Decimal places of money fields (None keeps full precision)
+    """
+    
+    def __init__(self, percent_places: Optional[int] = None, money_places: Optional[int] = MONEY_PLACES):
+        self.percent_places = percent_places
+        self.money_places = money_places
+        self.percent = converter(percent_places)
+        self.money = converter(money_places)
+    
+    def format_rows(
+        self, results: Iterable[Any], factors: Tuple[Decimal, Decimal], text: Callable[[str], str] = str
+    ) -> List[Tuple[str, ...]]:
+        """
+        Format results as tuples of strings in ROW_FIELDS order.
+        
+        Args:
+            results: Result objects or ResultRecords
+            factors: value_factors(project, meta)
+            text: Conversion of the name and role (encode_string for JSON)
+        
+        Returns:
+            One tuple per result
+        """
+        sale_factor, profit_factor = factors
+        money, percent = self.money, self.percent
+        rows: List[Tuple[str, ...]] = []
+        with localcontext(ROUNDING):
+            for r in results:
+                # Use profit_share if available (Model B), otherwise use total_share (Model A)
+                profit_pct = r.profit_share if r.profit_share is not None else r.total_share
+                equity = percent(r.total_share)  # also the legacy total_share_pct
+                rows.append((
+                    text(r.name), text(r.role), money(r.payment),
+                    percent(r.share), percent(r.bonus), percent(r.profit_bonus), equity, percent(profit_pct), equity,
+                    money(r.total_share * sale_factor), money(profit_pct * profit_factor)
+                ))
+        return rows
+    
+    def chunks(
+        self, results: Iterable[Any], meta: Dict[str, Any], project: Project, text: Callable[[str], str] = str
+    ) -> Iterator[List[Tuple[str, ...]]]:
+        """
+        Format results lazily, CHUNK_ROWS at a time, for streamed responses.
+        
+        The rounding context is held only while a chunk is formatted, never
+        across a yield.
+        
+        Yields:
+            Lists of format_rows tuples
+        """
+        factors = value_factors(project, meta)
+        remaining = iter(results)
+        while True:
+            chunk = self.format_rows(islice(remaining, CHUNK_ROWS), factors, text)
+            if not chunk:
+                return
+            yield chunk
+    
+    def values(self, results: Iterable[Any], meta: Dict[str, Any], project: Project) -> Iterator[Tuple[str, ...]]:
+        """Result rows as tuples of strings in ROW_FIELDS order, for the CSV and document streams."""
+        for chunk in self.chunks(results, meta, project):
+            yield from chunk
+    
+    def json_rows(self, results: Iterable[Any], meta: Dict[str, Any], project: Project) -> Iterator[str]:
+        """Result rows as compact, ASCII JSON objects, for NDJSON streams."""
+        for chunk in self.chunks(results, meta, project, encode_string):
+            for row in chunk:
+                yield ROW_TEMPLATE % row
+    
+    def rows(self, results: Iterable[Any], meta: Dict[str, Any], project: Project) -> bytes:
+        """
+        Serialize results as a JSON array.
+        
+        Args:
+            results: Result objects or ResultRecords
+            meta: Meta dict from compute_distribution
+            project: Project the results were computed for
+        
+        Returns:
+            UTF-8 encoded JSON array of result rows
+        """
+        rows = self.format_rows(results, value_factors(project, meta), encode_string)
+        return ("[" + ",".join([ROW_TEMPLATE % row for row in rows]) + "]").encode("ascii")
+    
+    def summary(self, meta: Dict[str, Any], project: Project) -> Dict[str, Dict[str, str]]:
+        """The totals and pools of the payload."""
+        money, percent = self.money, self.percent
+        with localcontext(ROUNDING):
+            totals = {
+                "cash_total": money(meta.get("cash_total", ZERO)),
+                "project_cost": money(project.project_cost),
+                "sale_price": money(project.sale_price),
+                "profit": money(meta.get("project_profit", ZERO)),
+                "total_pct_sum": percent(meta.get("total_pct_sum", ZERO)),
+            }
+            pools = {key: percent(meta.get(name, ZERO)) for key, name in POOL_FIELDS}
+        return {"totals": totals, "pools": pools}
+    
+    def payload(
+        self,
+        results: Iterable[Any],
+        meta: Dict[str, Any],
+        errors: List[str],
+        warnings: List[str],
+        project: Project,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> bytes:
+        """
+        Serialize a full /api/calculate payload.
+        
+        Args:
+            results: Result objects or ResultRecords
+            meta: Meta dict from compute_distribution
+            errors: List of error messages
+            warnings: List of warning messages
+            project: Project the results were computed for
+            extra: Further top-level keys, such as the delta state token
+        
+        Returns:
+            UTF-8 encoded JSON object
+        """
+        rest = {
+            **self.summary(meta, project),
+            "banners": {"errors": errors, "warnings": warnings},
+            **(extra or {}),
+        }
+        # The rest always has keys, so its opening brace can be replaced by the results
+        return b'{"results":' + self.rows(results, meta, project) + b"," + dumps(rest)[1:]
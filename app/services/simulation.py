@@ -0,0 +1,231 @@
+"""
+Monte Carlo simulation of payouts under an uncertain sale price and project cost.
+
+Draws are evaluated in chunks of CHUNK_DRAWS with the vectorized engine
+(app.services.vectorized). Every chunk has its own random stream spawned
+from the request seed, so a seed gives the same draws whether the chunks
+run in this process or in a process pool, and whatever the pool size.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services import vectorized
+
+# Parameters of each distribution, in the order DistributionSpec.params holds them
+DISTRIBUTIONS: Dict[str, Tuple[str, ...]] = {
+    "fixed": ("value",),
+    "uniform": ("low", "high"),
+    "triangular": ("low", "mode", "high"),
+    "normal": ("mean", "std"),
+    "lognormal": ("median", "sigma"),  # sigma of the underlying normal
+}
+
+# Scenario parameters that can be drawn, in drawing order
+SIMULATED_PARAMETERS = ("sale_price", "project_cost")
+
+# Draws per chunk; also the unit of work of the process pool
+CHUNK_DRAWS = 10_000
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# evaluate_grid outputs kept per draw
+SAMPLED_OUTPUTS = ("status", "project_profit", "profit", "final_value", "profit_value")
+
+
+@dataclass(frozen=True)
+class DistributionSpec:
+    """A distribution for one simulated parameter."""
+    kind: str
+    params: Tuple[float, ...]
+    
+    def draw(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Draw `size` values; negative draws are clipped to zero."""
+        p = self.params
+        if self.kind == "fixed":
+            values = np.full(size, p[0])
+        elif self.kind == "uniform":
+            values = rng.uniform(p[0], p[1], size)
+        elif self.kind == "triangular":
+            values = rng.triangular(p[0], p[1], p[2], size)
+        elif self.kind == "normal":
+            values = rng.normal(p[0], p[1], size)
+        else:
+            values = p[0] * rng.lognormal(0.0, p[1], size)
+        return values.clip(min=0.0)
+
+
+def parse_distribution(spec: Any) -> DistributionSpec:
+    """
+    Parse a distribution from a request body.
+    
+    A plain number is a fixed value; otherwise an object such as
+    {"dist": "triangular", "low": 900000, "mode": 1000000, "high": 1300000}.
+    
+    Args:
+        spec: Number, numeric string or distribution object
+    
+    Returns:
+        DistributionSpec
+    
+    Raises:
+        ValueError: Unknown distribution, missing or inconsistent parameters
+    """
+    if not isinstance(spec, dict):
+        return DistributionSpec("fixed", (float(spec),))
+    kind = spec.get("dist")
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {kind!r}; expected one of {', '.join(DISTRIBUTIONS)}.")
+    names = DISTRIBUTIONS[kind]
+    missing = [name for name in names if spec.get(name) is None]
+    if missing:
+        raise ValueError(f"Distribution '{kind}' needs {', '.join(missing)}.")
+    params = tuple(float(spec[name]) for name in names)
+    if not all(np.isfinite(params)):
+        raise ValueError(f"Distribution '{kind}' parameters must be finite.")
+    if kind == "uniform" and params[0] > params[1]:
+        raise ValueError("Uniform distribution needs low <= high.")
+    if kind == "triangular" and not (params[0] <= params[1] <= params[2] and params[0] < params[2]):
+        raise ValueError("Triangular distribution needs low <= mode <= high and low < high.")
+    if kind in ("normal", "lognormal") and params[1] < 0:
+        raise ValueError(f"Distribution '{kind}' needs a non-negative spread.")
+    if kind == "lognormal" and params[0] <= 0:
+        raise ValueError("Lognormal distribution needs a positive median.")
+    return DistributionSpec(kind, params)
+
+
+def simulate_chunk(
+    participants: vectorized.ParticipantArrays,
+    base: Mapping[str, float],
+    specs: Mapping[str, DistributionSpec],
+    property_model: str,
+    property_profit_min_pct: Optional[float],
+    property_profit_max_pct: Optional[float],
+    seed: np.random.SeedSequence,
+    size: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Draw and evaluate one chunk of scenarios.
+    
+    A module-level function so that a process pool can run it.
+    
+    Returns:
+        The drawn parameters (G,) and the SAMPLED_OUTPUTS of evaluate_grid
+    """
+    rng = np.random.default_rng(seed)
+    params = {name: np.full(size, value) for name, value in base.items()}
+    for name in SIMULATED_PARAMETERS:
+        if name in specs:
+            params[name] = specs[name].draw(rng, size)
+    out = vectorized.evaluate_grid(
+        participants, params, property_model, property_profit_min_pct, property_profit_max_pct
+    )
+    sample = {name: params[name] for name in SIMULATED_PARAMETERS}
+    sample.update({key: out[key] for key in SAMPLED_OUTPUTS})
+    return sample
+
+
+def run_simulation(
+    participants: vectorized.ParticipantArrays,
+    base: Mapping[str, float],
+    specs: Mapping[str, DistributionSpec],
+    draws: int,
+    seed: int,
+    property_model: str = "A",
+    property_profit_min_pct: Optional[float] = None,
+    property_profit_max_pct: Optional[float] = None,
+    workers: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate `draws` random scenarios.
+    
+    Args:
+        participants: Participant arrays (property owner included)
+        base: Value of every GRID_PARAMETERS entry for parameters that are not drawn
+        specs: Distributions of the drawn parameters (keys from SIMULATED_PARAMETERS)
+        draws: Number of scenarios
+        seed: Seed of the random streams
+        property_model: "A" or "B"
+        workers: Processes to spread the chunks over; 0 or 1 runs them here
+    
+    Returns:
+        Arrays of simulate_chunk, concatenated over all draws
+    """
+    sizes = [min(CHUNK_DRAWS, draws - start) for start in range(0, draws, CHUNK_DRAWS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (participants, dict(base), dict(specs), property_model, property_profit_min_pct, property_profit_max_pct)
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            futures = [pool.submit(simulate_chunk, *args, chunk_seed, size) for chunk_seed, size in zip(seeds, sizes)]
+            chunks = [future.result() for future in futures]
+    else:
+        chunks = [simulate_chunk(*args, chunk_seed, size) for chunk_seed, size in zip(seeds, sizes)]
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def histograms(rows: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-row histograms with equal-width bins between each row's min and max.
+    
+    Args:
+        rows: Array of shape (N, D), one row per participant
+        bins: Bins per row
+    
+    Returns:
+        Tuple of (counts (N, bins), edges (N, bins + 1)). A constant row
+        puts every draw in its first bin.
+    """
+    n = rows.shape[0]
+    low = rows.min(axis=1)
+    high = rows.max(axis=1)
+    width = np.where(high > low, (high - low) / bins, 1.0)
+    # One bincount for all rows: row j uses bins j * bins .. (j + 1) * bins - 1
+    index = np.clip(((rows - low[:, None]) / width[:, None]).astype(np.intp), 0, bins - 1)
+    index += (np.arange(n, dtype=np.intp) * bins)[:, None]
+    counts = np.bincount(index.ravel(), minlength=n * bins).reshape(n, bins)
+    edges = low[:, None] + width[:, None] * np.arange(bins + 1)
+    edges[:, -1] = np.where(high > low, high, edges[:, -1])
+    return counts, edges
+
+
+def summarize(
+    values: np.ndarray, percentiles: Sequence[float] = PERCENTILES, bins: int = 0
+) -> Dict[str, np.ndarray]:
+    """
+    Summary statistics over draws.
+    
+    Args:
+        values: Array of shape (D,) or (D, N)
+        percentiles: Percentiles to report, 0-100
+        bins: Histogram bins; 0 skips the histogram
+    
+    Returns:
+        Dict of mean, std, min, max (shape of one draw), percentiles
+        (len(percentiles), ...) and, with bins, counts and edges
+    """
+    # Draws of one participant contiguous: partitioning along strided columns is several times slower
+    rows = np.ascontiguousarray(values.T) if values.ndim == 2 else values[None, :]
+    summary = {
+        "mean": rows.mean(axis=1),
+        "std": rows.std(axis=1),
+        "min": rows.min(axis=1),
+        "max": rows.max(axis=1),
+        "percentiles": np.percentile(rows, list(percentiles), axis=1),
+    }
+    if bins:
+        summary["counts"], summary["edges"] = histograms(rows, bins)
+    if values.ndim == 1:
+        summary = {key: array[..., 0] if key == "percentiles" else array[0] for key, array in summary.items()}
+    return summary
+
+
+def status_counts(status: np.ndarray) -> Dict[str, int]:
+    """Number of draws per evaluate_grid status."""
+    codes: List[Tuple[str, int]] = [
+        ("ok", vectorized.STATUS_OK),
+        ("budget_exceeded", vectorized.STATUS_BUDGET_EXCEEDED),
+        ("bounds_infeasible", vectorized.STATUS_BOUNDS_INFEASIBLE),
+    ]
+    return {name: int(np.count_nonzero(status == code)) for name, code in codes}
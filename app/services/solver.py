@@ -0,0 +1,310 @@
+"""
+Inverse solver: the value of one input that gives a participant a target share or payout.
+
+Role bonuses move every share linearly as long as no Model B profit bounds
+apply, so the answer follows from two evaluations. The other variables
+(property weight, sale price, payments) and bounded Model B are rational or
+piecewise in the variable and are bracketed instead: a coarse scan for a
+sign change, then Illinois false position. Every candidate is evaluated with
+compute_distribution, so the answer is exact to the engine.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.calculator import compute_distribution
+from app.services.models import Investor, Project, RoleBonuses
+from app.services.records import ResultRecord
+
+# Variables the solver can move
+ROLE_VARIABLES: Tuple[str, ...] = tuple(RoleBonuses.model_fields)
+SOLVER_VARIABLES = ROLE_VARIABLES + ("property_weight", "sale_price", "payment")
+
+# Participant figures a target can be set on
+TARGET_METRICS = ("total_share", "profit_share", "final_value", "profit_value")
+
+# Bounds used when the request gives none; money variables always need explicit bounds
+DEFAULT_BOUNDS: Dict[str, Tuple[Decimal, Decimal]] = {name: (Decimal("0"), Decimal("100")) for name in ROLE_VARIABLES}
+DEFAULT_BOUNDS["property_weight"] = (Decimal("0"), Decimal("10"))
+
+# Intervals of the coarse scan for a sign change
+SCAN_INTERVALS = 16
+
+HUNDRED = Decimal("100")
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """compute_distribution at one value of the variable."""
+    value: Decimal
+    achieved: Optional[Decimal]  # None when the inputs are infeasible
+    results: List[ResultRecord]
+    meta: Dict[str, Any]
+    project: Project
+    errors: List[str]
+    warnings: List[str]
+
+
+def metric_value(
+    results: Sequence[ResultRecord], meta: Dict[str, Any], participant: str, metric: str
+) -> Optional[Decimal]:
+    """
+    A participant's share or payout in a calculation.
+    
+    Args:
+        results: Rows of compute_distribution
+        meta: Its meta dict
+        participant: Participant name (first match)
+        metric: One of TARGET_METRICS
+    
+    Returns:
+        The value, or None when the participant is not in the results
+    """
+    for r in results:
+        if r.name != participant:
+            continue
+        profit = r.profit_share if r.profit_share is not None else r.total_share
+        if metric == "total_share":
+            return r.total_share
+        if metric == "profit_share":
+            return profit
+        sale_price: Decimal = meta["sale_price"]
+        project_profit: Decimal = meta["project_profit"]
+        if metric == "final_value":
+            return r.total_share * sale_price / HUNDRED
+        return profit * project_profit / HUNDRED
+    return None
+
+
+def _solve_linear(
+    evaluate: Callable[[Decimal], Evaluation], lower: Decimal, upper: Decimal, target: Decimal
+) -> Optional[Evaluation]:
+    """
+    Solve a target that is affine in a role bonus from two evaluations.
+    
+    Returns:
+        The evaluation at the solution, or None when the target is not within
+        the feasible part of [lower, upper] (the caller then brackets)
+    """
+    first = evaluate(lower)
+    if first.achieved is None:
+        return None
+    second = evaluate(upper)
+    if second.achieved is None:
+        # A role bonus takes from the base pool one for one; the budget ends where it is empty
+        limit = lower + first.meta["base_pool"]
+        if not lower < limit < upper:
+            return None
+        second = evaluate(limit)
+        if second.achieved is None:
+            return None
+    slope = (second.achieved - first.achieved) / (second.value - first.value)
+    if slope == 0:
+        return first if first.achieved == target else None
+    value = first.value + (target - first.achieved) / slope
+    if not first.value <= value <= second.value:
+        return None
+    return evaluate(value)
+
+
+def _solve_bracketed(
+    evaluate: Callable[[Decimal], Evaluation],
+    lower: Decimal,
+    upper: Decimal,
+    target: Decimal,
+    tolerance: Decimal,
+    max_iterations: int,
+    errors: List[str]
+) -> Optional[Evaluation]:
+    """
+    Scan [lower, upper] for a sign change and refine it by Illinois false position.
+    
+    Errors are appended in place when the target cannot be met.
+    
+    Returns:
+        The evaluation within tolerance of the target, or None
+    """
+    step = (upper - lower) / SCAN_INTERVALS
+    scan = [evaluate(lower + step * i) for i in range(SCAN_INTERVALS)] + [evaluate(upper)]
+    # Signed distance from the target at each scan point, None where infeasible
+    offsets = [None if e.achieved is None else e.achieved - target for e in scan]
+    reached = [offset for offset in offsets if offset is not None]
+    if not reached:
+        errors.append("No value between min and max gives a valid distribution.")
+        errors.extend(scan[0].errors)
+        return None
+    for e, offset in zip(scan, offsets):
+        if offset is not None and abs(offset) <= tolerance:
+            return e
+    
+    bracket = None
+    for i in range(SCAN_INTERVALS):
+        fa, fb = offsets[i], offsets[i + 1]
+        if fa is not None and fb is not None and (fa > 0) != (fb > 0):
+            bracket = (scan[i], scan[i + 1], fa, fb)
+            break
+    if bracket is None:
+        errors.append(
+            f"Target is not reachable between min and max; the value ranges from "
+            f"{min(reached) + target} to {max(reached) + target} there."
+        )
+        return None
+    
+    a, b, fa, fb = bracket
+    retained = 0  # -1: a was kept by the last step, 1: b was kept
+    for _ in range(max_iterations):
+        value = (a.value * fb - b.value * fa) / (fb - fa)
+        if not a.value < value < b.value:
+            value = (a.value + b.value) / 2
+        c = evaluate(value)
+        if c.achieved is None:
+            errors.append(f"Inputs become infeasible at {value} inside the bracket.")
+            errors.extend(c.errors)
+            return None
+        fc = c.achieved - target
+        if abs(fc) <= tolerance:
+            return c
+        if (fc > 0) == (fb > 0):
+            b, fb = c, fc
+            if retained == -1:
+                fa /= 2  # Illinois: halve the weight of an end kept twice
+            retained = -1
+        else:
+            a, fa = c, fc
+            if retained == 1:
+                fb /= 2
+            retained = 1
+        if b.value - a.value <= (abs(a.value) + abs(b.value) + 1) * Decimal("1e-24"):
+            closest = a if abs(fa) < abs(fb) else b
+            errors.append(
+                f"Target falls in a jump of the value at {closest.value}; the nearest reachable value is "
+                f"{closest.achieved}."
+            )
+            return None
+    errors.append(f"Solver did not converge within {max_iterations} iterations.")
+    return None
+
+
+def solve_target(
+    investors: List[Investor],
+    role_bonuses: RoleBonuses,
+    project: Project,
+    participant: str,
+    metric: str,
+    target: Decimal,
+    variable: str,
+    lower: Optional[Decimal] = None,
+    upper: Optional[Decimal] = None,
+    payer: Optional[str] = None,
+    property_model: str = "A",
+    property_weight: Optional[Decimal] = None,
+    property_profit_min_pct: Optional[Decimal] = None,
+    property_profit_max_pct: Optional[Decimal] = None,
+    tolerance: Decimal = Decimal("1e-9"),
+    engine: str = "decimal",
+    max_iterations: int = 100
+) -> Tuple[Optional[Evaluation], str, int, List[str], List[str]]:
+    """
+    Find the value of one input that gives a participant a target share or payout.
+    
+    Role bonuses are solved in closed form unless Model B profit bounds are
+    set; the other variables, and role bonuses whose closed-form answer misses
+    the target, by a bracketed root search.
+    
+    Args:
+        investors: List of Investor objects (excluding property owner)
+        role_bonuses: Role bonus percentages
+        project: Project details
+        participant: Name of the participant the target applies to
+        metric: One of TARGET_METRICS; shares in percent, values in money
+        target: Target value of the metric
+        variable: One of SOLVER_VARIABLES
+        lower: Smallest value of the variable (default from DEFAULT_BOUNDS)
+        upper: Largest value of the variable (default from DEFAULT_BOUNDS)
+        payer: Participant whose payment is the variable ("payment" only);
+            for the property owner it is the property value
+        property_model: "A" for Negotiated %, "B" for Valued contribution
+        tolerance: Allowed absolute difference from the target
+        engine: compute_distribution engine used for every evaluation
+        max_iterations: Bound on the refinement steps
+    
+    Returns:
+        Tuple of (evaluation at the solution or None, method ("closed_form"
+        or "bracketed"), number of evaluations, errors list, warnings list)
+    """
+    errors: List[str] = []
+    warnings: List[str] = []
+    property_model = (property_model or "A").upper()
+    weight = Decimal("1.0") if property_weight is None else property_weight
+    
+    if variable not in SOLVER_VARIABLES:
+        errors.append(f"Unknown variable '{variable}'.")
+    if metric not in TARGET_METRICS:
+        errors.append(f"Unknown target metric '{metric}'.")
+    if variable == "property_weight" and property_model != "B":
+        errors.append("Property weight only applies to Model B.")
+    if variable in ("property_base_share", "property_profit_share") and property_model != "A":
+        errors.append("Property pools only apply to Model A.")
+    if errors:
+        return None, "", 0, errors, warnings
+    default_lower, default_upper = DEFAULT_BOUNDS.get(variable, (None, None))
+    lower = default_lower if lower is None else lower
+    upper = default_upper if upper is None else upper
+    if lower is None or upper is None:
+        errors.append(f"Variable '{variable}' needs min and max.")
+        return None, "", 0, errors, warnings
+    if not 0 <= lower < upper:
+        errors.append("Bounds need 0 <= min < max.")
+    elif variable in ROLE_VARIABLES and upper > 100:
+        errors.append("Role bonus bounds must be within 0-100.")
+    
+    owner = project.property_owner if project.property_value > 0 or variable == "payment" else ""
+    names = [inv.name for inv in investors]
+    if participant not in names and not (owner and participant == owner):
+        errors.append(f"Participant '{participant}' not found.")
+    # Position of the payer among the investors; the property owner pays with the property value
+    payer_index = -1
+    if variable == "payment":
+        if payer in names:
+            payer_index = names.index(payer)
+        elif not (owner and payer == owner):
+            errors.append(f"Payer '{payer}' not found.")
+    if errors:
+        return None, "", 0, errors, warnings
+    
+    evaluations = 0
+    
+    def evaluate(value: Decimal) -> Evaluation:
+        nonlocal evaluations
+        evaluations += 1
+        bonuses, point_project, point_investors, point_weight = role_bonuses, project, investors, weight
+        if variable in ROLE_VARIABLES:
+            bonuses = role_bonuses.model_copy(update={variable: value})
+        elif variable == "property_weight":
+            point_weight = value
+        elif variable == "sale_price":
+            point_project = project.model_copy(update={"sale_price": value})
+        elif payer_index >= 0:
+            point_investors = list(investors)
+            point_investors[payer_index] = investors[payer_index].model_copy(update={"payment": value})
+        else:
+            point_project = project.model_copy(update={"property_value": value})
+        results, meta, point_errors, point_warnings = compute_distribution(
+            point_investors, bonuses, point_project, property_model, point_weight,
+            property_profit_min_pct, property_profit_max_pct, engine=engine
+        )
+        achieved = None if point_errors else metric_value(results, meta, participant, metric)
+        return Evaluation(value, achieved, results, meta, point_project, point_errors, point_warnings)
+    
+    solution = None
+    method = "bracketed"
+    bounded = property_model == "B" and (property_profit_min_pct is not None or property_profit_max_pct is not None)
+    if variable in ROLE_VARIABLES and not bounded:
+        candidate = _solve_linear(evaluate, lower, upper, target)
+        if candidate is not None and candidate.achieved is not None and abs(candidate.achieved - target) <= tolerance:
+            solution, method = candidate, "closed_form"
+    if solution is None:
+        solution = _solve_bracketed(evaluate, lower, upper, target, tolerance, max_iterations, errors)
+    if solution is not None:
+        warnings.extend(solution.warnings)
+    return solution, method, evaluations, errors, warnings
@@ -0,0 +1,56 @@
+"""Per-request timing of calculation stages (parse, validate, compute, serialize)."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+
+class StageTimings:
+    """Exclusive seconds per stage: time spent in a nested stage is not counted in its parent."""
+    
+    __slots__ = ("durations", "stack")
+    
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+        self.stack: List[float] = []
+
+
+_current: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+
+def begin() -> StageTimings:
+    """Start collecting stage timings in the current context (one request)."""
+    timings = StageTimings()
+    _current.set(timings)
+    return timings
+
+
+def end() -> Optional[StageTimings]:
+    """Stop collecting; returns the timings gathered since begin(), if any."""
+    timings = _current.get()
+    _current.set(None)
+    return timings
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as stage `name`; a no-op unless begin() was called.
+    
+    Repeated stages add up, and a stage nested in another is subtracted from
+    its parent, so the durations of a request never overlap.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    timings.stack.append(0.0)
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = timings.stack.pop()
+        timings.durations[name] = timings.durations.get(name, 0.0) + elapsed - nested
+        if timings.stack:
+            timings.stack[-1] += elapsed
@@ -0,0 +1,187 @@
+"""Incremental CSV/NDJSON cap-table readers and streamed result writers."""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any, Iterable, Iterator, List, Optional, Sequence
+
+from app.services.records import ParticipantRecord
+
+# Longest accepted input line, in bytes
+MAX_LINE_BYTES = 64 * 1024
+
+# Roles accepted in uploaded cap tables; the property owner comes from the scenario
+UPLOAD_ROLES = ("Developer", "Constructor", "Investor")
+
+# Accepted header spellings for each column
+COLUMN_ALIASES = {
+    "name": "name",
+    "role": "role",
+    "payment": "payment",
+    "paid": "payment",
+}
+
+
+def iter_lines(stream: IO[bytes], max_line: int = MAX_LINE_BYTES) -> Iterator[str]:
+    """
+    Read decoded lines from a binary stream without buffering the whole body.
+    
+    Args:
+        stream: Binary request stream
+        max_line: Longest accepted line, in bytes
+    
+    Yields:
+        Lines including their line terminator
+    """
+    while True:
+        line = stream.readline(max_line + 1)
+        if not line:
+            return
+        if len(line) > max_line:
+            raise ValueError(f"Line longer than {max_line} bytes.")
+        yield line.decode("utf-8")
+
+
+def make_participant(name: Any, role: Any, payment: Any) -> ParticipantRecord:
+    """
+    Validate one uploaded row and build its record.
+    
+    Applies the same rules as models.Investor: a non-empty name, a known
+    role and a non-negative payment.
+    """
+    name = str(name or "").strip()
+    role = str(role or "").strip()
+    if not name:
+        raise ValueError("Participant name is required.")
+    if role not in UPLOAD_ROLES:
+        raise ValueError(f"Unknown role '{role}'.")
+    try:
+        amount = Decimal(str(payment if payment not in (None, "") else 0).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid payment '{payment}'.")
+    if not amount.is_finite() or amount < 0:
+        raise ValueError(f"Invalid payment '{payment}'.")
+    return ParticipantRecord(name, role, amount)
+
+
+def read_csv(lines: Iterable[str], max_rows: int) -> Iterator[ParticipantRecord]:
+    """
+    Parse CSV participants with a name, role and payment (or paid) header.
+    
+    Args:
+        lines: Decoded input lines
+        max_rows: Largest accepted number of participants
+    
+    Yields:
+        ParticipantRecord per data row; blank rows are skipped
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {COLUMN_ALIASES.get(h.strip().lower()): i for i, h in enumerate(header)}
+    missing = [c for c in ("name", "role", "payment") if c not in columns]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}.")
+    name_col, role_col, payment_col = columns["name"], columns["role"], columns["payment"]
+    width = max(name_col, role_col, payment_col) + 1
+    
+    count = 0
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if len(row) < width:
+            raise ValueError(f"Line {reader.line_num}: expected at least {width} columns.")
+        count += 1
+        if count > max_rows:
+            raise ValueError(f"At most {max_rows} participants per upload.")
+        try:
+            yield make_participant(row[name_col], row[role_col], row[payment_col])
+        except ValueError as e:
+            raise ValueError(f"Line {reader.line_num}: {e}")
+
+
+def read_ndjson(lines: Iterable[str], max_rows: int) -> Iterator[ParticipantRecord]:
+    """
+    Parse newline-delimited JSON participants: {"name", "role", "payment"} per line.
+    
+    Args:
+        lines: Decoded input lines
+        max_rows: Largest accepted number of participants
+    
+    Yields:
+        ParticipantRecord per line; blank lines are skipped
+    """
+    count = 0
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        count += 1
+        if count > max_rows:
+            raise ValueError(f"At most {max_rows} participants per upload.")
+        try:
+            item = json.loads(line)
+            if not isinstance(item, dict):
+                raise ValueError("Expected a JSON object.")
+            yield make_participant(item.get("name"), item.get("role"), item.get("payment"))
+        except ValueError as e:
+            raise ValueError(f"Line {line_num}: {e}")
+
+
+def stream_csv(rows: Iterable[Sequence[str]], fieldnames: Sequence[str], chunk_rows: int = 500) -> Iterator[str]:
+    """
+    Render rows as CSV, yielding one chunk per chunk_rows rows.
+    
+    Args:
+        rows: Rows of values in fieldnames order (ResponseWriter.values)
+        fieldnames: Column order, written as the header
+        chunk_rows: Rows per yielded chunk
+    
+    Yields:
+        CSV text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(rows: Iterable[str], chunk_rows: int = 500) -> Iterator[str]:
+    """
+    Join JSON rows into newline-delimited JSON, yielding one chunk per chunk_rows rows.
+    
+    Args:
+        rows: Serialized JSON objects (ResponseWriter.json_rows)
+        chunk_rows: Rows per yielded chunk
+    
+    Yields:
+        NDJSON text chunks
+    """
+    chunk: List[str] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def detect_format(content_type: Optional[str]) -> str:
+    """Map a request Content-Type to "csv" or "ndjson"; raises ValueError otherwise."""
+    mimetype = (content_type or "").split(";")[0].strip().lower()
+    if mimetype in ("text/csv", "application/csv"):
+        return "csv"
+    if mimetype in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return "ndjson"
+    raise ValueError("Upload must be text/csv or application/x-ndjson.")
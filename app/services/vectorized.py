@@ -0,0 +1,213 @@
+"""Vectorized (NumPy) evaluation of the share distribution over many scenarios."""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.models import Project
+from app.services.records import ParticipantLike
+
+# Role codes used in the participant arrays
+DEVELOPER = 0
+CONSTRUCTOR = 1
+INVESTOR = 2
+PROPERTY_OWNER = 3
+
+ROLE_CODES = {
+    "Developer": DEVELOPER,
+    "Constructor": CONSTRUCTOR,
+    "Investor": INVESTOR,
+    "Property Owner": PROPERTY_OWNER,
+}
+
+# Per-scenario status codes returned by evaluate_grid
+STATUS_OK = 0
+STATUS_BUDGET_EXCEEDED = 1
+STATUS_BOUNDS_INFEASIBLE = 2
+
+# Slack for float comparisons that are exact in the Decimal engine
+EPSILON = 1e-9
+
+# Scenario parameters evaluate_grid accepts as arrays
+GRID_PARAMETERS = (
+    "sale_price",
+    "project_cost",
+    "property_weight",
+    "developer",
+    "constructor",
+    "investor",
+    "property_base_share",
+    "property_profit_share",
+)
+
+
+@dataclass(frozen=True)
+class ParticipantArrays:
+    """Participants stored as contiguous arrays, property owner included."""
+    names: List[str]
+    roles: List[str]
+    payments: np.ndarray  # float64, property owner carries property_value
+    role_codes: np.ndarray  # int8, see ROLE_CODES
+    owner_index: Optional[int]
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def build_participant_arrays(investors: Sequence[ParticipantLike], project: Project) -> ParticipantArrays:
+    """
+    Convert investors (and the property owner, if any) to arrays.
+    
+    The property owner is appended last, mirroring compute_distribution.
+    
+    Args:
+        investors: Investor objects or participant records (excluding property owner)
+        project: Project details
+    
+    Returns:
+        ParticipantArrays for the whole cap table
+    """
+    names = [inv.name for inv in investors]
+    roles: List[str] = [inv.role for inv in investors]
+    payments = [float(inv.payment) for inv in investors]
+    owner_index = None
+    
+    if project.property_owner and project.property_value > 0:
+        owner_index = len(names)
+        names.append(project.property_owner)
+        roles.append("Property Owner")
+        payments.append(float(project.property_value))
+    
+    return ParticipantArrays(
+        names=names,
+        roles=roles,
+        payments=np.asarray(payments, dtype=np.float64),
+        role_codes=np.asarray([ROLE_CODES[r] for r in roles], dtype=np.int8),
+        owner_index=owner_index,
+    )
+
+
+def evaluate_grid(
+    participants: ParticipantArrays,
+    params: Dict[str, np.ndarray],
+    property_model: str = "A",
+    property_profit_min_pct: Optional[float] = None,
+    property_profit_max_pct: Optional[float] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate the distribution for G scenarios in one pass.
+    
+    Follows the same algorithm as compute_distribution, with every scenario
+    parameter given as a float array of shape (G,). Participant-level outputs
+    have shape (G, N).
+    
+    Args:
+        participants: Participant arrays (property owner included)
+        params: Arrays for every name in GRID_PARAMETERS
+        property_model: "A" or "B"
+        property_profit_min_pct: Model B lower bound on the owner's profit share
+        property_profit_max_pct: Model B upper bound on the owner's profit share
+    
+    Returns:
+        Dict of arrays: status, base_pool, role_pool, property_pool, cash_total_eff,
+        project_profit (G,) and base, role, property, equity, profit,
+        final_value, profit_value (G, N)
+    """
+    sale_price = params["sale_price"]
+    project_cost = params["project_cost"]
+    weight = params["property_weight"]
+    g = sale_price.shape[0]
+    n = len(participants)
+    codes = participants.role_codes
+    payments = participants.payments
+    owner = participants.owner_index
+    has_owner = owner is not None
+    property_value = float(payments[owner]) if owner is not None else 0.0
+    
+    project_profit = np.maximum(sale_price - project_cost, 0.0)
+    is_profitable = project_profit > 0
+    role_pool = params["developer"] + params["constructor"] + params["investor"]
+    
+    if property_model == "A":
+        property_profit_effective = np.where(
+            is_profitable & (property_value > 0), params["property_profit_share"], 0.0
+        )
+        property_pool = params["property_base_share"] + property_profit_effective
+    else:
+        property_pool = np.zeros(g)
+    base_pool = 100.0 - role_pool - property_pool
+    status = np.where(base_pool < -EPSILON, STATUS_BUDGET_EXCEEDED, STATUS_OK)
+    
+    # Per-head role bonuses; role counts are fixed across the grid
+    per_head = np.zeros((g, 4))
+    for code, name in ((DEVELOPER, "developer"), (CONSTRUCTOR, "constructor"), (INVESTOR, "investor")):
+        count = int(np.count_nonzero(codes == code))
+        if count:
+            per_head[:, code] = params[name] / count
+    
+    # Effective cash: Model B adds the weighted property value
+    regular = codes != PROPERTY_OWNER
+    cash_regular = float(payments[regular].sum())
+    if property_model == "B" and has_owner:
+        cash_total_eff = cash_regular + property_value * weight
+    else:
+        cash_total_eff = np.full(g, cash_regular)
+    base_pool = np.where((cash_total_eff == 0) & (base_pool > 0), 0.0, base_pool)
+    scale = np.divide(
+        base_pool, cash_total_eff, out=np.zeros(g), where=(cash_total_eff > 0) & (base_pool > 0)
+    )
+    
+    # Equity shares
+    base = scale[:, None] * np.where(regular, payments, 0.0)[None, :]
+    role = per_head[:, codes.astype(np.intp)]
+    prop = np.zeros((g, n))
+    if owner is not None:
+        role[:, owner] = 0.0
+        if property_model == "A":
+            prop[:, owner] = property_pool
+        else:
+            base[:, owner] = scale * property_value * weight
+    equity = base + role + prop
+    
+    # Profit shares, with Model B bounds on the property owner
+    profit = equity.copy()
+    if property_model == "B" and owner is not None:
+        owner_equity = equity[:, owner]
+        target = owner_equity
+        if property_profit_min_pct is not None:
+            target = np.maximum(target, property_profit_min_pct)
+        if property_profit_max_pct is not None:
+            target = np.minimum(target, property_profit_max_pct)
+        target = np.where(is_profitable, target, owner_equity)
+        delta = target - owner_equity
+        others_sum = equity.sum(axis=1) - owner_equity
+        adjust = delta != 0
+        factor = np.divide(
+            others_sum - delta, others_sum, out=np.ones(g), where=adjust & (others_sum > 0)
+        )
+        infeasible = adjust & ((others_sum == 0) | (factor < 0))
+        status = np.where((status == STATUS_OK) & infeasible, STATUS_BOUNDS_INFEASIBLE, status)
+        profit *= factor[:, None]
+        profit[:, owner] = target
+    
+    profit_sum = profit.sum(axis=1)
+    profit = np.divide(
+        profit * 100.0, profit_sum[:, None], out=profit, where=(profit_sum > 0)[:, None]
+    )
+    
+    return {
+        "status": status,
+        "base_pool": base_pool,
+        "role_pool": role_pool,
+        "property_pool": property_pool,
+        "cash_total_eff": cash_total_eff,
+        "project_profit": project_profit,
+        "base": base,
+        "role": role,
+        "property": prop,
+        "equity": equity,
+        "profit": profit,
+        "final_value": equity / 100.0 * sale_price[:, None],
+        "profit_value": profit / 100.0 * project_profit[:, None],
+    }
+
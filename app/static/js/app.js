@@ -55,14 +55,14 @@ function addInvestor() {
     
     // Recalculate investor count from existing boxes
     const existingBoxes = document.querySelectorAll('.investor-box');
-    investorCount = existingBoxes.length;
-        // Current investor count tracked
-    
-    if (investorCount >= maxInvestors) {
+
+    if (existingBoxes.length >= maxInvestors) {
         alert('Maximum number of investors reached!');
         return;
     }
 
+    // Indexes can have gaps after a re-render; continue after the highest one
+    investorCount = Math.max(0, ...Array.from(existingBoxes, box => parseInt(box.dataset.investorIndex, 10) || 0));
     investorCount++;
         // Investor count incremented
     const newInvestorBox = document.createElement('div');
@@ -317,7 +317,46 @@ function resetForm() {
     updateDistribution();
 }
 
-function exportToPDF() {
+// Exports are built and streamed by the server from the current inputs
+// (POST /api/export); submitting a form lets the browser save the response
+// straight to disk instead of holding the document in the page.
+function downloadExport(format) {
+    if (!document.getElementById('results-section')) {
+        alert('No results to export.');
+        return;
+    }
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.action = `/api/export?format=${encodeURIComponent(format)}`;
+    form.style.display = 'none';
+    
+    const input = document.createElement('input');
+    input.type = 'hidden';
+    input.name = 'payload';
+    input.value = JSON.stringify(serializeFormToPayload());
+    form.appendChild(input);
+    
+    document.body.appendChild(form);
+    form.submit();
+    form.remove();
+}
+
+// The server PDF uses the standard Helvetica font, which only covers WinAnsi
+// (Western European) text. Arabic names or an Arabic page are printed from
+// the rendered results instead, where the browser shapes the text.
+const WIN_ANSI = /^[\x20-\x7E\xA0-\xFF€‚ƒ„…†‡ˆ‰Š‹ŒŽ‘’“”•–—˜™š›œžŸ]*$/;
+
+function needsBrowserPDF() {
+    if (typeof currentLang !== 'undefined' && currentLang === 'ar') {
+        return true;
+    }
+    const payload = serializeFormToPayload();
+    const names = (payload.participants || []).flatMap(p => [p.name, p.role]);
+    names.push(payload.property_owner);
+    return names.some(name => name && !WIN_ANSI.test(name));
+}
+
+function printResultsPDF() {
     const content = document.getElementById('results-section');
     if (!content) {
         alert('No results to export.');
@@ -458,79 +497,20 @@ function exportToPDF() {
     win.print();
 }
 
-// CSV Export Functions
-function tableToCSV(table) {
-    const rows = Array.from(table.querySelectorAll('tr'));
-    const esc = (val) => {
-        const s = (val ?? '').toString();
-        const needsQuotes = /[",\n\r]/.test(s);
-        const escaped = s.replace(/"/g, '""');
-        return needsQuotes ? `"${escaped}"` : escaped;
-    };
-    return rows.map(row => {
-        const cells = Array.from(row.querySelectorAll('th,td')).map(td => esc(td.textContent.trim()));
-        return cells.join(',');
-    }).join('\r\n');
+function exportToPDF() {
+    if (needsBrowserPDF()) {
+        printResultsPDF();
+    } else {
+        downloadExport('pdf');
+    }
 }
 
-function downloadCSV(csv, filename = 'investment-results.csv') {
-    // Prepend BOM for Excel UTF-8
-    const bom = new Uint8Array([0xEF, 0xBB, 0xBF]);
-    const blob = new Blob([bom, csv], { type: 'text/csv;charset=utf-8;' });
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-    a.download = filename;
-    document.body.appendChild(a);
-    a.click();
-    a.remove();
-    URL.revokeObjectURL(url);
+function exportTableToCSV() {
+    downloadExport('csv');
 }
 
-function exportTableToCSV() {
-    const section = document.getElementById('results-section');
-    if (!section) {
-        alert('No results to export.');
-        return;
-    }
-    const meta = document.querySelector('.summary-info');
-    const table = section.querySelector('table');
-    if (!table) {
-        alert('Results table not found.');
-        return;
-    }
-    
-    const csvBody = tableToCSV(table);
-    const now = new Date().toISOString();
-    
-    // Get meta data from data attributes or compute
-    let base = '0';
-    let role = '0';
-    let prop = '0';
-    let cash = '';
-    
-    if (meta) {
-        base = meta.dataset.basePool || '0';
-        role = meta.dataset.rolePool || '0';
-        prop = meta.dataset.propertyPool || '0';
-        cash = meta.dataset.cashTotal || '';
-    }
-    
-    // Get current language
-    const lang = typeof currentLang !== 'undefined' ? currentLang : 'en';
-    const langName = lang === 'ar' ? 'العربية' : 'English';
-    const dict = (window.i18n && window.i18n[lang]) || {};
-    
-    const metaLines = [
-        `# ${dict.title || 'Investment Share Calculator'}`,
-        `# ${lang === 'ar' ? 'تم الإنشاء:' : 'Generated:'} ${now}`,
-        `# ${lang === 'ar' ? 'اللغة:' : 'Language:'} ${langName}`,
-        `# ${lang === 'ar' ? 'المجموعات:' : 'Pools:'} base=${base}%, role=${role}%, property=${prop}%`,
-        cash ? `# ${dict.cashInvestLbl || 'Cash Investment (excl. property):'}: €${cash}` : `#`
-    ].join('\r\n');
-    
-    const csv = metaLines + '\r\n' + csvBody;
-    downloadCSV(csv);
+function exportToXLSX() {
+    downloadExport('xlsx');
 }
 
 // Input hardening and validation
@@ -603,6 +583,8 @@ function debounce(fn, ms = 150) {
 
 // AbortController for live calculation requests
 let liveCtrl = null;
+// Last HTTP live result and its ETag (sent only with ETAG_ENABLED); a 304 reuses it
+let liveLast = null;
 
 // Human-friendly formatting
 const fmtEUR = new Intl.NumberFormat(undefined, {
@@ -877,11 +859,15 @@ document.addEventListener('DOMContentLoaded', function() {
     window.resetForm = resetForm;
     window.exportToPDF = exportToPDF;
     
-    // Wire up CSV export button
+    // Wire up CSV and XLSX export buttons
     const csvBtn = document.getElementById('export-csv');
     if (csvBtn) {
         csvBtn.addEventListener('click', exportTableToCSV);
     }
+    const xlsxBtn = document.getElementById('export-xlsx');
+    if (xlsxBtn) {
+        xlsxBtn.addEventListener('click', exportToXLSX);
+    }
     
     // Wire up PDF export button (may not exist on page load if no results)
     function wireUpPDFButton() {
@@ -899,6 +885,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const hasResults = resultsSection !== null && resultsSection.querySelector('table') !== null;
         const pdfBtn = document.getElementById('export-pdf');
         const csvBtn = document.getElementById('export-csv');
+        const xlsxBtn = document.getElementById('export-xlsx');
         
         if (pdfBtn) {
             pdfBtn.disabled = !hasResults;
@@ -910,6 +897,11 @@ document.addEventListener('DOMContentLoaded', function() {
             csvBtn.style.opacity = hasResults ? '1' : '0.5';
             csvBtn.style.cursor = hasResults ? 'pointer' : 'not-allowed';
         }
+        if (xlsxBtn) {
+            xlsxBtn.disabled = !hasResults;
+            xlsxBtn.style.opacity = hasResults ? '1' : '0.5';
+            xlsxBtn.style.cursor = hasResults ? 'pointer' : 'not-allowed';
+        }
     }
     
     // Update buttons on page load
@@ -1659,6 +1651,7 @@ function renderResultsJSON(data) {
         buttonsDiv.innerHTML = `
             <button class="button export-button" type="button" id="export-pdf" data-i18n="exportPdf">${dict.exportPdf || 'Export as PDF'}</button>
             <button id="export-csv" class="button export-button" type="button" style="background-color:#00bcd4;" data-i18n="exportCsv">${dict.exportCsv || 'Export as CSV'}</button>
+            <button id="export-xlsx" class="button export-button" type="button" style="background-color:#217346;" data-i18n="exportXlsx">${dict.exportXlsx || 'Export as Excel'}</button>
         `;
         
         // Apply translations to newly created buttons
@@ -1670,12 +1663,16 @@ function renderResultsJSON(data) {
         // Wire up export buttons
         const pdfBtn = document.getElementById('export-pdf');
         const csvBtn = document.getElementById('export-csv');
+        const xlsxBtn = document.getElementById('export-xlsx');
         if (pdfBtn) {
             pdfBtn.addEventListener('click', exportToPDF);
         }
         if (csvBtn) {
             csvBtn.addEventListener('click', exportTableToCSV);
         }
+        if (xlsxBtn) {
+            xlsxBtn.addEventListener('click', exportToXLSX);
+        }
     }
     
     // Refresh budget bar & gates
@@ -1691,6 +1688,86 @@ function renderResultsJSON(data) {
     }
 }
 
+// Live calculation over a WebSocket (ASGI mode); HTTP POST is the fallback.
+// The socket sends the full payload once, then only changed fields and rows.
+const liveSocket = {
+    ws: null,
+    open: false,
+    retryAt: 0,
+    seq: 0,
+    sent: null
+};
+
+function connectLiveSocket() {
+    if (liveSocket.ws || Date.now() < liveSocket.retryAt || !('WebSocket' in window)) return;
+    const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const ws = new WebSocket(`${scheme}://${window.location.host}/ws/calculate`);
+    liveSocket.ws = ws;
+    ws.onopen = () => {
+        liveSocket.open = true;
+        liveSocket.sent = null;  // next update sends the full state
+    };
+    ws.onmessage = event => {
+        let msg;
+        try {
+            msg = JSON.parse(event.data);
+        } catch (e) {
+            return;
+        }
+        if (msg.seq !== liveSocket.seq) return;  // superseded
+        if (msg.type === 'result') {
+            renderResultsJSON(msg.data);
+        } else {
+            console.warn('Live calc failed', msg.detail || msg.error);
+        }
+    };
+    ws.onclose = () => {
+        // Not served (WSGI mode) or dropped: use HTTP for a while, then retry
+        liveSocket.ws = null;
+        liveSocket.open = false;
+        liveSocket.sent = null;
+        liveSocket.retryAt = Date.now() + 30000;
+    };
+}
+
+function diffLivePayload(prev, next) {
+    const fields = {};
+    Object.keys(next).forEach(key => {
+        if (key !== 'participants' && prev[key] !== next[key]) fields[key] = next[key];
+    });
+    Object.keys(prev).forEach(key => {
+        if (!(key in next)) fields[key] = null;
+    });
+    const before = prev.participants || [];
+    const after = next.participants || [];
+    const rows = {};
+    if (before.length !== after.length) {
+        fields.participants = after;
+    } else {
+        after.forEach((row, i) => {
+            if (JSON.stringify(row) !== JSON.stringify(before[i])) rows[i] = row;
+        });
+    }
+    return { fields, rows };
+}
+
+// Returns false when the socket is not available and HTTP should be used
+function sendLiveUpdate(payload) {
+    connectLiveSocket();
+    if (!liveSocket.open) return false;
+    let msg;
+    if (liveSocket.sent) {
+        const { fields, rows } = diffLivePayload(liveSocket.sent, payload);
+        if (!Object.keys(fields).length && !Object.keys(rows).length) return true;
+        msg = { type: 'update', seq: ++liveSocket.seq, fields, participants: rows };
+    } else {
+        msg = { type: 'state', seq: ++liveSocket.seq, payload };
+    }
+    liveSocket.ws.send(JSON.stringify(msg));
+    liveSocket.sent = payload;
+    return true;
+}
+
 // Live calculation via API
 function updateResultsLive() {
     const form = document.getElementById('calc-form');
@@ -1708,23 +1785,39 @@ function updateResultsLive() {
         return; // Don't call API with empty inputs
     }
     
+    if (sendLiveUpdate(payload)) {
+        return;
+    }
+    
     // Abort prior request
     if (liveCtrl) {
         liveCtrl.abort();
     }
     liveCtrl = new AbortController();
     
+    const headers = { 'Content-Type': 'application/json' };
+    if (liveLast) {
+        headers['If-None-Match'] = liveLast.etag;
+    }
+    
     fetch('/api/calculate', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers,
         body: JSON.stringify(payload),
         signal: liveCtrl.signal
     })
     .then(res => {
+        if (res.status === 304 && liveLast) {
+            return liveLast.data;
+        }
         if (!res.ok) {
             throw new Error(`HTTP ${res.status}`);
         }
-        return res.json();
+        const etag = res.headers.get('ETag');
+        return res.json().then(data => {
+            liveLast = etag ? { etag, data } : null;
+            return data;
+        });
     })
     .then(data => {
         renderResultsJSON(data);
@@ -34,6 +34,7 @@ window.i18n = {
         results: "Results",
         exportPdf: "Export as PDF",
         exportCsv: "Export as CSV",
+        exportXlsx: "Export as Excel",
         summary: "Share Budget Breakdown",
         basePool: "Base Pool:",
         rolePools: "Role Pools:",
@@ -137,6 +138,7 @@ window.i18n = {
         results: "النتائج",
         exportPdf: "تصدير إلى PDF",
         exportCsv: "تصدير إلى CSV",
+        exportXlsx: "تصدير إلى Excel",
         summary: "تفصيل ميزانية الأسهم",
         basePool: "مجموعة الأساس:",
         rolePools: "مجموعات الأدوار:",
@@ -0,0 +1,64 @@
+"""
+Startup warm-up of the request path.
+
+With gunicorn's preload_app the master builds the app once and then forks
+the workers. Running one small calculation and compiling the templates in
+the master first means workers inherit compiled Jinja templates, exercised
+Pydantic validators and filled lazy caches, instead of paying for them on
+their first request, and share those pages copy-on-write.
+"""
+
+# Small scenario that touches every role and the property owner
+WARM_UP_PARTICIPANTS = [
+    {"name": "Developer", "role": "Developer", "payment": "0"},
+    {"name": "Constructor", "role": "Constructor", "payment": "10000"},
+    {"name": "Investor", "role": "Investor", "payment": "70000"},
+]
+
+WARM_UP_SCENARIO = {
+    "project_cost": "100000",
+    "sale_price": "150000",
+    "developer_bonus": "10",
+    "constructor_bonus": "5",
+    "investor_bonus": "5",
+    "property_value": "20000",
+    "property_owner": "Owner",
+    "property_base_share": "10",
+    "property_profit_share": "5",
+    "property_model": "A",
+    "participants": WARM_UP_PARTICIPANTS,
+}
+
+TEMPLATES = ("index.html", "results.html", "_banners.html")
+
+
+def warm_up(app):
+    """
+    Render the calculator page and run one calculation through the JSON and form parsers.
+    
+    Views are called directly, outside the request hooks, so nothing is
+    recorded: the rate limiter, metrics and result cache are not touched.
+    
+    Args:
+        app: Flask application
+    """
+    from app.routes_api import parse_calculation_request
+    from app.services.calculator import compute_distribution, parse_investor_rows
+    
+    with app.app_context():
+        for name in TEMPLATES:
+            app.jinja_env.get_template(name)
+        
+        params = parse_calculation_request(WARM_UP_SCENARIO)
+        parse_investor_rows([
+            (index, {"name": p["name"], "role": p["role"], "paid": p["payment"]})
+            for index, p in enumerate(WARM_UP_PARTICIPANTS, 1)
+        ])
+        results, meta, errors, warnings = compute_distribution(
+            params["investors"], params["role_bonuses"], params["project"], params["property_model"]
+        )
+        app.extensions["response_writer"].payload(results, meta, errors, warnings, params["project"])
+    
+    # Builds the URL map matcher and renders the page with its form
+    with app.test_request_context("/"):
+        app.view_functions["main.index"]()
@@ -0,0 +1,4 @@
+"""ASGI entry point for production deployment (uvicorn workers)."""
+from app.asgi import create_asgi_app
+
+app = create_asgi_app('production')
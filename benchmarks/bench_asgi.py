@@ -0,0 +1,130 @@
+"""
+Load test for concurrent live-calculation connections.
+
+Opens --connections keep-alive connections that each POST /api/calculate,
+pause for --think seconds (the debounce between keystrokes) and repeat for
+--duration seconds. --send-delay holds the body back after the headers, like a
+slow mobile uplink. Run it against the sync (WSGI) and ASGI deployments to
+compare how many concurrent clients each one sustains.
+
+Usage:
+    python -m benchmarks.bench_asgi --url http://127.0.0.1:5000 [--connections 200] [--duration 10]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from tests.test_api import SCENARIO
+
+
+def build_request(host, path, body):
+    """Raw HTTP/1.1 keep-alive POST request."""
+    head = (
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: keep-alive\r\n\r\n"
+    )
+    return head.encode("latin-1"), body
+
+
+async def read_response(reader):
+    """Read one HTTP response; returns (status code, whether the server closes the connection)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed")
+    status = int(status_line.split()[1])
+    length = 0
+    close = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection":
+            close = value.strip().lower() == "close"
+    await reader.readexactly(length)
+    return status, close
+
+
+async def client(host, port, request, think, send_delay, deadline, stats):
+    """One simulated user; reconnects when the server closes the connection."""
+    head, body = request
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.monotonic()
+            writer.write(head)
+            if send_delay:
+                await writer.drain()
+                await asyncio.sleep(send_delay)
+            writer.write(body)
+            await writer.drain()
+            status, close = await asyncio.wait_for(read_response(reader), timeout=deadline - start + 5)
+            stats["latencies"].append(time.monotonic() - start)
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+            if close:
+                stats["reconnects"] += 1
+                writer.close()
+                reader = writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            stats["errors"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+            continue
+        await asyncio.sleep(think)
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, connections, duration, think, send_delay=0.0):
+    parts = urlsplit(url)
+    request = build_request(parts.netloc, "/api/calculate", json.dumps(SCENARIO).encode())
+    stats = {"latencies": [], "status": {}, "errors": 0, "reconnects": 0}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        client(parts.hostname, parts.port or 80, request, think, send_delay, deadline, stats)
+        for _ in range(connections)
+    ))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--connections', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--think', type=float, default=0.3)
+    parser.add_argument('--send-delay', type=float, default=0.0)
+    args = parser.parse_args()
+    
+    stats = asyncio.run(run(args.url, args.connections, args.duration, args.think, args.send_delay))
+    latencies = sorted(stats["latencies"])
+    ok = stats["status"].get(200, 0)
+    print(
+        f"connections: {args.connections}  duration: {args.duration}s  "
+        f"think: {args.think}s  send delay: {args.send_delay}s"
+    )
+    print(
+        f"responses: {len(latencies)}  ok: {ok}  status: {stats['status']}  "
+        f"reconnects: {stats['reconnects']}  errors: {stats['errors']}"
+    )
+    print(f"throughput: {ok / args.duration:.1f} req/s")
+    if latencies:
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"latency ms: p50 {statistics.median(latencies) * 1000:.1f}  p99 {p99 * 1000:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare compute_distribution engines on synthetic cap tables.
+
+Usage:
+    python -m benchmarks.bench_engines [--sizes 1000 10000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from app.services.calculator import ENGINES, compute_distribution
+from app.services.models import Investor, RoleBonuses, Project
+
+
+def make_cap_table(size, seed=1):
+    """Build a deterministic cap table with one developer and `size` paying participants."""
+    rng = random.Random(seed)
+    investors = [Investor(name='Developer', role='Developer', payment=Decimal('0'))]
+    for i in range(size):
+        role = 'Constructor' if i % 10 == 0 else 'Investor'
+        payment = Decimal(rng.randint(10000, 5000000)) / Decimal('100')
+        investors.append(Investor(name=f'Participant {i}', role=role, payment=payment))
+    return investors
+
+
+def make_scenario(property_model='A'):
+    """Role bonuses, project and Model B arguments for the benchmark."""
+    role_bonuses = RoleBonuses(
+        developer=Decimal('20'),
+        constructor=Decimal('5'),
+        investor=Decimal('15'),
+        property_base_share=Decimal('10') if property_model == 'A' else Decimal('0'),
+        property_profit_share=Decimal('5') if property_model == 'A' else Decimal('0')
+    )
+    project = Project(
+        project_cost=Decimal('1000000'),
+        sale_price=Decimal('1500000'),
+        property_value=Decimal('250000'),
+        property_owner='Owner'
+    )
+    return role_bonuses, project
+
+
+def best_of(fn, repeat):
+    """Best wall-clock time of `repeat` calls, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=ENGINES)
+    args = parser.parse_args()
+    
+    print(f"{'model':<6}{'size':>8}" + ''.join(f'{engine:>12}' for engine in args.engines) + '   (ms)')
+    for property_model in ('A', 'B'):
+        role_bonuses, project = make_scenario(property_model)
+        for size in args.sizes:
+            investors = make_cap_table(size)
+            timings = [
+                best_of(lambda: compute_distribution(
+                    investors, role_bonuses, project, property_model,
+                    Decimal('1.2') if property_model == 'B' else None,
+                    Decimal('10') if property_model == 'B' else None,
+                    engine=engine
+                ), args.repeat)
+                for engine in args.engines
+            ]
+            print(f'{property_model:<6}{size:>8}' + ''.join(f'{t * 1000:>12.1f}' for t in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare the single-pass form parser with the previous probing loop.
+
+Usage:
+    python -m benchmarks.bench_forms [--sizes 100 1000 10000 50000] [--repeat 3]
+"""
+import argparse
+from decimal import Decimal
+
+from werkzeug.datastructures import ImmutableMultiDict
+
+from app.services.calculator import parse_investors
+from app.services.models import Investor
+
+from benchmarks.bench_engines import best_of
+from benchmarks.suite import make_form
+
+
+def probing_loop(form):
+    """The parser before the single-pass rewrite: probes name{i} until the first gap."""
+    investors = []
+    i = 1
+    while f'name{i}' in form:
+        name = form.get(f'name{i}', '').strip()
+        role = form.get(f'role{i}', '').strip()
+        if name and role:
+            if role == 'Developer':
+                payment = Decimal("0")
+            else:
+                payment = Decimal(form.get(f'paid{i}', '0') or '0')
+            investors.append(Investor(name=name, role=role, payment=payment))
+        i += 1
+    return investors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'size':>8}{'loop ms':>12}{'single ms':>12}{'loop us/row':>14}{'single us/row':>15}")
+    for size in args.sizes:
+        form = ImmutableMultiDict(make_form(size))
+        assert parse_investors(form) == probing_loop(form)
+        times = [best_of(lambda: fn(form), args.repeat) for fn in (probing_loop, parse_investors)]
+        rows = size + 1
+        print(
+            f'{size:>8}' + ''.join(f'{t * 1000:>12.1f}' for t in times)
+            + f'{times[0] / rows * 1e6:>14.2f}{times[1] / rows * 1e6:>15.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Time the decimal engine at several context precisions.
+
+Shares are quantized to PERCENT_PLACES whatever the precision, so results are
+compared with the highest precision given: "same" means every share is equal.
+
+Usage:
+    python -m benchmarks.bench_precision [--precisions 16 20 28 34] [--sizes 1000 10000] [--repeat 5]
+"""
+import argparse
+
+from app.services.calculator import DECIMAL_PRECISION, compute_distribution
+
+from benchmarks.bench_engines import best_of, make_cap_table, make_scenario
+from benchmarks.suite import MODEL_VARIANTS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--precisions', type=int, nargs='+', default=sorted({16, DECIMAL_PRECISION, 28, 34}))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    reference_precision = max(args.precisions)
+    print(f"{'model':<10}{'size':>8}" + ''.join(f'{p:>10}' for p in args.precisions) + '   (ms)')
+    for label, weight, min_pct, max_pct in MODEL_VARIANTS:
+        property_model = label[0]
+        role_bonuses, project = make_scenario(property_model)
+        for size in args.sizes:
+            investors = make_cap_table(size)
+            
+            def run(precision):
+                results, _, errors, _ = compute_distribution(
+                    investors, role_bonuses, project, property_model, weight, min_pct, max_pct,
+                    precision=precision
+                )
+                assert errors == []
+                return results
+            
+            reference = run(reference_precision)
+            cells = []
+            for precision in args.precisions:
+                same = run(precision) == reference
+                cells.append(f"{best_of(lambda: run(precision), args.repeat) * 1000:>8.1f}{' ' if same else '*'} ")
+            print(f'{label:<10}{size:>8}' + ''.join(cells))
+    print(f'* shares differ from precision {reference_precision}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Measure time and memory of compute_distribution with internal records vs Pydantic results.
+
+Usage:
+    python -m benchmarks.bench_records [--sizes 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import tracemalloc
+
+from app.services.calculator import compute_distribution
+from app.services.records import to_models
+
+from benchmarks.bench_engines import best_of, make_cap_table, make_scenario
+
+
+def peak_memory(fn):
+    """Peak memory allocated while running fn, in bytes."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    role_bonuses, project = make_scenario()
+    
+    def records_only(investors):
+        return compute_distribution(investors, role_bonuses, project)
+    
+    def with_models(investors):
+        results, meta, errors, warnings = compute_distribution(investors, role_bonuses, project)
+        return to_models(results), meta, errors, warnings
+    
+    print(f"{'size':>8}{'records ms':>14}{'models ms':>14}{'records MiB':>14}{'models MiB':>14}")
+    for size in args.sizes:
+        investors = make_cap_table(size)
+        times = [best_of(lambda: fn(investors), args.repeat) for fn in (records_only, with_models)]
+        peaks = [peak_memory(lambda: fn(investors)) / 2 ** 20 for fn in (records_only, with_models)]
+        print(f'{size:>8}' + ''.join(f'{t * 1000:>14.1f}' for t in times) + ''.join(f'{m:>14.1f}' for m in peaks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Compare the direct-to-bytes response writer with dicts of strings and jsonify.
+
+Usage:
+    python -m benchmarks.bench_serialize [--sizes 1000 10000 50000] [--repeat 5]
+"""
+import argparse
+import json
+
+from app import create_app
+from app.routes_api import build_response_payload
+from app.services import serialize
+from app.services.calculator import compute_distribution
+from app.services.serialize import ResponseWriter
+
+from benchmarks.bench_engines import best_of, make_cap_table, make_scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    app = create_app('testing')
+    writers = {'default': ResponseWriter(), 'rounded': ResponseWriter(percent_places=6, money_places=2)}
+    print(f"orjson: {'yes' if serialize.HAVE_ORJSON else 'no'}")
+    print(f"{'size':>8}{'jsonify ms':>12}{'writer ms':>11}{'rounded ms':>12}{'speedup':>9}")
+    for size in args.sizes:
+        role_bonuses, project = make_scenario()
+        results, meta, errors, warnings = compute_distribution(make_cap_table(size), role_bonuses, project)
+        
+        def dicts():
+            return app.json.dumps(build_response_payload(results, meta, errors, warnings, project))
+        
+        def written(kind):
+            return lambda: writers[kind].payload(results, meta, errors, warnings, project)
+        
+        assert json.loads(written('default')()) == json.loads(dicts())
+        times = [best_of(fn, args.repeat) for fn in (dicts, written('default'), written('rounded'))]
+        print(
+            f'{size:>8}' + f'{times[0] * 1000:>12.1f}{times[1] * 1000:>11.1f}{times[2] * 1000:>12.1f}'
+            + f'{times[0] / times[1]:>8.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Time Monte Carlo simulations of a synthetic deal.
+
+Usage:
+    python -m benchmarks.bench_simulate [--draws 10000 100000] [--participants 50] [--workers 0 4]
+"""
+import argparse
+
+from app.services.calculator import compute_simulation
+from app.services.simulation import parse_distribution
+
+from benchmarks.bench_engines import best_of, make_cap_table, make_scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--draws', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--participants', type=int, default=50)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    # One developer, the paying participants and the property owner
+    investors = make_cap_table(args.participants - 2)
+    role_bonuses, project = make_scenario()
+    specs = {
+        'sale_price': parse_distribution({'dist': 'normal', 'mean': 1500000, 'std': 200000}),
+        'project_cost': parse_distribution({'dist': 'triangular', 'low': 900000, 'mode': 1000000, 'high': 1300000}),
+    }
+    print(f'participants: {args.participants}')
+    print(f"{'draws':>8}{'workers':>9}{'ms':>9}")
+    for draws in args.draws:
+        for workers in args.workers:
+            def run():
+                _, errors, _ = compute_simulation(
+                    investors, role_bonuses, project, specs, draws, seed=1, workers=workers
+                )
+                assert errors == []
+            
+            print(f'{draws:>8}{workers:>9}{best_of(run, args.repeat) * 1000:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Measure gunicorn startup: time to first request and memory per worker.
+
+Starts gunicorn with gunicorn.conf.py in each mode and polls /health until
+the first 200. It then times the first POST /api/calculate and GET /, and
+reads RSS, PSS and private memory of every worker from
+/proc/<pid>/smaps_rollup (Linux only). PSS splits shared pages between the
+processes sharing them, so it shows what copy-on-write sharing saves where
+RSS does not.
+
+Modes:
+    cold     no preload, no warm-up: every worker imports and builds the app
+    preload  app built once in the master, no warm-up
+    warm     preload, warm-up and gc.freeze (the default configuration)
+
+Usage:
+    python -m benchmarks.bench_startup [--workers 4] [--repeat 3] [--modes cold preload warm]
+"""
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from tests.test_api import SCENARIO
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODES = {
+    "cold": {"GUNICORN_PRELOAD": "false", "WARM_UP": "false"},
+    "preload": {"GUNICORN_PRELOAD": "true", "WARM_UP": "false"},
+    "warm": {"GUNICORN_PRELOAD": "true", "WARM_UP": "true"},
+}
+
+
+def children(pid):
+    """PIDs of the direct children of a process."""
+    found = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces; the parent pid follows the closing parenthesis
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            found.append(int(entry.name))
+    return found
+
+
+def memory(pid):
+    """RSS, PSS and private memory of a process, in MiB."""
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0]) / 1024
+    return fields["Rss"], fields["Pss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+
+def settled_memory(master, workers, deadline):
+    """Memory of each worker once all of them are up and their RSS stopped growing."""
+    previous = None
+    while time.perf_counter() < deadline:
+        pids = children(master)
+        if len(pids) == workers:
+            current = [memory(pid) for pid in pids]
+            if previous is not None and len(previous) == workers and all(
+                now[0] - before[0] < 0.1 for now, before in zip(current, previous)
+            ):
+                return current
+            previous = current
+        time.sleep(0.5)
+    raise TimeoutError("Workers did not settle")
+
+
+def wait_for(url, deadline):
+    """Poll url until it answers 200; returns the time of the first success."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return time.perf_counter()
+        except OSError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"{url} did not answer")
+
+
+def run_once(mode, workers, port, timeout=60):
+    """Start gunicorn in `mode` and measure it; returns a dict of results."""
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ, **MODES[mode],
+            "GUNICORN_WORKERS": str(workers),
+            "LOG_DIR": tmp,
+            "LOG_LEVEL": "warning",
+            "RATELIMIT_ENABLED": "false",
+            "PROMETHEUS_MULTIPROC_DIR": os.path.join(tmp, "prometheus"),
+            "RATELIMIT_STORAGE_URI": f"sqlite:///{tmp}/ratelimit.sqlite",
+        }
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}", "wsgi:app"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            ready = wait_for(f"{base}/health", start + timeout)
+            
+            request = urllib.request.Request(
+                f"{base}/api/calculate", data=json.dumps(SCENARIO).encode(),
+                headers={"Content-Type": "application/json"}
+            )
+            sent = time.perf_counter()
+            urllib.request.urlopen(request, timeout=10).read()
+            first_request = time.perf_counter() - sent
+            
+            sent = time.perf_counter()
+            urllib.request.urlopen(f"{base}/", timeout=10).read()
+            first_page = time.perf_counter() - sent
+            
+            worker_memory = settled_memory(server.pid, workers, time.perf_counter() + timeout)
+            return {
+                "first_response": ready - start,
+                "first_calculation": first_request,
+                "first_page": first_page,
+                "rss": statistics.mean(m[0] for m in worker_memory),
+                "pss": statistics.mean(m[1] for m in worker_memory),
+                "private": statistics.mean(m[2] for m in worker_memory),
+                "total_pss": sum(m[1] for m in worker_memory) + memory(server.pid)[1],
+            }
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+    
+    print(f"{args.workers} workers, median of {args.repeat} runs")
+    print(f"{'mode':<9}{'first 200 s':>12}{'first calc ms':>15}{'first page ms':>15}"
+          f"{'RSS MiB':>9}{'PSS MiB':>9}{'private MiB':>13}{'total PSS MiB':>15}")
+    for mode in args.modes:
+        runs = [run_once(mode, args.workers, args.port) for _ in range(args.repeat)]
+        median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(
+            f"{mode:<9}{median['first_response']:>12.2f}{median['first_calculation'] * 1000:>15.1f}"
+            f"{median['first_page'] * 1000:>15.1f}"
+            f"{median['rss']:>9.1f}{median['pss']:>9.1f}"
+            f"{median['private']:>13.1f}{median['total_pss']:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
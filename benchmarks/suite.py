@@ -0,0 +1,228 @@
+"""
+Benchmark suite with a stored baseline and a regression gate.
+
+Times compute_distribution (Model A, Model B, Model B with profit bounds),
+form parsing and end-to-end requests through the Flask test client, writes
+the timings as JSON and compares them with a baseline file. Exits with
+status 1 when a case is slower than the baseline by more than --threshold.
+
+Usage:
+    python -m benchmarks.suite [--output bench_results.json] [--baseline benchmarks/baseline.json]
+                               [--threshold 0.25] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from werkzeug.datastructures import ImmutableMultiDict
+
+from app.services.calculator import ENGINES, compute_distribution, parse_investors
+
+from benchmarks.bench_engines import make_cap_table, make_scenario
+
+# Regressions smaller than this (seconds) are timer noise, whatever the ratio
+MIN_DELTA = 0.0005
+
+# Model B variants: (label, weight, min %, max %)
+MODEL_VARIANTS = (
+    ("A", None, None, None),
+    ("B", Decimal("1.2"), None, None),
+    ("B-bounded", Decimal("1.2"), Decimal("5"), Decimal("8")),
+)
+
+
+def measure(fn, repeat):
+    """Run fn `repeat` times; returns best and median wall-clock seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"best": min(timings), "median": statistics.median(timings)}
+
+
+def make_form(size, property_model="A"):
+    """Form data as submitted by the calculator page, with `size` paying participants."""
+    fields = [
+        ("developer_bonus", "20"), ("constructor_bonus", "5"), ("investor_bonus", "15"),
+        ("project_cost", "1000000"), ("sale_price", "1500000"), ("property_value", "250000"),
+        ("property_owner", "Owner"), ("property_share", "10"), ("property_profit_share", "5"),
+        ("property_model", property_model),
+    ]
+    for i, investor in enumerate(make_cap_table(size), start=1):
+        fields += [(f"name{i}", investor.name), (f"role{i}", investor.role), (f"paid{i}", str(investor.payment))]
+    return fields
+
+
+def make_payload(size):
+    """JSON body for /api/calculate with `size` paying participants."""
+    return {
+        "developer_bonus": "20", "constructor_bonus": "5", "investor_bonus": "15",
+        "project_cost": "1000000", "sale_price": "1500000", "property_value": "250000",
+        "property_owner": "Owner", "property_base_share": "10", "property_profit_share": "5",
+        "property_model": "A",
+        "participants": [
+            {"name": i.name, "role": i.role, "payment": str(i.payment)} for i in make_cap_table(size)
+        ],
+    }
+
+
+def engine_cases(sizes, engines):
+    """Yield (name, fn) for compute_distribution on every model variant and size."""
+    for label, weight, min_pct, max_pct in MODEL_VARIANTS:
+        property_model = label[0]
+        role_bonuses, project = make_scenario(property_model)
+        for size in sizes:
+            investors = make_cap_table(size)
+            for engine in engines:
+                def run(investors=investors, role_bonuses=role_bonuses, project=project,
+                        property_model=property_model, weight=weight, min_pct=min_pct,
+                        max_pct=max_pct, engine=engine):
+                    compute_distribution(
+                        investors, role_bonuses, project, property_model,
+                        weight, min_pct, max_pct, engine=engine
+                    )
+                yield f"engine/{engine}/{label}/n={size}", run
+
+
+def request_cases(sizes):
+    """Yield (name, fn) for form parsing and end-to-end requests."""
+    from app import create_app
+    app = create_app("testing")
+    # Measure the calculation, not the result cache
+    app.extensions.pop("result_cache", None)
+    client = app.test_client()
+    
+    for size in sizes:
+        form = make_form(size)
+        multidict = ImmutableMultiDict(form)
+        payload = make_payload(size)
+        
+        def parse(multidict=multidict):
+            parse_investors(multidict)
+        
+        def api(payload=payload):
+            response = client.post("/api/calculate", json=payload)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        
+        def page(form=multidict):
+            response = client.post("/", data=form)
+            assert response.status_code == 200
+        
+        yield f"parse_form/n={size}", parse
+        yield f"api_calculate/n={size}", api
+        yield f"form_post/n={size}", page
+
+
+def run_suite(engine_sizes, request_sizes, engines=("decimal",), repeat=3, pattern=None, log=None):
+    """
+    Run every benchmark case.
+    
+    Args:
+        engine_sizes: Participant counts for the engine cases
+        request_sizes: Participant counts for parsing and request cases
+        engines: compute_distribution engines to time
+        repeat: Runs per case
+        pattern: Only run cases whose name contains this substring
+        log: Optional callable receiving (name, timing) after each case
+    
+    Returns:
+        Results document (environment and per-case timings)
+    """
+    cases = {}
+    for name, fn in (*engine_cases(engine_sizes, engines), *request_cases(request_sizes)):
+        if pattern and pattern not in name:
+            continue
+        fn()  # warm-up
+        cases[name] = measure(fn, repeat)
+        if log:
+            log(name, cases[name])
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "repeat": repeat,
+        "cases": cases,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare best timings with a baseline.
+    
+    Args:
+        results: Document returned by run_suite
+        baseline: Stored document in the same format
+        threshold: Allowed slowdown as a fraction (0.25 = 25% slower)
+    
+    Returns:
+        List of (name, baseline seconds, current seconds, ratio) for each
+        regression, slowest first. Cases missing from either side are skipped.
+    """
+    regressions = []
+    for name, timing in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        current, previous = timing["best"], base["best"]
+        if current - previous < MIN_DELTA:
+            continue
+        ratio = current / previous if previous else float("inf")
+        if ratio > 1 + threshold:
+            regressions.append((name, previous, current, ratio))
+    return sorted(regressions, key=lambda r: r[3], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default='benchmarks/baseline.json')
+    parser.add_argument('--threshold', type=float, default=float(os.environ.get('BENCH_THRESHOLD', 0.25)))
+    parser.add_argument('--save-baseline', action='store_true', help='write the results to --baseline')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000])
+    parser.add_argument('--request-sizes', type=int, nargs='+', default=[10, 1000])
+    parser.add_argument('--engines', nargs='+', default=['decimal'], choices=ENGINES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', help='only run cases whose name contains this')
+    args = parser.parse_args()
+    
+    def log(name, timing):
+        print(f"{name:<40}{timing['best'] * 1000:>12.2f} ms  (median {timing['median'] * 1000:.2f})")
+    
+    results = run_suite(args.sizes, args.request_sizes, args.engines, args.repeat, args.filter, log)
+    output = args.baseline if args.save_baseline else args.output
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"wrote {output}")
+    if args.save_baseline:
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != results["environment"]:
+        print("warning: baseline was recorded on a different environment")
+    regressions = compare(results, baseline, args.threshold)
+    for name, previous, current, ratio in regressions:
+        print(f"REGRESSION {name}: {previous * 1000:.2f} ms -> {current * 1000:.2f} ms ({ratio:.2f}x)")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    print(f"no regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
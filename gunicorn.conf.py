@@ -1,17 +1,28 @@
 """Gunicorn configuration."""
+import gc
 import multiprocessing
 import os
+import shutil
+import subprocess
+import sys
 
 # Server socket
 bind = "0.0.0.0:5000"
 backlog = 2048
 
 # Worker processes
-workers = (2 * multiprocessing.cpu_count()) + 1
-worker_class = "sync"
+workers = int(os.environ.get("GUNICORN_WORKERS", (2 * multiprocessing.cpu_count()) + 1))
+# "sync" for wsgi:app; "uvicorn.workers.UvicornWorker" for the ASGI entry point asgi:app
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
 worker_connections = 1000
 timeout = 60
-keepalive = 2
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 2))  # raise for ASGI workers, where idle connections are cheap
+
+# Import and build the app once in the master (warmed up, see app/warmup.py)
+# and fork workers from it: they start without re-importing anything and
+# share the master's memory copy-on-write. Set GUNICORN_PRELOAD=false to
+# build the app in each worker instead, e.g. to pick up code on HUP reloads.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
 
 # Logging
 # Write to files if LOG_DIR is set, otherwise use stdout/stderr
@@ -21,6 +32,61 @@ errorlog = os.path.join(log_dir, "gunicorn_error.log") if log_dir else "-"
 loglevel = os.environ.get("LOG_LEVEL", "info").lower()
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
 
+# Metrics: workers write samples to files in this directory and /metrics
+# aggregates them (see app/metrics.py); inherited by the forked workers
+prometheus_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+os.makedirs(prometheus_dir, exist_ok=True)  # a preloaded app creates its metrics before on_starting
+
+
+def on_starting(server):
+    """Start each server run with an empty metrics directory."""
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+
+
+def when_ready(server):
+    """
+    Freeze the preloaded heap before the first fork, and start the job pool.
+    
+    Objects moved to the permanent generation are skipped by the workers'
+    garbage collections, which would otherwise write to their headers and
+    unshare the pages holding them.
+    """
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+    start_job_pool(server)
+
+
+def start_job_pool(server):
+    """Run the background job pool (app/jobs.py) next to the workers when JOBS_ENABLED."""
+    if os.environ.get("JOBS_ENABLED", "false").lower() != "true":
+        return
+    server.job_pool = subprocess.Popen([sys.executable, "-m", "app.jobs"])
+    server.log.info("Started job pool (pid: %s)", server.job_pool.pid)
+
+
+def on_exit(server):
+    """Stop the job pool; jobs it was running are queued again for the next start."""
+    pool = getattr(server, "job_pool", None)
+    if pool is None:
+        return
+    pool.terminate()
+    try:
+        pool.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        pool.kill()
+
+
+def child_exit(server, worker):
+    """Let prometheus_client drop the files of a dead worker."""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
+
 # Process naming
 proc_name = "investment_calculator"
 
@@ -0,0 +1,16 @@
+"""Shared pytest fixtures."""
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def app():
+    """Application configured for testing."""
+    return create_app('testing')
+
+
+@pytest.fixture
+def client(app):
+    """Flask test client."""
+    return app.test_client()
@@ -0,0 +1,88 @@
+"""Tests for the JSON API."""
+from decimal import Decimal
+
+
+SCENARIO = {
+    'project_cost': '100000',
+    'sale_price': '150000',
+    'developer_bonus': '20',
+    'constructor_bonus': '5',
+    'investor_bonus': '10',
+    'property_value': '0',
+    'property_owner': '',
+    'property_base_share': '0',
+    'property_profit_share': '0',
+    'property_model': 'A',
+    'participants': [
+        {'name': 'Dev', 'role': 'Developer', 'payment': '0'},
+        {'name': 'Inv1', 'role': 'Investor', 'payment': '60000'},
+        {'name': 'Inv2', 'role': 'Investor', 'payment': '40000'}
+    ]
+}
+
+
+class TestApiCalculate:
+    """Test the single-scenario endpoint."""
+    
+    def test_calculate(self, client):
+        resp = client.post('/api/calculate', json=SCENARIO)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert len(data['results']) == 3
+        assert data['banners']['errors'] == []
+        inv1 = next(r for r in data['results'] if r['name'] == 'Inv1')
+        # 65% base pool * 60% of cash + 10% / 2 investors
+        assert Decimal(inv1['total_equity_pct']) == Decimal('44')
+
+
+class TestApiCalculateBatch:
+    """Test the batch endpoint."""
+    
+    def test_batch_matches_single_calls(self, client):
+        scenarios = [
+            {'sale_price': str(price)} for price in (120000, 150000, 180000)
+        ]
+        resp = client.post('/api/calculate/batch', json={'base': SCENARIO, 'scenarios': scenarios})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['count'] == 3
+        for index, scenario in enumerate(scenarios):
+            single = client.post('/api/calculate', json={**SCENARIO, **scenario}).get_json()
+            item = data['scenarios'][index]
+            assert item['index'] == index
+            assert item['results'] == single['results']
+            assert item['totals'] == single['totals']
+    
+    def test_batch_reports_errors_per_scenario(self, client):
+        scenarios = [
+            SCENARIO,
+            {**SCENARIO, 'developer_bonus': '90'},
+            {**SCENARIO, 'participants': [{'name': 'X', 'role': 'Nobody', 'payment': '1'}]}
+        ]
+        resp = client.post('/api/calculate/batch', json={'scenarios': scenarios})
+        data = resp.get_json()
+        assert resp.status_code == 200
+        assert data['scenarios'][0]['banners']['errors'] == []
+        assert 'exceeds 100%' in data['scenarios'][1]['banners']['errors'][0]
+        assert data['scenarios'][2]['error'] == 'calculation_failed'
+    
+    def test_batch_requires_scenarios(self, client):
+        resp = client.post('/api/calculate/batch', json={'base': SCENARIO})
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'invalid_batch'
+    
+    def test_batch_size_limit(self, app, client):
+        app.config['BATCH_MAX_SCENARIOS'] = 2
+        resp = client.post('/api/calculate/batch', json={'scenarios': [SCENARIO] * 3})
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'batch_too_large'
+    
+    def test_array_engine(self, client):
+        decimal_data = client.post('/api/calculate', json=SCENARIO).get_json()
+        array_data = client.post('/api/calculate', json={**SCENARIO, 'engine': 'array'}).get_json()
+        for d, a in zip(decimal_data['results'], array_data['results']):
+            assert abs(Decimal(a['total_equity_pct']) - Decimal(d['total_equity_pct'])) < Decimal('1e-9')
+    
+    def test_unknown_engine(self, client):
+        resp = client.post('/api/calculate', json={**SCENARIO, 'engine': 'gpu'})
+        assert resp.status_code == 400
@@ -0,0 +1,60 @@
+"""Tests for the ASGI adapter."""
+import asyncio
+import json
+
+from app.asgi import AsgiApp
+
+from tests.test_api import SCENARIO
+
+
+def call(asgi_app, method, path, body=b'', headers=()):
+    """Run one HTTP request through the ASGI app; returns (status, headers dict, body)."""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+    
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+    
+    async def send(message):
+        sent.append(message)
+    
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'path': path,
+        'root_path': '', 'scheme': 'http', 'query_string': b'',
+        'headers': [(k.encode(), v.encode()) for k, v in headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+    }
+    asyncio.run(asgi_app(scope, receive, send))
+    start = sent[0]
+    response_headers = {k.decode().lower(): v.decode() for k, v in start['headers']}
+    return start['status'], response_headers, b''.join(m.get('body', b'') for m in sent[1:])
+
+
+class TestAsgiApp:
+    """Test native and fallback routes."""
+    
+    def test_health_on_loop(self, app):
+        status, headers, body = call(AsgiApp(app, max_workers=1), 'GET', '/health')
+        assert status == 200
+        assert json.loads(body) == {'status': 'ok'}
+        # Security headers from the Flask app still apply
+        assert headers['x-content-type-options'] == 'nosniff'
+    
+    def test_calculate_matches_wsgi(self, app, client):
+        body = json.dumps(SCENARIO).encode()
+        status, headers, data = call(
+            AsgiApp(app, max_workers=2), 'POST', '/api/calculate', body,
+            headers=[('content-type', 'application/json'), ('content-length', str(len(body)))]
+        )
+        assert status == 200
+        expected = client.post('/api/calculate', json=SCENARIO).get_json()
+        assert json.loads(data)['results'] == expected['results']
+    
+    def test_body_limit(self, app):
+        status, _, _ = call(AsgiApp(app, max_body=10), 'POST', '/api/calculate', b'x' * 11)
+        assert status == 413
+    
+    def test_fallback_route(self, app):
+        status, headers, _ = call(AsgiApp(app), 'GET', '/')
+        assert status == 200
+        assert headers['content-type'].startswith('text/html')
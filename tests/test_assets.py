@@ -0,0 +1,105 @@
+"""Tests for the static asset build and its serving."""
+import gzip
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.assets import AssetManifest, IMMUTABLE, build_assets, minify_css, minify_js
+
+
+STATIC = Path(__file__).resolve().parent.parent / 'app' / 'static'
+
+
+@pytest.fixture
+def built(app, tmp_path):
+    """The app serving a fresh build of its static files from a temporary folder."""
+    static_dir = tmp_path / 'static'
+    shutil.copytree(STATIC, static_dir, ignore=shutil.ignore_patterns('dist'))
+    manifest = build_assets(str(static_dir))
+    app.extensions['assets'] = AssetManifest(str(static_dir))
+    return manifest
+
+
+class TestMinify:
+    """Test the minifiers."""
+    
+    def test_js_comments_and_indentation(self):
+        source = "// header\nfunction f(a) {\n    /* note */\n    return a + 1;  // trailing\n}\n"
+        assert minify_js(source) == "function f(a){\nreturn a+1;\n}\n"
+    
+    def test_js_literals_are_verbatim(self):
+        source = "s = 'a // b';\nt = `x ${ {k: 1}.k } // y`;\nr = s.replace(/\\/\\//g, '');\n"
+        assert minify_js(source) == "s='a // b';\nt=`x ${{k:1}.k} // y`;\nr=s.replace(/\\/\\//g,'');\n"
+    
+    def test_js_keeps_tokens_apart(self):
+        assert minify_js("x = a + +b - -c") == "x=a+ +b- -c\n"
+        assert minify_js("return typeof x") == "return typeof x\n"
+        assert minify_js("a = b / c / d") == "a=b/c/d\n"
+    
+    def test_js_keeps_line_breaks(self):
+        # Automatic semicolon insertion depends on them
+        assert minify_js("a\n\n   ++b") == "a\n++b\n"
+    
+    def test_css(self):
+        source = "/* x */\na :hover, b > c {\n  color: red;\n  content: ' ; ';\n}\n"
+        assert minify_css(source) == "a :hover,b > c{color:red;content:' ; '}\n"
+
+
+class TestBuild:
+    """Test build_assets."""
+    
+    def test_hashed_and_compressed(self, built, tmp_path):
+        dist = tmp_path / 'static' / 'dist'
+        assert set(built) == {'css/style.css', 'js/lang.js', 'js/app.js'}
+        hashed = built['js/app.js']
+        assert hashed.startswith('js/app.') and hashed.endswith('.js')
+        data = (dist / hashed).read_bytes()
+        assert len(data) < (STATIC / 'js' / 'app.js').stat().st_size
+        assert gzip.decompress((dist / f'{hashed}.gz').read_bytes()) == data
+    
+    def test_build_is_reproducible(self, built, tmp_path):
+        dist = tmp_path / 'static' / 'dist'
+        gz = (dist / f"{built['css/style.css']}.gz").read_bytes()
+        assert build_assets(str(tmp_path / 'static')) == built
+        assert (dist / f"{built['css/style.css']}.gz").read_bytes() == gz
+
+
+class TestServing:
+    """Test asset URLs and cache headers."""
+    
+    def test_unbuilt_falls_back_to_static(self, app, client, tmp_path):
+        app.extensions['assets'] = AssetManifest(str(tmp_path))
+        html = client.get('/').get_data(as_text=True)
+        assert '/static/js/app.js' in html
+        resp = client.get('/static/js/app.js')
+        assert resp.headers['Cache-Control'] == 'no-cache'
+    
+    def test_page_links_hashed_assets(self, built, client):
+        html = client.get('/').get_data(as_text=True)
+        assert f"/assets/{built['js/app.js']}" in html
+        assert f"/assets/{built['css/style.css']}" in html
+    
+    def test_precompressed_and_immutable(self, built, client):
+        resp = client.get(f"/assets/{built['js/app.js']}", headers={'Accept-Encoding': 'gzip, deflate'})
+        assert resp.status_code == 200
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert resp.mimetype == 'text/javascript'
+        assert resp.headers['Cache-Control'] == IMMUTABLE
+        assert 'Accept-Encoding' in resp.headers['Vary']
+        assert 'Expires' not in resp.headers
+        assert gzip.decompress(resp.data).startswith(b'let investorCount')
+    
+    def test_identity_encoding(self, built, client):
+        resp = client.get(f"/assets/{built['css/style.css']}")
+        assert 'Content-Encoding' not in resp.headers
+        assert resp.mimetype == 'text/css'
+    
+    def test_unknown_asset(self, built, client):
+        for path in ('js/app.js', 'manifest.json', '../../app/config.py'):
+            resp = client.get(f'/assets/{path}')
+            assert resp.status_code == 404
+            assert resp.headers['Cache-Control'].startswith('no-store')
+    
+    def test_dynamic_pages_stay_no_store(self, built, client):
+        assert client.get('/').headers['Cache-Control'].startswith('no-store')
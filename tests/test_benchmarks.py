@@ -0,0 +1,29 @@
+"""Tests for the benchmark suite's regression gate."""
+from benchmarks.suite import compare, run_suite
+
+
+def doc(**cases):
+    return {'cases': {name: {'best': best, 'median': best} for name, best in cases.items()}}
+
+
+class TestCompare:
+    """Test baseline comparison."""
+    
+    def test_flags_slowdown_above_threshold(self):
+        baseline = doc(a=0.010, b=0.010)
+        results = doc(a=0.014, b=0.012)
+        regressions = compare(results, baseline, threshold=0.25)
+        assert [r[0] for r in regressions] == ['a']
+        assert round(regressions[0][3], 2) == 1.4
+    
+    def test_ignores_noise_and_new_cases(self):
+        # Tiny absolute differences and cases absent from the baseline never fail
+        regressions = compare(doc(a=0.0002, new=1.0), doc(a=0.0001), threshold=0.25)
+        assert regressions == []
+
+
+def test_run_suite_smoke():
+    results = run_suite([10], [10], repeat=1)
+    assert 'engine/decimal/B-bounded/n=10' in results['cases']
+    assert 'api_calculate/n=10' in results['cases']
+    assert compare(results, results, threshold=0) == []
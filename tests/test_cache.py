@@ -0,0 +1,170 @@
+"""Tests for the result cache."""
+from decimal import Decimal
+
+import pytest
+
+from app import create_app, routes_api
+from app.config import TestingConfig
+from app.services.cache import ResultCache, cached_compute, canonical_inputs, keyed_etag
+from app.services.calculator import compute_distribution
+from app.services.models import Investor, RoleBonuses, Project
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def make_args(payment='1000'):
+    investors = [Investor(name='Inv1', role='Investor', payment=Decimal(payment))]
+    role_bonuses = RoleBonuses(investor=Decimal('10'))
+    project = Project(project_cost=Decimal('1000'), sale_price=Decimal('2000'))
+    return investors, role_bonuses, project
+
+
+class TestResultCache:
+    """Test LRU and TTL behavior."""
+    
+    def test_lru_eviction(self):
+        cache = ResultCache(maxsize=2)
+        cache.set(b'a', 1)
+        cache.set(b'b', 2)
+        assert cache.get(b'a') == 1
+        cache.set(b'c', 3)
+        assert cache.get(b'b') is None
+        assert cache.get(b'a') == 1
+        assert cache.get(b'c') == 3
+    
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ResultCache(ttl=10, clock=clock)
+        cache.set(b'a', 1)
+        clock.now = 9.9
+        assert cache.get(b'a') == 1
+        clock.now = 10
+        assert cache.get(b'a') is None
+        assert len(cache) == 0
+    
+    def test_counts_hits_and_misses(self):
+        cache = ResultCache()
+        args = make_args()
+        first = cached_compute(cache, compute_distribution, *args)
+        second = cached_compute(cache, compute_distribution, *args)
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+        assert first == second
+    
+    def test_callers_cannot_mutate_cached_entry(self):
+        cache = ResultCache()
+        args = make_args()
+        _, _, _, warnings = cached_compute(cache, compute_distribution, *args)
+        warnings.append('extra')
+        _, _, _, warnings = cached_compute(cache, compute_distribution, *args)
+        assert 'extra' not in warnings
+    
+    def test_callers_cannot_mutate_cached_records(self):
+        cache = ResultCache()
+        args = make_args()
+        expected = compute_distribution(*args)[0]
+        for _ in range(2):
+            # Once on the miss that fills the cache, once on a hit
+            results = cached_compute(cache, compute_distribution, *args)[0]
+            results[0].total_share = Decimal('99')
+            assert cached_compute(cache, compute_distribution, *args)[0] == expected
+    
+    def test_keys_are_keyed_digests(self):
+        canonical = canonical_inputs(*make_args())
+        first = ResultCache().make_key(canonical)
+        second = ResultCache().make_key(canonical)
+        assert len(first) == 16
+        assert b'Inv1' not in first
+        # Random per-process secret: digests are not comparable across caches
+        assert first != second
+    
+    def test_keyed_etag(self):
+        canonical = canonical_inputs(*make_args())
+        assert keyed_etag(canonical, b'secret') == keyed_etag(canonical, b'secret')
+        assert keyed_etag(canonical, b'secret') != keyed_etag(canonical, b'other')
+        assert keyed_etag(canonical, b'secret') != keyed_etag(canonical_inputs(*make_args('1001')), b'secret')
+    
+    def test_canonical_inputs_distinguish_representation(self):
+        assert canonical_inputs(*make_args('1000')) != canonical_inputs(*make_args('1000.0'))
+        assert canonical_inputs(*make_args()) != canonical_inputs(*make_args(), engine='array')
+
+
+class TestApiCache:
+    """Test the cache behind /api/calculate."""
+    
+    PAYLOAD = {
+        'project_cost': '1000',
+        'sale_price': '2000',
+        'investor_bonus': '10',
+        'participants': [{'name': 'Inv1', 'role': 'Investor', 'payment': '1000'}]
+    }
+    
+    def test_repeated_request_hits_cache(self, app, client):
+        first = client.post('/api/calculate', json=self.PAYLOAD).get_json()
+        second = client.post('/api/calculate', json=self.PAYLOAD).get_json()
+        assert first == second
+        stats = app.extensions['result_cache'].stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+    
+    def test_cache_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'RESULT_CACHE_ENABLED', False)
+        app = create_app('testing')
+        assert 'result_cache' not in app.extensions
+        resp = app.test_client().post('/api/calculate', json=self.PAYLOAD)
+        assert resp.status_code == 200
+
+
+class TestApiETag:
+    """Test conditional /api/calculate requests."""
+    
+    @pytest.fixture
+    def etag_client(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'ETAG_ENABLED', True)
+        return create_app('testing').test_client()
+    
+    def test_off_by_default(self, client):
+        resp = client.post('/api/calculate', json=TestApiCache.PAYLOAD)
+        assert 'ETag' not in resp.headers
+        assert resp.headers['Cache-Control'].startswith('no-store')
+    
+    def test_not_modified(self, etag_client, monkeypatch):
+        first = etag_client.post('/api/calculate', json=TestApiCache.PAYLOAD)
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+        
+        monkeypatch.setattr(routes_api, 'run_calculation', None)  # a 304 must not compute
+        second = etag_client.post(
+            '/api/calculate', json=TestApiCache.PAYLOAD, headers={'If-None-Match': etag}
+        )
+        assert second.status_code == 304
+        assert second.data == b''
+        assert second.headers['ETag'] == etag
+        assert second.headers['Cache-Control'] == 'private, no-cache'
+    
+    def test_changed_request_is_recomputed(self, etag_client):
+        etag = etag_client.post('/api/calculate', json=TestApiCache.PAYLOAD).headers['ETag']
+        changed = {**TestApiCache.PAYLOAD, 'sale_price': '2500'}
+        resp = etag_client.post('/api/calculate', json=changed, headers={'If-None-Match': etag})
+        assert resp.status_code == 200
+        assert resp.headers['ETag'] != etag
+        assert resp.get_json()['totals']['sale_price'] == '2500.00'
+    
+    @pytest.mark.parametrize('setting, value', [('DECIMAL_PRECISION', 24), ('ETAG_SALT', 'release-2')])
+    def test_precision_and_salt_change_tag(self, etag_client, setting, value):
+        etag = etag_client.post('/api/calculate', json=TestApiCache.PAYLOAD).headers['ETag']
+        etag_client.application.config[setting] = value
+        resp = etag_client.post('/api/calculate', json=TestApiCache.PAYLOAD, headers={'If-None-Match': etag})
+        assert resp.status_code == 200
+        assert resp.headers['ETag'] != etag
+    
+    def test_other_endpoints_stay_no_store(self, etag_client):
+        resp = etag_client.get('/health')
+        assert resp.headers['Cache-Control'].startswith('no-store')
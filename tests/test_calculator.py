@@ -48,6 +48,30 @@ class TestParseInvestors:
         ])
         investors = parse_investors(form)
         assert len(investors) == 2
+    
+    def test_parse_tolerates_gaps(self):
+        # Row 2 was deleted; rows after the gap must not be dropped
+        form = ImmutableMultiDict([
+            ('name1', 'A'), ('role1', 'Investor'), ('paid1', '100'),
+            ('name3', 'C'), ('role3', 'Constructor'), ('paid3', '300'),
+            ('name10', 'J'), ('role10', 'Investor'), ('paid10', '1000'),
+        ])
+        investors = parse_investors(form)
+        assert [inv.name for inv in investors] == ['A', 'C', 'J']
+    
+    def test_parse_bracket_syntax(self):
+        form = ImmutableMultiDict([
+            ('participants[1][name]', 'B'), ('participants[1][role]', 'Investor'),
+            ('participants[1][payment]', '20'),
+            ('participants[0][name]', 'A'), ('participants[0][role]', 'Developer'),
+            ('participants[0][paid]', '999'),
+        ])
+        investors = parse_investors(form)
+        assert [(inv.name, inv.payment) for inv in investors] == [('A', Decimal('0')), ('B', Decimal('20'))]
+    
+    def test_parse_skips_incomplete_rows(self):
+        form = ImmutableMultiDict([('name1', ' '), ('role1', 'Investor'), ('name2', 'B'), ('paid2', '5')])
+        assert parse_investors(form) == []
 
 
 class TestComputeRoleCounts:
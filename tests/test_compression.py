@@ -0,0 +1,82 @@
+"""Tests for response compression."""
+import gzip
+import zlib
+
+from app import create_app
+from app.compression import Encoder, compress_stream
+from app.config import TestingConfig
+
+from tests.test_api import SCENARIO
+from tests.test_export import large_scenario
+
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+class TestEncoder:
+    """Test the incremental compressor."""
+
+    def test_stream_round_trip(self):
+        chunks = [b'a' * 1000, 'b' * 1000, b'', b'c' * 10]
+        data = b''.join(compress_stream(iter(chunks), Encoder('gzip', 6, 4)))
+        assert gzip.decompress(data) == b'a' * 1000 + b'b' * 1000 + b'c' * 10
+
+    def test_chunks_decode_as_they_arrive(self):
+        encoder = Encoder('gzip', 6, 4)
+        decoder = zlib.decompressobj(31)
+        assert decoder.decompress(encoder.chunk(b'first row\n')) == b'first row\n'
+        assert decoder.decompress(encoder.chunk(b'second row\n')) == b'second row\n'
+
+
+class TestCompression:
+    """Test negotiation in the app."""
+
+    def test_api_response_is_gzipped(self, client):
+        plain = client.post('/api/calculate', json=SCENARIO)
+        resp = client.post('/api/calculate', json=SCENARIO, headers=GZIP)
+        assert 'Content-Encoding' not in plain.headers
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in resp.headers['Vary']
+        assert int(resp.headers['Content-Length']) == len(resp.data) < len(plain.data)
+        assert gzip.decompress(resp.data) == plain.data
+
+    def test_page_is_gzipped(self, client):
+        resp = client.get('/', headers=GZIP)
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert b'</html>' in gzip.decompress(resp.data)
+
+    def test_small_responses_are_not(self, client):
+        resp = client.get('/health', headers=GZIP)
+        assert 'Content-Encoding' not in resp.headers
+
+    def test_identity_only(self, client):
+        resp = client.post('/api/calculate', json=SCENARIO, headers={'Accept-Encoding': 'gzip;q=0, identity'})
+        assert 'Content-Encoding' not in resp.headers
+
+    def test_streamed_export(self, client):
+        resp = client.post(
+            '/api/export', query_string={'format': 'csv'}, json=large_scenario(1200), headers=GZIP
+        )
+        assert resp.is_streamed
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in resp.headers
+        text = gzip.decompress(resp.data).decode('utf-8-sig')
+        assert text.count('Inv1199') == 1
+
+    def test_xlsx_is_not_recompressed(self, client):
+        resp = client.post('/api/export', query_string={'format': 'xlsx'}, json=SCENARIO, headers=GZIP)
+        assert 'Content-Encoding' not in resp.headers
+        assert resp.data.startswith(b'PK')
+
+    def test_etag_becomes_weak(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'ETAG_ENABLED', True)
+        client = create_app('testing').test_client()
+        resp = client.post('/api/calculate', json=SCENARIO, headers=GZIP)
+        assert resp.headers['ETag'].startswith('W/"')
+        again = client.post('/api/calculate', json=SCENARIO, headers={**GZIP, 'If-None-Match': resp.headers['ETag']})
+        assert again.status_code == 304
+
+    def test_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'COMPRESS_ENABLED', False)
+        resp = create_app('testing').test_client().get('/', headers=GZIP)
+        assert 'Content-Encoding' not in resp.headers
@@ -0,0 +1,196 @@
+"""Tests for incremental (delta) recomputation."""
+from decimal import Decimal
+
+import pytest
+
+from app.services.calculator import apply_edit, compute_delta, compute_distribution, running_totals
+from app.services.models import Investor, RoleBonuses, Project
+
+from tests.test_api import SCENARIO
+
+
+# Both paths quantize shares to PERCENT_PLACES; compute_distribution also
+# apportions base and profit shares, and the leftover units of each role split,
+# over the whole table, which a delta cannot see, so those may differ by a few quanta
+TOLERANCE = Decimal('3e-10')
+QUANTUM = Decimal('1e-10')
+
+
+def make_investors():
+    return [
+        Investor(name='Dev', role='Developer', payment=Decimal('5000')),
+        Investor(name='Con', role='Constructor', payment=Decimal('0')),
+        Investor(name='Inv1', role='Investor', payment=Decimal('60000')),
+        Investor(name='Inv2', role='Investor', payment=Decimal('40000')),
+    ]
+
+
+def assert_matches_full(investors, rows, role_bonuses, project, *args):
+    """compute_delta on running totals must agree with a full compute_distribution."""
+    full, full_meta, full_errors, _ = compute_distribution(investors, role_bonuses, project, *args)
+    delta, meta, errors, _ = compute_delta(running_totals(investors), rows, role_bonuses, project, *args)
+    assert errors == full_errors
+    by_name = {r.name: r for r in full}
+    for result in delta:
+        expected = by_name[result.name]
+        assert expected.bonus - result.bonus in (0, QUANTUM)
+        for field in ('share', 'profit_bonus', 'total_share', 'profit_share'):
+            assert abs(getattr(result, field) - getattr(expected, field)) < TOLERANCE
+    for key in ('base_pool', 'cash_total', 'total_pct_sum_equity', 'total_pct_sum_profit'):
+        assert abs(meta[key] - full_meta[key]) < TOLERANCE
+    # Factors rescale rows that were not returned
+    factors = meta['factors']
+    for result in full:
+        if result.role == 'Property Owner':
+            continue
+        assert abs(result.payment * factors['base_per_payment'] - result.share) < TOLERANCE
+        assert result.bonus - factors['role_bonus_per_head'][result.role] in (0, QUANTUM)
+        assert abs(result.total_share * factors['profit_per_equity'] - result.profit_share) < TOLERANCE
+    for role, extra in factors['role_bonus_extra_units'].items():
+        per_head = factors['role_bonus_per_head'][role]
+        assert sum(1 for r in full if r.role == role and r.bonus > per_head) == extra
+
+
+class TestComputeDelta:
+    """Test compute_delta against full recomputation."""
+    
+    def test_model_a_matches_full(self):
+        investors = make_investors()
+        role_bonuses = RoleBonuses(
+            developer=Decimal('20'), constructor=Decimal('5'), investor=Decimal('10'),
+            property_base_share=Decimal('10'), property_profit_share=Decimal('5')
+        )
+        project = Project(
+            project_cost=Decimal('100000'), sale_price=Decimal('150000'),
+            property_value=Decimal('30000'), property_owner='Owner'
+        )
+        assert_matches_full(investors, investors[:1], role_bonuses, project, 'A')
+    
+    @pytest.mark.parametrize('bounds', [(None, None), (Decimal('40'), None), (None, Decimal('5'))])
+    def test_model_b_matches_full(self, bounds):
+        investors = make_investors()
+        role_bonuses = RoleBonuses(developer=Decimal('20'), constructor=Decimal('5'), investor=Decimal('10'))
+        project = Project(
+            project_cost=Decimal('100000'), sale_price=Decimal('150000'),
+            property_value=Decimal('30000'), property_owner='Owner'
+        )
+        assert_matches_full(investors, investors[2:], role_bonuses, project, 'B', Decimal('1.5'), *bounds)
+    
+    def test_role_bonus_split_matches_full(self):
+        # 10% over three investors does not divide at PERCENT_PLACES
+        investors = [Investor(name=f'Inv{i}', role='Investor', payment=Decimal('1000')) for i in range(3)]
+        role_bonuses = RoleBonuses(developer=Decimal('20'), constructor=Decimal('5'), investor=Decimal('10'))
+        project = Project(project_cost=Decimal('3000'), sale_price=Decimal('4000'))
+        assert_matches_full(investors, investors[1:], role_bonuses, project)
+        _, meta, _, _ = compute_delta(running_totals(investors), [], role_bonuses, project)
+        assert meta['factors']['role_bonus_per_head']['Investor'] == Decimal('3.3333333333')
+        assert meta['factors']['role_bonus_extra_units']['Investor'] == 1
+    
+    def test_edits_match_recomputed_totals(self):
+        investors = make_investors()
+        totals = running_totals(investors)
+        added = Investor(name='Inv3', role='Investor', payment=Decimal('25000'))
+        changed = Investor(name='Dev', role='Constructor', payment=Decimal('7000'))
+        totals = apply_edit(totals, added=added)
+        totals = apply_edit(totals, removed=investors[0], added=changed)
+        totals = apply_edit(totals, removed=investors[3])
+        assert totals == running_totals([changed, investors[1], investors[2], added])
+    
+    def test_removing_unknown_participant_fails(self):
+        totals = running_totals(make_investors()[:1])
+        with pytest.raises(ValueError):
+            apply_edit(totals, removed=Investor(name='Ghost', role='Investor', payment=Decimal('1')))
+    
+    def test_errors_match_full(self):
+        investors = make_investors()
+        role_bonuses = RoleBonuses(developer=Decimal('90'), investor=Decimal('20'))
+        project = Project(project_cost=Decimal('100'), sale_price=Decimal('200'))
+        _, _, full_errors, _ = compute_distribution(investors, role_bonuses, project)
+        _, _, errors, _ = compute_delta(running_totals(investors), [], role_bonuses, project)
+        assert errors == full_errors != []
+
+
+class TestApiDelta:
+    """Test the /api/calculate/delta endpoint."""
+    
+    def test_edits_match_full_request(self, client):
+        state = client.post('/api/calculate', json=SCENARIO).get_json()['state']
+        edits = [
+            {'op': 'change', 'name': 'Inv1', 'role': 'Investor', 'payment': '70000',
+             'previous': {'role': 'Investor', 'payment': '60000'}},
+            {'op': 'add', 'name': 'Inv3', 'role': 'Investor', 'payment': '10000'},
+            {'op': 'remove', 'name': 'Inv2', 'role': 'Investor', 'payment': '40000'},
+            {'op': 'set', 'field': 'developer_bonus', 'value': '15'},
+        ]
+        resp = client.post('/api/calculate/delta', json={'state': state, 'edits': edits})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['banners']['errors'] == []
+        assert [r['name'] for r in data['results']] == ['Inv1', 'Inv3']
+        
+        full = client.post('/api/calculate', json={
+            **SCENARIO,
+            'developer_bonus': '15',
+            'participants': [
+                {'name': 'Dev', 'role': 'Developer', 'payment': '0'},
+                {'name': 'Inv1', 'role': 'Investor', 'payment': '70000'},
+                {'name': 'Inv3', 'role': 'Investor', 'payment': '10000'},
+            ]
+        }).get_json()
+        expected = {r['name']: r for r in full['results']}
+        for row in data['results']:
+            for key in ('share_base_pct', 'total_equity_pct', 'total_profit_pct'):
+                assert abs(Decimal(row[key]) - Decimal(expected[row['name']][key])) < TOLERANCE
+        assert data['totals']['cash_total'] == full['totals']['cash_total']
+        
+        # The returned state chains into the next delta
+        resp = client.post('/api/calculate/delta', json={'state': data['state'], 'edits': []})
+        assert resp.status_code == 200
+    
+    def test_rows_equal_full_request(self, client):
+        # Pools that divide exactly: the delta rows must be the full calculation's, string for string
+        scenario = {**SCENARIO, 'property_value': '30000', 'property_owner': 'Owner', 'property_base_share': '15'}
+        state = client.post('/api/calculate', json=scenario).get_json()['state']
+        edits = [
+            {'op': 'change', 'name': 'Inv1', 'role': 'Investor', 'payment': '50000',
+             'previous': {'role': 'Investor', 'payment': '60000'}},
+            {'op': 'change', 'name': 'Inv2', 'role': 'Investor', 'payment': '50000',
+             'previous': {'role': 'Investor', 'payment': '40000'}},
+            {'op': 'set', 'field': 'constructor_bonus', 'value': '0'},
+        ]
+        data = client.post('/api/calculate/delta', json={'state': state, 'edits': edits}).get_json()
+        assert data['banners']['errors'] == []
+        
+        full = client.post('/api/calculate', json={
+            **scenario,
+            'constructor_bonus': '0',
+            'participants': [
+                {'name': 'Dev', 'role': 'Developer', 'payment': '0'},
+                {'name': 'Inv1', 'role': 'Investor', 'payment': '50000'},
+                {'name': 'Inv2', 'role': 'Investor', 'payment': '50000'},
+            ]
+        }).get_json()
+        expected = {r['name']: r for r in full['results']}
+        assert [r['name'] for r in data['results']] == ['Inv1', 'Inv2', 'Owner']
+        for row in data['results']:
+            assert row == expected[row['name']]
+        assert data['totals'] == full['totals']
+        assert data['pools'] == full['pools']
+    
+    def test_rejects_tampered_state(self, client):
+        state = client.post('/api/calculate', json=SCENARIO).get_json()['state']
+        resp = client.post('/api/calculate/delta', json={'state': state[:-2] + 'xx', 'edits': []})
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'invalid_state'
+    
+    def test_requires_secret_key(self, app, client):
+        app.config['SECRET_KEY'] = ''
+        resp = client.post('/api/calculate', json=SCENARIO)
+        assert resp.status_code == 400
+        assert 'SECRET_KEY' in resp.get_json()['detail']
+    
+    def test_rejects_unknown_op(self, client):
+        state = client.post('/api/calculate', json=SCENARIO).get_json()['state']
+        resp = client.post('/api/calculate/delta', json={'state': state, 'edits': [{'op': 'sort'}]})
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'invalid_delta'
@@ -0,0 +1,271 @@
+"""Parity tests between compute_distribution engines."""
+import random
+from decimal import Decimal
+
+import pytest
+
+from app.services.calculator import compute_distribution
+from app.services.models import Investor, RoleBonuses, Project
+
+
+def cap_table(size, seed=7):
+    rng = random.Random(seed)
+    investors = [Investor(name='Dev', role='Developer', payment=Decimal('0'))]
+    for i in range(size):
+        role = rng.choice(['Investor', 'Investor', 'Constructor'])
+        payment = Decimal(rng.randint(100, 500000)) / Decimal('100')
+        investors.append(Investor(name=f'P{i}', role=role, payment=payment))
+    return investors
+
+
+BONUSES = RoleBonuses(
+    developer=Decimal('20'),
+    constructor=Decimal('5'),
+    investor=Decimal('15'),
+    property_base_share=Decimal('10'),
+    property_profit_share=Decimal('5')
+)
+
+SCENARIOS = [
+    # (property_model, sale_price, property_value, weight, min, max)
+    ('A', '2000000', '0', None, None, None),
+    ('A', '2000000', '300000', None, None, None),
+    ('A', '500000', '300000', None, None, None),
+    ('B', '2000000', '300000', '1.5', None, None),
+    ('B', '2000000', '300000', '1.0', '30', None),
+    ('B', '2000000', '300000', '1.0', None, '2'),
+    ('B', '500000', '300000', '0.5', '30', '40'),
+]
+
+
+def run(engine, investors, model, sale_price, property_value, weight, low, high, precision=None):
+    project = Project(
+        project_cost=Decimal('1000000'),
+        sale_price=Decimal(sale_price),
+        property_value=Decimal(property_value),
+        property_owner='Owner'
+    )
+    bonuses = BONUSES if model == 'A' else BONUSES.model_copy(
+        update={'property_base_share': Decimal('0'), 'property_profit_share': Decimal('0')}
+    )
+    return compute_distribution(
+        investors, bonuses, project, model,
+        Decimal(weight) if weight else None,
+        Decimal(low) if low else None,
+        Decimal(high) if high else None,
+        engine=engine,
+        precision=precision
+    )
+
+
+def assert_parity(expected, actual, tolerance=Decimal('1e-9')):
+    results, meta, errors, warnings = expected
+    array_results, array_meta, array_errors, array_warnings = actual
+    assert array_errors == errors
+    assert array_warnings == warnings
+    assert len(array_results) == len(results)
+    for r, a in zip(results, array_results):
+        assert (a.name, a.role, a.payment) == (r.name, r.role, r.payment)
+        for field in ('share', 'bonus', 'profit_bonus', 'total_share', 'profit_share'):
+            assert abs(getattr(a, field) - getattr(r, field)) <= tolerance
+    for key, value in meta.items():
+        if isinstance(value, Decimal):
+            assert abs(array_meta[key] - value) <= tolerance * max(1, len(results)), key
+        else:
+            assert array_meta[key] == value, key
+
+
+class TestArrayEngineParity:
+    """The array engine must match the Decimal engine."""
+    
+    @pytest.mark.parametrize('scenario', SCENARIOS)
+    def test_parity(self, scenario):
+        investors = cap_table(200)
+        assert_parity(
+            run('decimal', investors, *scenario),
+            run('array', investors, *scenario)
+        )
+    
+    def test_parity_large_table(self):
+        investors = cap_table(5000)
+        scenario = ('B', '2000000', '300000', '1.0', '5', None)
+        assert_parity(
+            run('decimal', investors, *scenario),
+            run('array', investors, *scenario),
+            tolerance=Decimal('1e-8')
+        )
+    
+    def test_errors_match(self):
+        developer = [Investor(name='Dev', role='Developer', payment=Decimal('0'))]
+        cases = [
+            # Owner minimum would push the developer negative
+            (developer, ('B', '2000000', '300000', '1.0', '100', None)),
+            # Owner alone cannot be moved off its equity share
+            ([], ('B', '2000000', '300000', '1.0', None, '50')),
+            # Nobody to distribute to
+            ([], ('A', '2000000', '0', None, None, None)),
+        ]
+        for investors, scenario in cases:
+            expected = run('decimal', investors, *scenario)
+            assert expected[2]
+            assert_parity(expected, run('array', investors, *scenario))
+    
+    def test_no_cash(self):
+        investors = [Investor(name='Dev', role='Developer', payment=Decimal('0'))]
+        assert_parity(
+            run('decimal', investors, 'A', '2000000', '0', None, None, None),
+            run('array', investors, 'A', '2000000', '0', None, None, None)
+        )
+    
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError, match='Unknown engine'):
+            run('gpu', cap_table(1), 'A', '2000000', '0', None, None, None)
+
+
+class TestFixedEngine:
+    """The fixed-point engine must stay within rounding distance of the Decimal engine."""
+    
+    @pytest.mark.parametrize('scenario', SCENARIOS)
+    def test_deviation_bound(self, scenario):
+        investors = cap_table(200)
+        assert_parity(
+            run('decimal', investors, *scenario),
+            run('fixed', investors, *scenario),
+            tolerance=Decimal('1e-7')
+        )
+    
+    @pytest.mark.parametrize('scenario', SCENARIOS)
+    def test_profit_shares_sum_to_exactly_100(self, scenario):
+        results, meta, errors, _ = run('fixed', cap_table(97), *scenario)
+        assert errors == []
+        assert sum(r.profit_share for r in results) == Decimal('100')
+        assert meta['total_pct_sum_profit'] == Decimal('100')
+    
+    def test_errors_match(self):
+        developer = [Investor(name='Dev', role='Developer', payment=Decimal('0'))]
+        for investors, scenario in [
+            (developer, ('B', '2000000', '300000', '1.0', '100', None)),
+            ([], ('B', '2000000', '300000', '1.0', None, '50')),
+        ]:
+            expected = run('decimal', investors, *scenario)
+            assert expected[2]
+            assert_parity(expected, run('fixed', investors, *scenario))
+
+
+class TestFixedPointHelpers:
+    """Test the rounding primitives."""
+    
+    def test_div_round_half_even(self):
+        from app.services.fixed_point import div_round
+        assert div_round(5, 2) == 2
+        assert div_round(7, 2) == 4
+        assert div_round(-5, 2) == -2
+        assert div_round(10, 3) == 3
+        assert div_round(11, 3) == 4
+    
+    def test_to_units_half_even(self):
+        from app.services.fixed_point import to_cents, to_pct_units
+        assert to_cents(Decimal('0.125')) == 12
+        assert to_cents(Decimal('0.135')) == 14
+        assert to_pct_units(Decimal('33.333333335')) == 3333333334
+    
+    def test_largest_remainder(self):
+        from app.services.fixed_point import largest_remainder
+        assert largest_remainder([1, 1, 1], 100) == [34, 33, 33]
+        assert largest_remainder([2, 1, 1], 10) == [5, 3, 2]
+        assert sum(largest_remainder([7, 13, 29, 1], 10 ** 10)) == 10 ** 10
+
+
+class TestDecimalRounding:
+    """Pin the rounding policy of the decimal engine."""
+    
+    def test_shares_are_quantized_and_sum_to_exactly_100(self):
+        for scenario in SCENARIOS:
+            results, meta, errors, _ = run('decimal', cap_table(97), *scenario)
+            assert errors == []
+            for r in results:
+                for value in (r.share, r.bonus, r.profit_bonus, r.total_share, r.profit_share):
+                    assert value == value.quantize(Decimal('1e-10'))
+            assert sum(r.profit_share for r in results) == Decimal('100')
+            assert meta['total_pct_sum_profit'] == Decimal('100')
+    
+    def test_pools_are_apportioned_exactly(self):
+        investors = [Investor(name=f'Dev{i}', role='Developer', payment=Decimal('100')) for i in range(3)]
+        bonuses = RoleBonuses(developer=Decimal('20'))
+        results, meta, errors, _ = compute_distribution(investors, bonuses, Project(project_cost=1, sale_price=2))
+        assert errors == []
+        # 80% base and 20% bonus over three equal members; the leftover base units go to the
+        # first members and the leftover bonus unit to the member whose base share was rounded down
+        assert [r.share for r in results] == [
+            Decimal('26.6666666667'), Decimal('26.6666666667'), Decimal('26.6666666666')
+        ]
+        assert [r.bonus for r in results] == [
+            Decimal('6.6666666667'), Decimal('6.6666666666'), Decimal('6.6666666667')
+        ]
+        assert [r.total_share for r in results] == [
+            Decimal('33.3333333334'), Decimal('33.3333333333'), Decimal('33.3333333333')
+        ]
+        assert meta['total_pct_sum_equity'] == Decimal('100')
+    
+    def test_profit_renormalized_by_largest_remainder(self):
+        # No constructor takes the 5% constructor pool, so profit shares are scaled up from 95%
+        investors = [Investor(name=f'Inv{i}', role='Investor', payment=Decimal('100')) for i in range(3)]
+        bonuses = RoleBonuses(investor=Decimal('10'), constructor=Decimal('5'))
+        results, meta, _, _ = compute_distribution(investors, bonuses, Project(project_cost=1, sale_price=2))
+        assert meta['total_pct_sum_equity'] == Decimal('95')
+        # Equity is 31.6666666667 for the first two investors and 31.6666666666 for the third
+        assert [r.total_share for r in results] == [
+            Decimal('31.6666666667'), Decimal('31.6666666667'), Decimal('31.6666666666')
+        ]
+        assert [r.profit_share for r in results] == [
+            Decimal('33.3333333334'), Decimal('33.3333333334'), Decimal('33.3333333332')
+        ]
+    
+    def test_tied_inputs_sum_to_exactly_100(self):
+        investors = [Investor(name=f'Inv{i}', role='Investor', payment=Decimal('100')) for i in range(3)]
+        investors.append(Investor(name='Dev', role='Developer', payment=Decimal('0')))
+        bonuses = RoleBonuses(developer=Decimal('10'), investor=Decimal('10'))
+        project = Project(project_cost=1, sale_price=3)
+        for engine in ('decimal', 'array', 'fixed'):
+            results, meta, errors, _ = compute_distribution(investors, bonuses, project, engine=engine)
+            assert errors == []
+            assert [r.profit_share for r in results] == [Decimal('30'), Decimal('30'), Decimal('30'), Decimal('10')]
+            assert meta['total_pct_sum'] == Decimal('100')
+            assert meta['total_pct_sum_profit'] == Decimal('100')
+            assert sum(r.total_share for r in results) == Decimal('100')
+    
+    def test_independent_of_ambient_context(self):
+        from decimal import localcontext
+        expected = run('decimal', cap_table(50), *SCENARIOS[4])
+        with localcontext() as ctx:
+            ctx.prec = 6
+            assert run('decimal', cap_table(50), *SCENARIOS[4]) == expected
+    
+    @pytest.mark.parametrize('scenario', SCENARIOS)
+    def test_precision_does_not_change_shares(self, scenario):
+        investors = cap_table(200)
+        results = [run('decimal', investors, *scenario, precision=precision)[0] for precision in (16, 20, 34)]
+        assert results[0] == results[1] == results[2]
+    
+    def test_precision_below_minimum(self):
+        with pytest.raises(ValueError, match='at least 16'):
+            run('decimal', cap_table(3), *SCENARIOS[0], precision=8)
+    
+    def test_apportion(self):
+        from app.services.calculator import apportion
+        thirds = [Decimal(100) / 3] * 3
+        assert apportion(thirds, Decimal('100')) == [
+            Decimal('33.3333333334'), Decimal('33.3333333333'), Decimal('33.3333333333')
+        ]
+        # Rounding half-even gains a unit here; the later of the two smallest remainders gives it back
+        values = [Decimal('1.5e-10'), Decimal('1.5e-10'), Decimal('2e-10')]
+        assert apportion(values, Decimal('5e-10')) == [Decimal('2e-10'), Decimal('1e-10'), Decimal('2e-10')]
+    
+    def test_precision_from_config(self, monkeypatch):
+        from app import create_app
+        from app.config import TestingConfig
+        from app.services import calculator
+        monkeypatch.setattr(calculator, 'DECIMAL_PRECISION', calculator.DECIMAL_PRECISION)
+        monkeypatch.setattr(TestingConfig, 'DECIMAL_PRECISION', 24)
+        create_app('testing')
+        assert calculator.DECIMAL_PRECISION == 24
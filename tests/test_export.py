@@ -0,0 +1,111 @@
+"""Tests for streamed result exports."""
+import csv
+import io
+import json
+import re
+import zipfile
+from xml.etree import ElementTree
+
+from app.services import export
+from app.services.export import stream_export_csv
+from app.services.serialize import ROW_KEYS
+
+from tests.test_api import SCENARIO
+
+
+SHEET = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def large_scenario(count):
+    participants = [{'name': f'Inv{i}', 'role': 'Investor', 'payment': '1000'} for i in range(count)]
+    return {**SCENARIO, 'participants': [SCENARIO['participants'][0], *participants]}
+
+
+def csv_rows(text):
+    return list(csv.reader(line for line in text.lstrip('\ufeff').splitlines() if not line.startswith('#')))
+
+
+class TestExport:
+    """Test the /api/export endpoint."""
+    
+    def test_csv_matches_json_api(self, client):
+        resp = client.post('/api/export', query_string={'format': 'csv'}, json=SCENARIO)
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        assert resp.headers['Content-Disposition'] == 'attachment; filename="investment-results.csv"'
+        
+        text = resp.get_data(as_text=True)
+        assert text.startswith('\ufeff# Investment Share Calculator Results')
+        assert '# Total Profit (€): 50000.00' in text
+        header, *rows = csv_rows(text)
+        assert header[:3] == ['Name', 'Role', 'Payment (€)']
+        expected = client.post('/api/calculate', json=SCENARIO).get_json()['results']
+        assert rows == [[r[key] for key, _ in export.EXPORT_COLUMNS] for r in expected]
+    
+    def test_payload_form_field(self, client):
+        resp = client.post('/api/export', data={'payload': json.dumps(SCENARIO)})
+        assert resp.status_code == 200
+        assert [row[0] for row in csv_rows(resp.get_data(as_text=True))[1:]] == ['Dev', 'Inv1', 'Inv2']
+    
+    def test_xlsx_workbook(self, client):
+        resp = client.post('/api/export', query_string={'format': 'xlsx'}, json=SCENARIO)
+        assert resp.status_code == 200
+        assert resp.mimetype == export.EXPORT_FORMATS['xlsx'][0]
+        
+        archive = zipfile.ZipFile(io.BytesIO(resp.data))
+        assert archive.testzip() is None
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        rows = sheet.find(f'{SHEET}sheetData')
+        assert len(rows) == 4
+        names = [row[0].find(f'{SHEET}is/{SHEET}t').text for row in rows]
+        assert names == ['Name', 'Dev', 'Inv1', 'Inv2']
+        # Numbers are numeric cells, not text
+        assert rows[2][2].get('t') is None
+        assert rows[2][2].find(f'{SHEET}v').text == '60000.00'
+        assert 'Summary' in archive.read('xl/workbook.xml').decode()
+    
+    def test_pdf_with_signature_fields(self, client):
+        resp = client.post('/api/export', query_string={'format': 'pdf'}, json=large_scenario(100))
+        assert resp.status_code == 200
+        assert resp.mimetype == 'application/pdf'
+        
+        data = resp.data
+        assert data.startswith(b'%PDF-1.4') and data.endswith(b'%%EOF\n')
+        # Every cross-reference entry points at its object
+        startxref = int(data.rsplit(b'startxref\n', 1)[1].split(b'\n')[0])
+        table = data[startxref:].split(b'trailer')[0].splitlines()
+        count = int(table[1].split()[1])
+        for obj_id, entry in enumerate(table[3:3 + count - 1], 1):
+            offset = int(entry.split()[0])
+            assert data[offset:].startswith(b'%d 0 obj' % obj_id)
+        # One signature field per participant
+        assert len(re.findall(rb'/FT /Sig', data)) == 101
+        assert data.count(b'/Type /Page ') > 2
+    
+    def test_unknown_format(self, client):
+        resp = client.post('/api/export', query_string={'format': 'docx'}, json=SCENARIO)
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'invalid_export'
+    
+    def test_calculation_errors(self, client):
+        resp = client.post('/api/export', json={**SCENARIO, 'developer_bonus': '95'})
+        assert resp.status_code == 400
+        assert resp.get_json()['banners']['errors']
+
+
+class TestWriters:
+    """Test the streaming writers."""
+    
+    def test_csv_is_written_as_rows_arrive(self, monkeypatch):
+        monkeypatch.setattr(export, 'CHUNK_ROWS', 2)
+        consumed = []
+        
+        def rows():
+            for i in range(5):
+                consumed.append(i)
+                yield (str(i),) * len(ROW_KEYS)
+        
+        chunks = stream_export_csv(rows(), [])
+        next(chunks)
+        assert consumed == [0, 1]
+        assert len(list(chunks)) == 2
@@ -0,0 +1,229 @@
+"""Tests for the background job queue and pool."""
+import json
+import time
+
+import pytest
+
+from app import create_app, jobs
+from app.config import TestingConfig
+from app.jobs import JobPool, JobStore
+
+
+PAYLOAD = {
+    'project_cost': '100000',
+    'sale_price': '150000',
+    'developer_bonus': '20',
+    'investor_bonus': '10',
+    'participants': [
+        {'name': 'Dev', 'role': 'Developer', 'payment': '0'},
+        {'name': 'Inv', 'role': 'Investor', 'payment': '100000'}
+    ]
+}
+
+
+@pytest.fixture
+def jobs_app(monkeypatch, tmp_path):
+    """Application with jobs enabled on a fresh database."""
+    monkeypatch.setattr(TestingConfig, 'JOBS_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'JOBS_DATABASE', str(tmp_path / 'jobs.sqlite'))
+    monkeypatch.setattr(TestingConfig, 'JOBS_WORKERS', 1)
+    return create_app('testing')
+
+
+@pytest.fixture
+def store(jobs_app):
+    return jobs_app.extensions['jobs']
+
+
+def drain(pool, timeout=30):
+    """Step the pool until no job is queued or running."""
+    deadline = time.monotonic() + timeout
+    while pool.step() or pool.running:
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def slow_view():
+    time.sleep(30)
+
+
+class TestJobStore:
+    """Test the SQLite job queue."""
+    
+    def test_claim_by_priority_then_age(self, tmp_path):
+        store = JobStore(str(tmp_path / 'jobs.sqlite'))
+        first = store.submit('calculate', {'n': 1})
+        urgent = store.submit('calculate', {'n': 2}, priority=5)
+        second = store.submit('calculate', {'n': 3})
+        assert store.get(second)['queue_position'] == 2
+        assert [store.claim().id for _ in range(3)] == [urgent, first, second]
+        assert store.claim() is None
+    
+    def test_claimed_job(self, tmp_path):
+        store = JobStore(str(tmp_path / 'jobs.sqlite'))
+        job_id = store.submit('sweep', {'a': [1, 2]}, seconds=5, memory_mb=64)
+        job = store.claim()
+        assert (job.id, job.kind, job.payload, job.seconds, job.memory_mb) == (job_id, 'sweep', {'a': [1, 2]}, 5, 64)
+        assert store.get(job_id)['status'] == jobs.RUNNING
+    
+    def test_queue_full(self, tmp_path):
+        store = JobStore(str(tmp_path / 'jobs.sqlite'))
+        assert store.submit('calculate', {}, max_queued=1) is not None
+        assert store.submit('calculate', {}, max_queued=1) is None
+    
+    def test_end_deletes_payload_and_expires(self, tmp_path):
+        store = JobStore(str(tmp_path / 'jobs.sqlite'))
+        job_id = store.submit('calculate', {'secret': 1})
+        store.claim()
+        assert store.end(job_id, jobs.DONE, ttl=0.05, result_status=200, result='{}')
+        row = store.connection.execute('SELECT payload FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        assert row[0] is None
+        assert store.result(job_id) == (200, '{}')
+        time.sleep(0.1)
+        assert store.get(job_id) is None and store.result(job_id) is None
+        assert store.purge() == 1
+    
+    def test_cancel(self, tmp_path):
+        store = JobStore(str(tmp_path / 'jobs.sqlite'))
+        job_id = store.submit('calculate', {})
+        assert store.cancel(job_id, ttl=60)
+        assert store.claim() is None
+        assert not store.cancel(job_id, ttl=60)
+        assert store.cancelled([job_id, 'other']) == {job_id}
+    
+    def test_end_after_cancel_is_ignored(self, tmp_path):
+        store = JobStore(str(tmp_path / 'jobs.sqlite'))
+        job_id = store.submit('calculate', {})
+        store.claim()
+        store.cancel(job_id, ttl=60)
+        assert not store.end(job_id, jobs.DONE, ttl=60, result_status=200, result='{}')
+        assert store.get(job_id)['status'] == jobs.CANCELLED
+    
+    def test_requeue_running(self, tmp_path):
+        store = JobStore(str(tmp_path / 'jobs.sqlite'))
+        job_id = store.submit('calculate', {})
+        store.claim()
+        assert store.requeue_running() == 1
+        assert store.claim().id == job_id
+
+
+class TestJobPool:
+    """Test running jobs in forked processes."""
+    
+    def test_result_matches_endpoint(self, jobs_app, store):
+        job_id = store.submit('calculate', PAYLOAD)
+        drain(JobPool(jobs_app, store))
+        status, body = store.result(job_id)
+        expected = jobs_app.test_client().post('/api/calculate', json=PAYLOAD)
+        assert status == expected.status_code == 200
+        assert json.loads(body) == expected.get_json()
+    
+    def test_time_budget(self, jobs_app, store, monkeypatch):
+        monkeypatch.setitem(jobs.JOB_VIEWS, 'sleep', slow_view)
+        job_id = store.submit('sleep', {}, seconds=0.2)
+        drain(JobPool(jobs_app, store))
+        info = store.get(job_id)
+        assert info['status'] == jobs.FAILED
+        assert 'Time budget of 0.2 s exceeded' in info['error']
+    
+    def test_memory_budget(self, jobs_app, store, monkeypatch):
+        if not jobs.HAVE_RESOURCE:
+            pytest.skip('resource limits are not available')
+        monkeypatch.setitem(jobs.JOB_VIEWS, 'allocate', lambda: bytearray(512 * 1024 * 1024))
+        job_id = store.submit('allocate', {}, memory_mb=64)
+        drain(JobPool(jobs_app, store))
+        info = store.get(job_id)
+        assert info['status'] == jobs.FAILED
+        assert 'Memory budget of 64 MB exceeded' in info['error']
+    
+    def test_cancel_running_job(self, jobs_app, store, monkeypatch):
+        monkeypatch.setitem(jobs.JOB_VIEWS, 'sleep', slow_view)
+        job_id = store.submit('sleep', {})
+        pool = JobPool(jobs_app, store)
+        assert pool.step() == 1
+        process = pool.running[job_id][0]
+        store.cancel(job_id, ttl=60)
+        pool.step()
+        assert pool.running == {} and not process.is_alive()
+        assert store.get(job_id)['status'] == jobs.CANCELLED
+    
+    def test_workers_bound_concurrency(self, jobs_app, store, monkeypatch):
+        monkeypatch.setitem(jobs.JOB_VIEWS, 'sleep', slow_view)
+        ids = [store.submit('sleep', {}) for _ in range(2)]
+        pool = JobPool(jobs_app, store)
+        assert pool.step() == 1
+        assert store.get(ids[1])['status'] == jobs.QUEUED
+        for job_id in ids:
+            store.cancel(job_id, ttl=60)
+        pool.step()
+
+
+class TestApiJobs:
+    """Test the /api/jobs endpoints."""
+    
+    def test_submit_poll_and_result(self, jobs_app, store):
+        client = jobs_app.test_client()
+        resp = client.post('/api/jobs', json={'kind': 'calculate', 'payload': PAYLOAD, 'priority': 3})
+        assert resp.status_code == 202
+        data = resp.get_json()
+        assert resp.headers['Location'].endswith(f"/api/jobs/{data['id']}")
+        assert data['status'] == 'queued' and data['queue_position'] == 0
+        assert data['budget'] == {'seconds': 600.0, 'memory_mb': 2048}
+        
+        resp = client.get(f"/api/jobs/{data['id']}/result")
+        assert resp.status_code == 409
+        assert resp.get_json()['error'] == 'job_not_done'
+        
+        drain(JobPool(jobs_app, store))
+        status = client.get(f"/api/jobs/{data['id']}").get_json()
+        assert status['status'] == 'done' and status['result_status'] == 200
+        resp = client.get(status['result'])
+        assert resp.status_code == 200
+        assert resp.get_json()['results'] == client.post('/api/calculate', json=PAYLOAD).get_json()['results']
+    
+    def test_failed_calculation_is_a_result(self, jobs_app, store):
+        client = jobs_app.test_client()
+        job_id = client.post('/api/jobs', json={'kind': 'solve', 'payload': PAYLOAD}).get_json()['id']
+        drain(JobPool(jobs_app, store))
+        resp = client.get(f'/api/jobs/{job_id}/result')
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'invalid_solve'
+    
+    @pytest.mark.parametrize('body', [
+        {'kind': 'export', 'payload': PAYLOAD},
+        {'kind': 'calculate'},
+        {'kind': 'calculate', 'payload': PAYLOAD, 'priority': 11},
+        {'kind': 'calculate', 'payload': PAYLOAD, 'priority': 'high'},
+        {'kind': 'calculate', 'payload': PAYLOAD, 'budget': {'seconds': 601}},
+        {'kind': 'calculate', 'payload': PAYLOAD, 'budget': {'memory_mb': -1}},
+    ])
+    def test_invalid_job(self, jobs_app, body):
+        resp = jobs_app.test_client().post('/api/jobs', json=body)
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'invalid_job'
+    
+    def test_queue_full(self, jobs_app):
+        jobs_app.config['JOBS_MAX_QUEUED'] = 1
+        client = jobs_app.test_client()
+        assert client.post('/api/jobs', json={'kind': 'calculate', 'payload': PAYLOAD}).status_code == 202
+        resp = client.post('/api/jobs', json={'kind': 'calculate', 'payload': PAYLOAD})
+        assert resp.status_code == 503
+        assert resp.get_json()['error'] == 'queue_full'
+    
+    def test_cancel(self, jobs_app):
+        client = jobs_app.test_client()
+        job_id = client.post('/api/jobs', json={'kind': 'calculate', 'payload': PAYLOAD}).get_json()['id']
+        resp = client.delete(f'/api/jobs/{job_id}')
+        assert resp.status_code == 200
+        assert resp.get_json()['status'] == 'cancelled'
+        assert client.delete(f'/api/jobs/{job_id}').status_code == 409
+        assert client.get(f'/api/jobs/{job_id}/result').get_json()['status'] == 'cancelled'
+    
+    def test_unknown_job(self, jobs_app):
+        client = jobs_app.test_client()
+        assert client.get('/api/jobs/nope').status_code == 404
+        assert client.get('/api/jobs/nope/result').status_code == 404
+        assert client.delete('/api/jobs/nope').status_code == 404
+    
+    def test_disabled_by_default(self, client):
+        assert client.post('/api/jobs', json={'kind': 'calculate', 'payload': PAYLOAD}).status_code == 404
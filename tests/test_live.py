@@ -0,0 +1,84 @@
+"""Tests for the live-calculation WebSocket."""
+import asyncio
+import json
+
+import pytest
+
+from app.asgi import AsgiApp
+from app.live import LIVE_PATH, apply_message
+
+from tests.test_api import SCENARIO
+
+
+def run_socket(app, frames, headers=()):
+    """Connect, send each frame after the previous reply, disconnect; returns messages sent by the server."""
+    async def scenario():
+        incoming = asyncio.Queue()
+        outgoing = asyncio.Queue()
+        scope = {
+            'type': 'websocket', 'path': LIVE_PATH, 'query_string': b'',
+            'headers': [(k.encode(), v.encode()) for k, v in headers],
+        }
+        await incoming.put({'type': 'websocket.connect'})
+        task = asyncio.create_task(AsgiApp(app, max_workers=1)(scope, incoming.get, outgoing.put))
+        sent = [await asyncio.wait_for(outgoing.get(), 5)]
+        if sent[0]['type'] == 'websocket.accept':
+            for frame in frames:
+                await incoming.put({'type': 'websocket.receive', 'text': json.dumps(frame)})
+                sent.append(await asyncio.wait_for(outgoing.get(), 5))
+        await incoming.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(task, 5)
+        return sent
+    return asyncio.run(scenario())
+
+
+class TestApplyMessage:
+    """Test state and update messages."""
+    
+    def test_update_fields_and_rows(self):
+        state = apply_message(None, {'type': 'state', 'payload': SCENARIO})
+        row = {'name': 'Inv1', 'role': 'Investor', 'payment': '65000'}
+        new_state = apply_message(state, {
+            'type': 'update', 'fields': {'sale_price': '160000', 'property_owner': None},
+            'participants': {'1': row}
+        })
+        assert new_state['sale_price'] == '160000'
+        assert 'property_owner' not in new_state
+        assert new_state['participants'][1] == row
+        # The previous state is left untouched
+        assert state['participants'][1] == SCENARIO['participants'][1]
+    
+    def test_update_needs_state(self):
+        with pytest.raises(ValueError):
+            apply_message(None, {'type': 'update', 'fields': {}})
+    
+    def test_index_out_of_range(self):
+        state = apply_message(None, {'type': 'state', 'payload': SCENARIO})
+        with pytest.raises(ValueError):
+            apply_message(state, {'type': 'update', 'participants': {'9': {}}})
+
+
+class TestLiveSocket:
+    """Test the WebSocket endpoint through the ASGI adapter."""
+    
+    def test_state_then_update(self, app, client):
+        sent = run_socket(app, [
+            {'type': 'state', 'seq': 1, 'payload': SCENARIO},
+            {'type': 'update', 'seq': 2, 'fields': {'sale_price': '180000'}},
+        ])
+        assert sent[0]['type'] == 'websocket.accept'
+        first, second = (json.loads(m['text']) for m in sent[1:])
+        assert (first['type'], first['seq']) == ('result', 1)
+        assert (second['type'], second['seq']) == ('result', 2)
+        expected = client.post('/api/calculate', json={**SCENARIO, 'sale_price': '180000'}).get_json()
+        assert second['data']['results'] == expected['results']
+    
+    def test_invalid_message(self, app):
+        sent = run_socket(app, [{'type': 'update', 'seq': 1, 'fields': {}}])
+        reply = json.loads(sent[1]['text'])
+        assert reply['type'] == 'error'
+        assert reply['error'] == 'invalid_message'
+    
+    def test_rejects_cross_origin(self, app):
+        sent = run_socket(app, [], headers=[('host', 'calc.example'), ('origin', 'https://evil.example')])
+        assert sent[0] == {'type': 'websocket.close', 'code': 1008}
@@ -0,0 +1,68 @@
+"""Tests for the logging pipeline."""
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from app.logger import SamplingFilter, setup_logger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITER = """
+import logging, sys
+from app.logger import SharedRotatingFileHandler
+handler = SharedRotatingFileHandler(sys.argv[1], maxBytes=2000, backupCount=100)
+for i in range(300):
+    handler.emit(logging.makeLogRecord({'msg': f'{sys.argv[2]} line {i:04d}'}))
+"""
+
+
+def read_lines(directory):
+    lines = []
+    for name in os.listdir(directory):
+        if name.startswith('app.log') and not name.endswith('.lock'):
+            with open(os.path.join(directory, name)) as f:
+                lines.extend(f.read().splitlines())
+    return lines
+
+
+def test_workers_share_rotating_file(tmp_path):
+    env = {**os.environ, 'PYTHONPATH': ROOT}
+    path = str(tmp_path / 'app.log')
+    writers = [
+        subprocess.Popen([sys.executable, '-c', WRITER, path, worker], env=env, cwd=tmp_path)
+        for worker in ('a', 'b')
+    ]
+    assert [w.wait(timeout=30) for w in writers] == [0, 0]
+    lines = read_lines(tmp_path)
+    # Nothing lost or torn across rotations
+    assert len(lines) == 600
+    assert len(set(lines)) == 600
+    assert all(line.split(' line ')[0] in ('a', 'b') for line in lines)
+    assert len(os.listdir(tmp_path)) > 3
+
+
+def test_queue_mode_writes_json(tmp_path, monkeypatch):
+    monkeypatch.setenv('LOG_MODE', 'queue')
+    monkeypatch.setenv('LOG_FORMAT', 'json')
+    logger = setup_logger('queue_test', str(tmp_path))
+    logger.warning('hello %s', 'world')
+    deadline = time.monotonic() + 5
+    while not read_lines(tmp_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    entry = json.loads(read_lines(tmp_path)[0])
+    assert entry['message'] == 'hello world'
+    assert entry['level'] == 'WARNING'
+    assert entry['logger'] == 'queue_test'
+
+
+def test_sampling_keeps_level_and_above():
+    sampler = SamplingFilter(0.0, logging.WARNING)
+    info = logging.makeLogRecord({'levelno': logging.INFO})
+    warning = logging.makeLogRecord({'levelno': logging.WARNING})
+    error = logging.makeLogRecord({'levelno': logging.ERROR})
+    assert not sampler.filter(info)
+    assert sampler.filter(warning)
+    assert sampler.filter(error)
@@ -0,0 +1,75 @@
+"""Tests for request metrics and Server-Timing headers."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.metrics import banner_type
+from app.services import timing
+
+from tests.test_api import SCENARIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStageTiming:
+    """Test stage accounting."""
+    
+    def test_nested_stage_is_exclusive(self):
+        timings = timing.begin()
+        with timing.stage("compute"):
+            with timing.stage("validate"):
+                sum(range(10000))
+        timing.end()
+        assert set(timings.durations) == {"compute", "validate"}
+        assert all(seconds >= 0 for seconds in timings.durations.values())
+    
+    def test_noop_without_begin(self):
+        with timing.stage("compute"):
+            pass
+        assert timing.end() is None
+
+
+def test_banner_type():
+    assert banner_type("Share budget exceeds 100% by 5.00%. Reduce role pools.") == "share_budget"
+    assert banner_type("Something new") == "other"
+
+
+def test_server_timing_header(client):
+    response = client.post('/api/calculate', json=SCENARIO)
+    entries = dict(part.split(';dur=') for part in response.headers['Server-Timing'].split(', '))
+    assert {'parse', 'validate', 'compute', 'serialize', 'total'} <= set(entries)
+    assert float(entries['total']) >= float(entries['compute'])
+
+
+def test_metrics_endpoint(client):
+    pytest.importorskip('prometheus_client')
+    client.post('/api/calculate', json={**SCENARIO, 'developer_bonus': '99'})
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_bucket{endpoint="api.api_calculate"' in body
+    assert 'calculation_stage_duration_seconds_count{stage="validate"}' in body
+    assert 'calculation_banners_total{kind="error",type="share_budget"}' in body
+    assert 'calculation_participants_bucket' in body
+
+
+def test_metrics_aggregate_across_processes(tmp_path):
+    pytest.importorskip('prometheus_client')
+    env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(tmp_path), 'PYTHONPATH': ROOT}
+    post = (
+        "import json, sys; from app import create_app; "
+        "create_app('testing').test_client().post('/api/calculate', json=json.loads(sys.argv[1]))"
+    )
+    scrape = "from app import create_app; print(create_app('testing').test_client().get('/metrics').get_data(as_text=True))"
+    # Two "workers" each serve one request; a third answers the scrape
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', post, json.dumps(SCENARIO)], env=env, cwd=tmp_path, check=True)
+    out = subprocess.run(
+        [sys.executable, '-c', scrape], env=env, cwd=tmp_path, check=True, capture_output=True, text=True
+    ).stdout
+    line = next(
+        line for line in out.splitlines()
+        if line.startswith('http_request_duration_seconds_count{endpoint="api.api_calculate"')
+    )
+    assert float(line.split()[-1]) == 2.0
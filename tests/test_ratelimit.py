@@ -0,0 +1,65 @@
+"""Tests for the shared rate-limit storage and the live tier."""
+import json
+import time
+
+import pytest
+
+from app import create_app
+from app.config import TestingConfig
+from app.ratelimit import SQLiteStorage
+
+from tests.test_api import SCENARIO
+from tests.test_live import run_socket
+
+
+@pytest.fixture
+def limited_app(monkeypatch):
+    """App with rate limiting on and small limits."""
+    monkeypatch.setattr(TestingConfig, 'RATELIMIT_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'RATELIMIT_DEFAULT', '1 per minute')
+    monkeypatch.setattr(TestingConfig, 'RATELIMIT_LIVE', '2 per minute')
+    return create_app('testing')
+
+
+class TestSQLiteStorage:
+    """Test the SQLite counter backend."""
+    
+    def test_counts_are_shared(self, tmp_path):
+        uri = f"sqlite:///{tmp_path / 'limits.sqlite'}"
+        first, second = SQLiteStorage(uri), SQLiteStorage(uri)
+        assert first.incr('k', 60) == 1
+        assert second.incr('k', 60) == 2
+        assert first.get('k') == 2
+        second.clear('k')
+        assert first.get('k') == 0
+    
+    def test_window_expires(self, tmp_path):
+        storage = SQLiteStorage(f"sqlite:///{tmp_path / 'limits.sqlite'}")
+        storage.incr('k', 0.05, amount=3)
+        assert storage.get_expiry('k') > time.time()
+        time.sleep(0.06)
+        assert storage.get('k') == 0
+        assert storage.incr('k', 60) == 1
+
+
+class TestLiveTier:
+    """Test that live endpoints use their own shared tier."""
+    
+    def test_live_endpoints_share_the_live_tier(self, limited_app):
+        client = limited_app.test_client()
+        statuses = [client.post('/api/calculate', json=SCENARIO).status_code for _ in range(2)]
+        statuses.append(client.post('/api/calculate/delta', json={'edits': []}).status_code)
+        assert statuses == [200, 200, 429]
+    
+    def test_other_endpoints_keep_default_limits(self, limited_app):
+        client = limited_app.test_client()
+        client.post('/api/calculate', json=SCENARIO)
+        batch = {'scenarios': [SCENARIO]}
+        statuses = [client.post('/api/calculate/batch', json=batch).status_code for _ in range(2)]
+        assert statuses == [200, 429]
+    
+    def test_websocket_messages_count(self, limited_app):
+        frames = [{'type': 'state', 'seq': seq, 'payload': SCENARIO} for seq in (1, 2, 3)]
+        replies = [json.loads(m['text']) for m in run_socket(limited_app, frames)[1:]]
+        assert [r['type'] for r in replies] == ['result', 'result', 'error']
+        assert replies[2]['error'] == 'rate_limited'
@@ -0,0 +1,20 @@
+"""Tests for the HTML calculator page."""
+from tests.test_api import SCENARIO
+
+FORM = {
+    key: SCENARIO[key] for key in (
+        'project_cost', 'sale_price', 'developer_bonus', 'constructor_bonus', 'investor_bonus'
+    )
+}
+
+
+def test_rows_after_gap_are_kept(client):
+    form = {
+        **FORM,
+        'name1': 'Dev', 'role1': 'Developer', 'paid1': '0',
+        'name3': 'Inv', 'role3': 'Investor', 'paid3': '50000',
+    }
+    html = client.post('/', data=form).get_data(as_text=True)
+    # Row 3 is calculated, and the re-rendered form keeps it under its own index
+    assert '<td>Inv</td>' in html
+    assert 'name="name3" value="Inv"' in html
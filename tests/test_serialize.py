@@ -0,0 +1,94 @@
+"""Tests for the direct-to-bytes response writer."""
+import json
+from decimal import Decimal
+
+from app.routes_api import build_response_payload
+from app.services import serialize
+from app.services.calculator import compute_distribution
+from app.services.models import Investor, Project, RoleBonuses
+from app.services.serialize import ResponseWriter
+
+from tests.test_api import SCENARIO
+
+
+def calculation(name='Inv1'):
+    investors = [
+        Investor(name='Dev', role='Developer', payment=Decimal('0')),
+        Investor(name=name, role='Investor', payment=Decimal('60000')),
+        Investor(name='Inv2', role='Investor', payment=Decimal('40000')),
+    ]
+    role_bonuses = RoleBonuses(developer=Decimal('10'), constructor=Decimal('0'), investor=Decimal('5'))
+    project = Project(project_cost=Decimal('100000'), sale_price=Decimal('150000'))
+    results, meta, errors, warnings = compute_distribution(investors, role_bonuses, project)
+    return results, meta, errors, warnings, project
+
+
+class TestResponseWriter:
+    """Test ResponseWriter output."""
+    
+    def test_matches_dict_payload(self):
+        args = calculation()
+        written = json.loads(ResponseWriter().payload(*args))
+        assert written == build_response_payload(*args)
+    
+    def test_extra_keys(self):
+        written = json.loads(ResponseWriter().payload(*calculation(), extra={'state': 'token'}))
+        assert written['state'] == 'token'
+        assert [r['name'] for r in written['results']] == ['Dev', 'Inv1', 'Inv2']
+    
+    def test_names_are_escaped(self):
+        name = 'Zoë "Z" \\ <b>'
+        written = json.loads(ResponseWriter().payload(*calculation(name)))
+        assert written['results'][1]['name'] == name
+    
+    def test_default_format(self):
+        args = calculation()
+        written = json.loads(ResponseWriter().payload(*args))
+        dev = written['results'][0]
+        # Quantized zeros are written in fixed-point, not as '0E-10'
+        assert dev['share_base_pct'] == '0.0000000000'
+        assert dev['total_equity_pct'] == '10.0000000000'
+        # Money is rounded to cents
+        assert dev['payment'] == '0.00'
+        assert dev['final_value'] == '15000.00'
+        assert dev['profit_value'] == '5000.00'
+        assert build_response_payload(*args)['results'] == written['results']
+    
+    def test_quantization_per_field_type(self):
+        written = json.loads(ResponseWriter(percent_places=4, money_places=2).payload(*calculation()))
+        row = written['results'][1]
+        assert row['payment'] == '60000.00'
+        assert row['final_value'] == '80250.00'
+        # 60 % of the 85 % base pool and one of two 5 % investor bonuses
+        assert row['total_equity_pct'] == '53.5000'
+        assert written['totals']['total_pct_sum'] == '100.0000'
+        assert written['pools']['dev'] == '10.0000'
+    
+    def test_quantization_rounds_half_even(self):
+        project = Project(project_cost=Decimal('100000.125'), sale_price=Decimal('150000.135'))
+        totals = ResponseWriter(money_places=2).summary({'cash_total': Decimal('1E+2')}, project)['totals']
+        assert totals['project_cost'] == '100000.12'
+        assert totals['sale_price'] == '150000.14'
+        assert totals['cash_total'] == '100.00'
+    
+    def test_stdlib_fallback(self, monkeypatch):
+        args = calculation('Zoë')
+        expected = json.loads(ResponseWriter().payload(*args))
+        monkeypatch.setattr(serialize, 'HAVE_ORJSON', False)
+        assert json.loads(ResponseWriter().payload(*args)) == expected
+
+
+class TestApiResponse:
+    """Test /api/calculate responses written by the app's writer."""
+    
+    def test_json_response(self, client):
+        resp = client.post('/api/calculate', json=SCENARIO)
+        assert resp.status_code == 200
+        assert resp.mimetype == 'application/json'
+        assert 'state' in resp.get_json()
+    
+    def test_configured_places(self, app, client):
+        app.extensions['response_writer'] = ResponseWriter(percent_places=2, money_places=2)
+        data = client.post('/api/calculate', json=SCENARIO).get_json()
+        assert all(len(r['total_equity_pct'].split('.')[1]) == 2 for r in data['results'])
+        assert data['totals']['sale_price'] == '150000.00'
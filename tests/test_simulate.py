@@ -0,0 +1,175 @@
+"""Tests for the Monte Carlo payout simulation."""
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.services.calculator import compute_distribution, compute_simulation
+from app.services.simulation import CHUNK_DRAWS, histograms, parse_distribution
+
+from tests.test_sweep import make_inputs
+
+
+SPECS = {
+    'sale_price': parse_distribution({'dist': 'normal', 'mean': 150000, 'std': 30000}),
+    'project_cost': parse_distribution({'dist': 'triangular', 'low': 90000, 'mode': 100000, 'high': 130000}),
+}
+
+
+class TestDistributions:
+    """Test distribution parsing and drawing."""
+    
+    def test_number_is_fixed(self):
+        spec = parse_distribution('120000')
+        assert spec.kind == 'fixed'
+        assert spec.draw(np.random.default_rng(1), 3).tolist() == [120000.0] * 3
+    
+    @pytest.mark.parametrize('spec', [
+        {'dist': 'beta', 'a': 1},
+        {'dist': 'uniform', 'low': 10},
+        {'dist': 'uniform', 'low': 10, 'high': 5},
+        {'dist': 'triangular', 'low': 1, 'mode': 5, 'high': 3},
+        {'dist': 'normal', 'mean': 1, 'std': -1},
+        {'dist': 'lognormal', 'median': 0, 'sigma': 0.1},
+        {'dist': 'normal', 'mean': 'nan', 'std': 1},
+    ])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_distribution(spec)
+    
+    def test_draws_are_clipped_at_zero(self):
+        spec = parse_distribution({'dist': 'normal', 'mean': 0, 'std': 1})
+        assert spec.draw(np.random.default_rng(1), 1000).min() == 0.0
+    
+    def test_lognormal_median(self):
+        spec = parse_distribution({'dist': 'lognormal', 'median': 100, 'sigma': 0.2})
+        assert np.median(spec.draw(np.random.default_rng(1), 20000)) == pytest.approx(100, rel=0.01)
+
+
+def test_histograms():
+    rows = np.asarray([[0.0, 1.0, 2.0, 3.0, 4.0], [5.0, 5.0, 5.0, 5.0, 5.0]])
+    counts, edges = histograms(rows, 2)
+    assert counts.tolist() == [[2, 3], [5, 0]]
+    assert edges[0].tolist() == [0.0, 2.0, 4.0]
+
+
+class TestComputeSimulation:
+    """Test compute_simulation."""
+    
+    def test_fixed_inputs_match_scalar(self):
+        investors, role_bonuses, project = make_inputs()
+        specs = {'sale_price': parse_distribution('180000')}
+        sim, errors, _ = compute_simulation(investors, role_bonuses, project, specs, 100, seed=1)
+        assert errors == []
+        results, _, _, _ = compute_distribution(
+            investors, role_bonuses, project.model_copy(update={'sale_price': Decimal('180000')})
+        )
+        expected = [float(r.total_share) * 1800 for r in results]
+        np.testing.assert_allclose(sim['final_value']['mean'], expected)
+        np.testing.assert_allclose(sim['final_value']['percentiles'][0], expected)
+        assert sim['final_value']['counts'][:, 0].tolist() == [100] * len(results)
+    
+    def test_summaries(self):
+        investors, role_bonuses, project = make_inputs()
+        sim, errors, warnings = compute_simulation(
+            investors, role_bonuses, project, SPECS, 5000, seed=7, bins=10
+        )
+        assert errors == [] and warnings == []
+        assert sim['names'][-1] == 'Owner'
+        assert sim['status_counts'] == {'ok': 5000, 'budget_exceeded': 0, 'bounds_infeasible': 0}
+        assert sim['sale_price']['mean'] == pytest.approx(150000, rel=0.02)
+        assert sim['final_value']['percentiles'].shape == (7, 5)
+        assert (np.diff(sim['profit_value']['percentiles'], axis=0) >= 0).all()
+        assert sim['final_value']['counts'].sum(axis=1).tolist() == [5000] * 5
+        assert sim['max_deviation'] <= 1e-6
+    
+    def test_seed_reproducible(self):
+        investors, role_bonuses, project = make_inputs()
+        first, _, _ = compute_simulation(investors, role_bonuses, project, SPECS, 1000, seed=3)
+        again, _, _ = compute_simulation(investors, role_bonuses, project, SPECS, 1000, seed=3)
+        other, _, _ = compute_simulation(investors, role_bonuses, project, SPECS, 1000, seed=4)
+        np.testing.assert_array_equal(first['final_value']['percentiles'], again['final_value']['percentiles'])
+        assert not np.array_equal(first['final_value']['percentiles'], other['final_value']['percentiles'])
+    
+    def test_process_pool_gives_same_draws(self):
+        investors, role_bonuses, project = make_inputs()
+        draws = CHUNK_DRAWS * 2 + 100
+        local, _, _ = compute_simulation(investors, role_bonuses, project, SPECS, draws, seed=5)
+        pooled, errors, _ = compute_simulation(investors, role_bonuses, project, SPECS, draws, seed=5, workers=2)
+        assert errors == []
+        for key in ('final_value', 'profit_value', 'profit'):
+            np.testing.assert_array_equal(local[key]['percentiles'], pooled[key]['percentiles'])
+            np.testing.assert_array_equal(local[key]['counts'], pooled[key]['counts'])
+    
+    def test_invalid_draws_are_left_out(self):
+        investors, _, project = make_inputs()
+        # Profitable draws add the property profit share and exceed the budget
+        role_bonuses = make_inputs()[1].model_copy(update={'investor': Decimal('62')})
+        sim, errors, warnings = compute_simulation(investors, role_bonuses, project, SPECS, 2000, seed=1)
+        assert errors == []
+        assert sim['status_counts']['budget_exceeded'] > 0
+        assert sim['status_counts']['ok'] + sim['status_counts']['budget_exceeded'] == 2000
+        assert sim['project_profit']['max'] == 0.0
+        assert any('left out' in w for w in warnings)
+    
+    def test_unknown_parameter(self):
+        investors, role_bonuses, project = make_inputs()
+        _, errors, _ = compute_simulation(
+            investors, role_bonuses, project, {'developer': parse_distribution('1')}, 10, seed=1
+        )
+        assert 'Unknown simulation parameter' in errors[0]
+
+
+class TestApiSimulate:
+    """Test the /api/simulate endpoint."""
+    
+    PAYLOAD = {
+        'project_cost': '100000',
+        'sale_price': '150000',
+        'developer_bonus': '20',
+        'investor_bonus': '10',
+        'participants': [
+            {'name': 'Dev', 'role': 'Developer', 'payment': '0'},
+            {'name': 'Inv', 'role': 'Investor', 'payment': '100000'}
+        ],
+        'distributions': {
+            'sale_price': {'dist': 'uniform', 'low': '120000', 'high': '180000'},
+            'project_cost': '100000'
+        },
+        'draws': 2000,
+        'seed': 11,
+        'bins': 4
+    }
+    
+    def test_simulate(self, client):
+        resp = client.post('/api/simulate', json=self.PAYLOAD)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['banners']['errors'] == []
+        assert data['draws'] == 2000 and data['seed'] == 11
+        assert data['percentiles'] == [5, 10, 25, 50, 75, 90, 95]
+        assert 120000 <= data['sale_price']['min'] <= data['sale_price']['max'] <= 180000
+        inv = data['participants'][1]
+        assert inv['name'] == 'Inv'
+        assert inv['total_profit_pct']['mean'] == pytest.approx(80.0)
+        assert sum(inv['final_value']['histogram']['counts']) == 2000
+        assert len(inv['final_value']['histogram']['edges']) == 5
+        assert client.post('/api/simulate', json=self.PAYLOAD).get_json() == data
+    
+    def test_seed_is_returned(self, client):
+        payload = {**self.PAYLOAD, 'seed': None}
+        data = client.post('/api/simulate', json=payload).get_json()
+        assert isinstance(data['seed'], int)
+        assert client.post('/api/simulate', json={**payload, 'seed': data['seed']}).get_json() == data
+    
+    def test_invalid_distribution(self, client):
+        payload = {**self.PAYLOAD, 'distributions': {'sale_price': {'dist': 'uniform', 'low': 5}}}
+        resp = client.post('/api/simulate', json=payload)
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'invalid_simulation'
+    
+    def test_size_limit(self, app, client):
+        app.config['SIMULATE_MAX_CELLS'] = 1000
+        resp = client.post('/api/simulate', json=self.PAYLOAD)
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'simulation_too_large'
@@ -0,0 +1,186 @@
+"""Tests for the inverse solver."""
+from decimal import Decimal
+
+import pytest
+
+from app.services.calculator import compute_distribution
+from app.services.models import RoleBonuses
+from app.services.solver import metric_value, solve_target
+
+from tests.test_sweep import make_inputs
+
+
+def model_b_bonuses():
+    return RoleBonuses(developer=Decimal('20'), constructor=Decimal('5'), investor=Decimal('10'))
+
+
+def check(solution, investors, role_bonuses, project, participant, metric, target, **kwargs):
+    """The solution reproduces the target when fed back to compute_distribution."""
+    results, meta, errors, _ = compute_distribution(investors, role_bonuses, project, **kwargs)
+    assert errors == []
+    assert metric_value(results, meta, participant, metric) == pytest.approx(target, abs=1e-8)
+
+
+class TestSolveTarget:
+    """Test solve_target against the calculator."""
+    
+    def test_role_bonus_closed_form(self):
+        investors, role_bonuses, project = make_inputs()
+        solution, method, evaluations, errors, _ = solve_target(
+            investors, role_bonuses, project, 'Inv1', 'total_share', Decimal('20'), 'developer'
+        )
+        assert errors == []
+        assert method == 'closed_form'
+        assert evaluations <= 4
+        assert solution.value == Decimal('40')
+        check(solution, investors, role_bonuses.model_copy(update={'developer': solution.value}), project,
+              'Inv1', 'total_share', 20)
+    
+    def test_budget_limits_closed_form_range(self):
+        investors, role_bonuses, project = make_inputs()
+        # The default range reaches 100%, past the share budget; the developer share is still found
+        solution, method, _, errors, _ = solve_target(
+            investors, role_bonuses, project, 'Dev', 'total_share', Decimal('65'), 'developer'
+        )
+        assert errors == []
+        assert method == 'closed_form'
+        assert solution.value == Decimal('65')
+    
+    def test_payment_bracketed(self):
+        investors, role_bonuses, project = make_inputs()
+        solution, method, _, errors, _ = solve_target(
+            investors, role_bonuses, project, 'Inv1', 'total_share', Decimal('30'), 'payment',
+            Decimal('0'), Decimal('1000000'), payer='Inv1'
+        )
+        assert errors == []
+        assert method == 'bracketed'
+        assert float(solution.value) == pytest.approx(50000)
+        assert abs(solution.achieved - 30) <= Decimal('1e-9')
+    
+    def test_property_value_of_owner(self):
+        investors, role_bonuses, project = make_inputs()
+        role_bonuses = model_b_bonuses()
+        # Without a property value there is no owner, so the range starts above 0
+        solution, _, _, errors, _ = solve_target(
+            investors, role_bonuses, project, 'Owner', 'total_share', Decimal('20'), 'payment',
+            Decimal('1000'), Decimal('1000000'), payer='Owner', property_model='B'
+        )
+        assert errors == []
+        check(solution, investors, role_bonuses, project.model_copy(update={'property_value': solution.value}),
+              'Owner', 'total_share', 20, property_model='B')
+    
+    def test_property_weight_for_owner_profit(self):
+        investors, _, project = make_inputs()
+        role_bonuses = model_b_bonuses()
+        solution, method, _, errors, _ = solve_target(
+            investors, role_bonuses, project, 'Owner', 'profit_share', Decimal('25'), 'property_weight',
+            property_model='B'
+        )
+        assert errors == []
+        assert method == 'bracketed'
+        check(solution, investors, role_bonuses, project, 'Owner', 'profit_share', 25,
+              property_model='B', property_weight=solution.value)
+    
+    def test_bounded_model_b_is_bracketed(self):
+        investors, _, project = make_inputs()
+        role_bonuses = model_b_bonuses()
+        bounds = {'property_profit_min_pct': Decimal('10'), 'property_profit_max_pct': Decimal('30')}
+        solution, method, _, errors, _ = solve_target(
+            investors, role_bonuses, project, 'Inv1', 'profit_share', Decimal('25'), 'developer',
+            property_model='B', **bounds
+        )
+        assert errors == []
+        assert method == 'bracketed'
+        check(solution, investors, role_bonuses.model_copy(update={'developer': solution.value}), project,
+              'Inv1', 'profit_share', 25, property_model='B', **bounds)
+    
+    def test_sale_price_for_payout(self):
+        investors, role_bonuses, project = make_inputs()
+        solution, _, _, errors, _ = solve_target(
+            investors, role_bonuses, project, 'Inv1', 'profit_value', Decimal('10000'), 'sale_price',
+            Decimal('0'), Decimal('1000000')
+        )
+        assert errors == []
+        check(solution, investors, role_bonuses, project.model_copy(update={'sale_price': solution.value}),
+              'Inv1', 'profit_value', 10000)
+    
+    def test_unreachable_target(self):
+        investors, role_bonuses, project = make_inputs()
+        # In Model A the owner's equity is the property pool, whatever the developer bonus
+        solution, _, _, errors, _ = solve_target(
+            investors, role_bonuses, project, 'Owner', 'total_share', Decimal('20'), 'developer'
+        )
+        assert solution is None
+        assert 'not reachable' in errors[0]
+    
+    @pytest.mark.parametrize('kwargs, message', [
+        ({'variable': 'project_cost'}, 'Unknown variable'),
+        ({'metric': 'payment'}, 'Unknown target metric'),
+        ({'variable': 'property_weight'}, 'only applies to Model B'),
+        ({'variable': 'sale_price'}, 'needs min and max'),
+        ({'participant': 'Nobody'}, 'not found'),
+        ({'variable': 'payment', 'lower': Decimal('0'), 'upper': Decimal('1'), 'payer': 'Nobody'}, 'not found'),
+        ({'lower': Decimal('50'), 'upper': Decimal('10')}, 'min < max'),
+    ])
+    def test_invalid_requests(self, kwargs, message):
+        investors, role_bonuses, project = make_inputs()
+        args = {'participant': 'Inv1', 'metric': 'total_share', 'target': Decimal('20'), 'variable': 'developer'}
+        args.update(kwargs)
+        solution, _, _, errors, _ = solve_target(investors, role_bonuses, project, **args)
+        assert solution is None
+        assert message in errors[0]
+
+
+class TestApiSolve:
+    """Test the /api/solve endpoint."""
+    
+    PAYLOAD = {
+        'project_cost': '100000',
+        'sale_price': '150000',
+        'developer_bonus': '20',
+        'investor_bonus': '10',
+        'property_model': 'B',
+        'property_value': '50000',
+        'property_owner': 'Owner',
+        'participants': [
+            {'name': 'Dev', 'role': 'Developer', 'payment': '0'},
+            {'name': 'Inv', 'role': 'Investor', 'payment': '100000'}
+        ],
+        'target': {'participant': 'Owner', 'metric': 'profit_share', 'value': '25'},
+        'variable': {'name': 'property_weight', 'min': '0', 'max': '5'}
+    }
+    
+    def test_solve(self, client):
+        resp = client.post('/api/solve', json=self.PAYLOAD)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['banners']['errors'] == []
+        solution = data['solution']
+        assert solution['variable'] == 'property_weight'
+        assert solution['method'] == 'bracketed'
+        assert abs(Decimal(solution['achieved']) - 25) <= Decimal('1e-9')
+        owner = next(r for r in data['results'] if r['name'] == 'Owner')
+        assert Decimal(owner['total_profit_pct']) == Decimal(solution['achieved'])
+    
+    def test_closed_form(self, client):
+        payload = {
+            **self.PAYLOAD,
+            'target': {'participant': 'Dev', 'metric': 'total_share', 'value': '30'},
+            'variable': {'name': 'developer_bonus'}
+        }
+        data = client.post('/api/solve', json=payload).get_json()
+        assert data['solution']['method'] == 'closed_form'
+        assert Decimal(data['solution']['value']) == 30
+        assert data['pools']['dev'] == data['solution']['value']
+    
+    def test_unreachable(self, client):
+        payload = {**self.PAYLOAD, 'target': {'participant': 'Owner', 'metric': 'profit_share', 'value': '99'}}
+        resp = client.post('/api/solve', json=payload)
+        assert resp.status_code == 200
+        assert 'solution' not in resp.get_json()
+        assert 'not reachable' in resp.get_json()['banners']['errors'][0]
+    
+    def test_unknown_variable(self, client):
+        resp = client.post('/api/solve', json={**self.PAYLOAD, 'variable': {'name': 'participants'}})
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] == 'invalid_solve'
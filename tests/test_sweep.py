@@ -0,0 +1,134 @@
+"""Tests for the vectorized parameter sweep."""
+from decimal import Decimal
+
+import numpy as np
+
+from app.services.calculator import compute_distribution, compute_sweep
+from app.services.models import Investor, RoleBonuses, Project
+
+
+def make_inputs():
+    investors = [
+        Investor(name='Dev', role='Developer', payment=Decimal('0')),
+        Investor(name='Const', role='Constructor', payment=Decimal('30000')),
+        Investor(name='Inv1', role='Investor', payment=Decimal('50000')),
+        Investor(name='Inv2', role='Investor', payment=Decimal('20000'))
+    ]
+    role_bonuses = RoleBonuses(
+        developer=Decimal('20'),
+        constructor=Decimal('5'),
+        investor=Decimal('10'),
+        property_base_share=Decimal('10'),
+        property_profit_share=Decimal('5')
+    )
+    project = Project(
+        project_cost=Decimal('100000'),
+        sale_price=Decimal('150000'),
+        property_value=Decimal('40000'),
+        property_owner='Owner'
+    )
+    return investors, role_bonuses, project
+
+
+class TestComputeSweep:
+    """Test compute_sweep against the scalar engine."""
+    
+    def test_model_a_grid_matches_scalar(self):
+        investors, role_bonuses, project = make_inputs()
+        prices = [Decimal('90000'), Decimal('100000'), Decimal('150000')]
+        devs = [Decimal('10'), Decimal('20'), Decimal('30')]
+        sweep, errors, warnings = compute_sweep(
+            investors, role_bonuses, project,
+            {'sale_price': prices, 'developer': devs}
+        )
+        assert errors == []
+        assert sweep['shape'] == (3, 3)
+        assert sweep['equity'].shape == (3, 3, 5)
+        for i, price in enumerate(prices):
+            for j, dev in enumerate(devs):
+                results, meta, _, _ = compute_distribution(
+                    investors,
+                    role_bonuses.model_copy(update={'developer': dev}),
+                    project.model_copy(update={'sale_price': price})
+                )
+                expected = [float(r.total_share) for r in results]
+                np.testing.assert_allclose(sweep['equity'][i, j], expected, atol=1e-9)
+                expected = [float(r.profit_share) for r in results]
+                np.testing.assert_allclose(sweep['profit'][i, j], expected, atol=1e-9)
+    
+    def test_model_b_bounds_match_scalar(self):
+        investors, _, project = make_inputs()
+        role_bonuses = RoleBonuses(developer=Decimal('20'), constructor=Decimal('5'), investor=Decimal('10'))
+        weights = [Decimal('0.5'), Decimal('1.0'), Decimal('2.0')]
+        sweep, errors, _ = compute_sweep(
+            investors, role_bonuses, project, {'property_weight': weights},
+            property_model='B', property_profit_min_pct=Decimal('20'),
+            property_profit_max_pct=Decimal('25')
+        )
+        assert errors == []
+        for i, weight in enumerate(weights):
+            results, _, _, _ = compute_distribution(
+                investors, role_bonuses, project, 'B', weight, Decimal('20'), Decimal('25')
+            )
+            expected = [float(r.profit_share) for r in results]
+            np.testing.assert_allclose(sweep['profit'][i], expected, atol=1e-9)
+            expected = [float(r.total_share) * float(project.sale_price) / 100 for r in results]
+            np.testing.assert_allclose(sweep['final_value'][i], expected, atol=1e-6)
+    
+    def test_budget_exceeded_points_are_flagged(self):
+        investors, role_bonuses, project = make_inputs()
+        sweep, errors, warnings = compute_sweep(
+            investors, role_bonuses, project,
+            {'investor': [Decimal('10'), Decimal('70')]}
+        )
+        assert errors == []
+        assert sweep['status'].tolist() == [0, 1]
+        assert any('exceeds 100%' in w for w in warnings)
+    
+    def test_unknown_axis(self):
+        investors, role_bonuses, project = make_inputs()
+        _, errors, _ = compute_sweep(investors, role_bonuses, project, {'payment': [Decimal('1')]})
+        assert 'Unknown sweep parameter' in errors[0]
+
+
+class TestApiSweep:
+    """Test the /api/sweep endpoint."""
+    
+    def test_sweep_range(self, client):
+        payload = {
+            'project_cost': '100000',
+            'sale_price': '150000',
+            'developer_bonus': '20',
+            'constructor_bonus': '0',
+            'investor_bonus': '10',
+            'participants': [
+                {'name': 'Dev', 'role': 'Developer', 'payment': '0'},
+                {'name': 'Inv', 'role': 'Investor', 'payment': '100000'}
+            ],
+            'axes': {
+                'sale_price': {'start': '100000', 'stop': '200000', 'step': '25000'},
+                'developer_bonus': ['10', '20']
+            }
+        }
+        resp = client.post('/api/sweep', json=payload)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        axes = {axis['name']: axis['values'] for axis in data['axes']}
+        assert axes['sale_price'] == [100000, 125000, 150000, 175000, 200000]
+        assert axes['developer_bonus'] == [10, 20]
+        assert sorted(data['shape']) == [2, 5]
+        assert data['shape'] == [len(axis['values']) for axis in data['axes']]
+        # Developer bonus 10%: developer 10%, investor 90%
+        assert data['total_equity_pct'][0][0] == [10.0, 90.0]
+        assert data['max_deviation'] <= 1e-6
+    
+    def test_sweep_size_limit(self, app, client):
+        app.config['SWEEP_MAX_CELLS'] = 10
+        payload = {
+            'project_cost': '1', 'sale_price': '2',
+            'participants': [{'name': 'Inv', 'role': 'Investor', 'payment': '1'}],
+            'axes': {'sale_price': {'start': '1', 'stop': '100', 'step': '1'}}
+        }
+        resp = client.post('/api/sweep', json=payload)
+        assert resp.status_code == 400
+        assert resp.get_json()['error'] in ('sweep_too_large', 'invalid_sweep')
@@ -0,0 +1,99 @@
+"""Tests for streaming cap-table uploads."""
+import csv
+import io
+import json
+
+import pytest
+
+from app.services.upload import iter_lines, read_csv
+
+from tests.test_api import SCENARIO
+
+
+QUERY = {k: v for k, v in SCENARIO.items() if k != 'participants'}
+
+CSV_BODY = (
+    'Name,Role,Paid\n'
+    'Dev,Developer,0\n'
+    '"Inv1, Ltd",Investor,60000\n'
+    '\n'
+    'Inv2,Investor,40000\n'
+)
+
+
+def expected_rows(client, names=('Dev', 'Inv1, Ltd', 'Inv2')):
+    participants = [
+        {**p, 'name': name} for p, name in zip(SCENARIO['participants'], names)
+    ]
+    return client.post('/api/calculate', json={**SCENARIO, 'participants': participants}).get_json()
+
+
+class TestUpload:
+    """Test the /api/calculate/upload endpoint."""
+    
+    def test_csv_matches_json_api(self, client):
+        resp = client.post(
+            '/api/calculate/upload', query_string=QUERY, data=CSV_BODY, content_type='text/csv'
+        )
+        assert resp.status_code == 200
+        assert resp.mimetype == 'text/csv'
+        assert resp.is_streamed
+        rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+        assert rows == expected_rows(client)['results']
+    
+    def test_ndjson_with_summary(self, client):
+        body = ''.join(json.dumps(p) + '\n' for p in SCENARIO['participants'])
+        resp = client.post(
+            '/api/calculate/upload', query_string=QUERY, data=body, content_type='application/x-ndjson'
+        )
+        assert resp.status_code == 200
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        expected = expected_rows(client, names=('Dev', 'Inv1', 'Inv2'))
+        assert lines[:-1] == expected['results']
+        assert lines[-1]['summary']['totals'] == expected['totals']
+    
+    def test_output_format_override(self, client):
+        resp = client.post(
+            '/api/calculate/upload', query_string={**QUERY, 'format': 'ndjson'},
+            data=CSV_BODY, content_type='text/csv'
+        )
+        assert resp.mimetype == 'application/x-ndjson'
+        assert 'summary' in json.loads(resp.get_data(as_text=True).splitlines()[-1])
+    
+    def test_reports_line_of_bad_row(self, client):
+        body = 'name,role,payment\nA,Investor,10\nB,Nobody,5\n'
+        resp = client.post('/api/calculate/upload', query_string=QUERY, data=body, content_type='text/csv')
+        assert resp.status_code == 400
+        data = resp.get_json()
+        assert data['error'] == 'invalid_upload'
+        assert data['detail'].startswith('Line 3:')
+    
+    def test_calculation_errors(self, client):
+        resp = client.post(
+            '/api/calculate/upload', query_string={**QUERY, 'developer_bonus': '95'},
+            data=CSV_BODY, content_type='text/csv'
+        )
+        assert resp.status_code == 400
+        assert resp.get_json()['banners']['errors']
+    
+    def test_rejects_other_content_types(self, client):
+        resp = client.post('/api/calculate/upload', query_string=QUERY, json={})
+        assert resp.status_code == 400
+    
+    def test_participant_limit(self, app, client):
+        app.config['UPLOAD_MAX_PARTICIPANTS'] = 2
+        resp = client.post('/api/calculate/upload', query_string=QUERY, data=CSV_BODY, content_type='text/csv')
+        assert resp.status_code == 400
+        assert 'At most 2' in resp.get_json()['detail']
+
+
+class TestReaders:
+    """Test the incremental readers."""
+    
+    def test_line_limit(self):
+        with pytest.raises(ValueError):
+            list(iter_lines(io.BytesIO(b'x' * 100 + b'\n'), max_line=50))
+    
+    def test_missing_column(self):
+        with pytest.raises(ValueError, match='payment'):
+            list(read_csv(['name,role\n', 'A,Investor\n'], 10))
@@ -0,0 +1,22 @@
+"""Tests for the startup warm-up."""
+from app import create_app
+from app.config import TestingConfig
+from app.warmup import TEMPLATES, warm_up
+
+
+class TestWarmUp:
+    """Test warm_up and its use in the app factory."""
+    
+    def test_compiles_templates_without_side_effects(self, app):
+        warm_up(app)
+        cached = {key[1] for key in app.jinja_env.cache.keys()}
+        assert set(TEMPLATES) <= cached
+        assert len(app.extensions['result_cache']) == 0
+    
+    def test_factory_runs_warm_up_when_enabled(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'WARM_UP', True)
+        app = create_app('testing')
+        assert any(key[1] == 'index.html' for key in app.jinja_env.cache.keys())
+    
+    def test_disabled_in_testing(self, app):
+        assert not any(key[1] == 'index.html' for key in app.jinja_env.cache.keys())